@@ -5,3 +5,116 @@ load_dotenv()
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
+
+# Size of the shared HTTP connection pool used by the async Supabase client
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+
+# Background upload pipeline (OCR -> journal -> report -> link -> notify)
+NOTES_UPLOAD_BACKGROUND = os.getenv("NOTES_UPLOAD_BACKGROUND", "false").lower() == "true"
+JOB_QUEUE_DB = os.getenv("JOB_QUEUE_DB", "jobs.sqlite3")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_STAGE_MAX_ATTEMPTS = int(os.getenv("JOB_STAGE_MAX_ATTEMPTS", "3"))
+JOB_STAGE_BACKOFF = float(os.getenv("JOB_STAGE_BACKOFF", "2"))
+# A running job is leased for JOB_LEASE seconds and renewed while it runs; after a crash another
+# worker (or process sharing JOB_QUEUE_DB) picks it up once the lease lapses
+JOB_LEASE = float(os.getenv("JOB_LEASE", "60"))
+
+# OCR result cache: in-memory LRU tier plus an optional SQLite tier ("" disables it)
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "512"))
+OCR_CACHE_TTL = float(os.getenv("OCR_CACHE_TTL", "86400"))
+OCR_CACHE_DB = os.getenv("OCR_CACHE_DB", "ocr_cache.sqlite3")
+
+# Journal photos are shrunk before OCR; set OCR_PREPROCESS=false to send originals
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "true").lower() == "true"
+OCR_MAX_LONG_EDGE = int(os.getenv("OCR_MAX_LONG_EDGE", "1600"))
+OCR_GRAYSCALE = os.getenv("OCR_GRAYSCALE", "true").lower() == "true"
+OCR_AUTOCONTRAST = os.getenv("OCR_AUTOCONTRAST", "true").lower() == "true"
+OCR_IMAGE_FORMAT = os.getenv("OCR_IMAGE_FORMAT", "JPEG").upper()
+OCR_IMAGE_QUALITY = int(os.getenv("OCR_IMAGE_QUALITY", "80"))
+
+# OCR engine: gemini | tesseract | cascade (local Tesseract first; pages with fewer than OCR_MIN_WORDS
+# words, mean word confidence under OCR_MIN_CONFIDENCE, or more than OCR_MAX_LOW_CONFIDENCE_SHARE of
+# words under OCR_WORD_CONFIDENCE, i.e. handwriting, go to Gemini). Tesseract needs the tesseract
+# binary; OCR_TESSERACT_PROCESSES=0 uses one process per core
+OCR_ENGINE = os.getenv("OCR_ENGINE", "gemini").lower()
+OCR_TESSERACT_PROCESSES = int(os.getenv("OCR_TESSERACT_PROCESSES", "0"))
+OCR_TESSERACT_LANG = os.getenv("OCR_TESSERACT_LANG", "eng")
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "80"))
+OCR_WORD_CONFIDENCE = float(os.getenv("OCR_WORD_CONFIDENCE", "60"))
+OCR_MAX_LOW_CONFIDENCE_SHARE = float(os.getenv("OCR_MAX_LOW_CONFIDENCE_SHARE", "0.15"))
+OCR_MIN_WORDS = int(os.getenv("OCR_MIN_WORDS", "5"))
+
+# Journal image downloads
+OCR_FETCH_MAX_BYTES = int(os.getenv("OCR_FETCH_MAX_BYTES", str(15 * 1024 * 1024)))
+OCR_FETCH_CONNECT_TIMEOUT = float(os.getenv("OCR_FETCH_CONNECT_TIMEOUT", "5"))
+OCR_FETCH_READ_TIMEOUT = float(os.getenv("OCR_FETCH_READ_TIMEOUT", "20"))
+# Bodies kept per process to answer ETag revalidations (304s), in total bytes
+OCR_FETCH_ETAG_CACHE_BYTES = int(os.getenv("OCR_FETCH_ETAG_CACHE_BYTES", str(32 * 1024 * 1024)))
+
+# Student/donor link lookups; links are cached per process and refreshed after LINK_CACHE_TTL seconds
+LINK_CACHE_SIZE = int(os.getenv("LINK_CACHE_SIZE", "10000"))
+LINK_CACHE_TTL = float(os.getenv("LINK_CACHE_TTL", "300"))
+
+# Items of one /notes/upload_batch request processed at the same time; larger batches are refused
+# with 413 (every item can cost two Gemini calls)
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_UPLOAD_MAX_ITEMS = int(os.getenv("BATCH_UPLOAD_MAX_ITEMS", "50"))
+
+# Shared limiter for every Gemini call (OCR and scoring); GEMINI_RPM=0 disables the token bucket
+GEMINI_MAX_CONCURRENCY = int(os.getenv("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "60"))
+GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", "30"))
+GEMINI_MAX_ATTEMPTS = int(os.getenv("GEMINI_MAX_ATTEMPTS", "3"))
+GEMINI_BACKOFF = float(os.getenv("GEMINI_BACKOFF", "1"))
+
+# Opt-in fused mode: one multimodal call transcribes and scores a journal photo
+FUSED_OCR_SCORE = os.getenv("FUSED_OCR_SCORE", "false").lower() == "true"
+FUSED_MODEL = os.getenv("FUSED_MODEL", "gemini-2.5-flash")
+
+# Donor assignment for newly linked students: random | fewest_linked | capacity
+DONOR_ASSIGNMENT_STRATEGY = os.getenv("DONOR_ASSIGNMENT_STRATEGY", "random")
+DONOR_INDEX_TTL = float(os.getenv("DONOR_INDEX_TTL", "600"))
+DONOR_DEFAULT_CAPACITY = int(os.getenv("DONOR_DEFAULT_CAPACITY", "10"))
+
+# Donor push events: "" keeps them in-process, redis://... shares them across workers
+EVENT_BROKER_URL = os.getenv("EVENT_BROKER_URL", "")
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "100"))
+EVENT_HEARTBEAT = float(os.getenv("EVENT_HEARTBEAT", "15"))
+
+# Logging: LOG_JSON=false switches to plain text lines for local development
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_JSON = os.getenv("LOG_JSON", "true").lower() == "true"
+
+# Duplicate upload/submit requests (same Idempotency-Key header, or same student and image/journal)
+# replay the stored response for IDEMPOTENCY_TTL seconds instead of running OCR and scoring again
+IDEMPOTENCY_DB = os.getenv("IDEMPOTENCY_DB", "idempotency.sqlite3")
+IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "86400"))
+# A running request renews its claim every third of IDEMPOTENCY_PENDING_TIMEOUT; a worker that dies
+# mid-request leaves the key blocked for at most that long
+IDEMPOTENCY_PENDING_TIMEOUT = float(os.getenv("IDEMPOTENCY_PENDING_TIMEOUT", "30"))
+
+# Per-student progress analytics: a student's current level (used for cohort percentiles) is the mean
+# of their last ANALYTICS_WINDOW submissions. Only those are loaded, in the background at startup and
+# again every ANALYTICS_TTL seconds; a student's full history is read when their progress is opened
+ANALYTICS_TTL = float(os.getenv("ANALYTICS_TTL", "3600"))
+ANALYTICS_WINDOW = int(os.getenv("ANALYTICS_WINDOW", "5"))
+
+# Build the Supabase and Gemini clients in the startup hook (a missing credential is logged, not
+# fatal); false defers them to the first request that needs them
+STARTUP_WARM_CLIENTS = os.getenv("STARTUP_WARM_CLIENTS", "true").lower() == "true"
+
+# Donor read responses (children list, notifications, donor id lookup) are fresh for RESPONSE_CACHE_TTL
+# seconds, then served stale for up to RESPONSE_CACHE_STALE more while reloaded in the background.
+# Writes invalidate them straight away; 0 turns the cache off. RESPONSE_CACHE_URL=redis://... adds a
+# tier shared by all workers, which also carries invalidations between them
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+RESPONSE_CACHE_STALE = float(os.getenv("RESPONSE_CACHE_STALE", "600"))
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "10000"))
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+
+# Notifications keep the report's overall score and a progress update cut to REPORT_PREVIEW_CHARS;
+# the full report is read from journal_submissions when opened and cached per process
+REPORT_PREVIEW_CHARS = int(os.getenv("REPORT_PREVIEW_CHARS", "160"))
+REPORT_CACHE_SIZE = int(os.getenv("REPORT_CACHE_SIZE", "5000"))
+REPORT_CACHE_TTL = float(os.getenv("REPORT_CACHE_TTL", "86400"))
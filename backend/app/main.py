@@ -1,16 +1,40 @@
-from fastapi import FastAPI, UploadFile
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-import pytesseract
-from PIL import Image
-
+from app.config import LOG_JSON, LOG_LEVEL, NOTES_UPLOAD_BACKGROUND, STARTUP_WARM_CLIENTS
 from app.routes import donor, notes, student
+from app.services.container import services
+from app.services.gemini_limiter import gemini_limiter
+from app.services.supabase_service import close_async_supabase_client
+from app.services.telemetry import configure_logging, http_duration, registry, request_id_var
 
-app = FastAPI()
+configure_logging(LOG_LEVEL, LOG_JSON)
+logger = logging.getLogger("app.access")
+
+registry.gauge("gemini_queue_depth", "Calls waiting for a Gemini slot", lambda: gemini_limiter.waiting)
+registry.gauge("gemini_in_flight", "Gemini calls in progress", lambda: gemini_limiter.in_flight)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if STARTUP_WARM_CLIENTS:
+        await services.start()
+    # The job and idempotency stores are opened here, not when the app is imported; the
+    # job store only in background mode
+    services.idempotency.store.purge()
+    if NOTES_UPLOAD_BACKGROUND:
+        await services.upload_queue.start()
+    # Warms the analytics matrix in the background; the first request does not wait for it
+    await services.progress_analytics.start()
+    yield
+    await services.close()
+    await close_async_supabase_client()
 
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "https://donorconnect-orcin.vercel.app",  # Production frontend
@@ -26,6 +50,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def request_context(request: Request, call_next):
+    """Tag the request with an id, time it and log one access line."""
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        path = getattr(route, "path", "unmatched")
+        http_duration.observe(elapsed, request.method, path, str(status))
+        logger.info(
+            "request",
+            extra={
+                "method": request.method,
+                "route": path,
+                "status": status,
+                "duration_ms": round(elapsed * 1000, 2),
+            },
+        )
+        request_id_var.reset(token)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 app.include_router(donor.router)
 app.include_router(notes.router)
 app.include_router(student.router)
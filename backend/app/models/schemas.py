@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 class JournalSubmission(BaseModel):
@@ -9,15 +9,44 @@ class JournalSubmission(BaseModel):
     image_url: str
 
 
+class NoteUploadRequest(BaseModel):
+    student_id: str
+    file_url: str
+    journal_topic: str
+
+
+class NoteBatchUploadRequest(BaseModel):
+    items: List[NoteUploadRequest]
+
+
 class LearningReportResponse(BaseModel):
     updated_report: str
     progress_update: str
     scores: Dict[str, int]
     overall_score: float
+    # journal_submissions row the report is stored in; notifications point at it
+    submission_id: Optional[int] = None
+
+    @classmethod
+    def from_report(cls, report: dict, submission_id: Optional[int] = None) -> "LearningReportResponse":
+        """Build the response from a report as the model returns it and journal_submissions stores it."""
+        return cls(
+            updated_report=report.get("summary", ""),
+            progress_update=report.get("progress_update", ""),
+            scores=report.get("scores", {}),
+            overall_score=report.get("overall_score", 0.0),
+            submission_id=submission_id,
+        )
 
 
 class JournalData(BaseModel):
     student_id: str
-    journal_list: List[str]
-    report_list: List[Dict] = []
+    submission_count: int = 0
     latest_report: Dict = {}
+
+
+class JournalSubmissionRecord(BaseModel):
+    seq: int
+    journal: str
+    report: Dict
+    created_at: str
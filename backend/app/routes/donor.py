@@ -1,10 +1,32 @@
-from fastapi import APIRouter, HTTPException
-from app.services.supabase_service import DBServiceClass
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from app.config import EVENT_HEARTBEAT, REPORT_CACHE_SIZE, REPORT_CACHE_TTL
+from app.services.cache import TTLCache
+from app.services.container import services
+from app.services.event_broker import donor_channel
+from app.services.linking_service import link_cache
+from app.services.response_cache import (
+    donor_tag,
+    pair_tag,
+    response_key,
+    student_tag,
+)
 from app.models.schemas import LearningReportResponse
 
 router = APIRouter(prefix="/donor", tags=["Donor"])
 
-database = DBServiceClass()
+logger = logging.getLogger(__name__)
+
+# A notification's report never changes once written, so opened reports are kept per process
+report_cache = TTLCache(max_size=REPORT_CACHE_SIZE, ttl=REPORT_CACHE_TTL)
 
 # @router.get("/test")
 # def test_db_connection():
@@ -32,128 +54,294 @@ database = DBServiceClass()
 
 @router.get("/get_all_notifications/{donor_id}/{student_id}")
 async def get_all_notifications(donor_id: str, student_id: str):
-    return database.get_all_notifications(donor_id, student_id)
+    async def load():
+        rows = await services.database.get_all_notifications(donor_id, student_id)
+        return rows, [pair_tag(donor_id, student_id)]
+
+    return await services.response_cache.get_or_load(
+        response_key("get_all_notifications", donor_id, student_id), load
+    )
+
+
+def _encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["created_at"], row["id"]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    # Both values end up in a PostgREST filter, so anything but a timestamp and an id is refused
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _etag(data: bytes) -> str:
+    return f'W/"{hashlib.sha1(data).hexdigest()[:20]}"'
+
+
+def _not_modified(request: Request, etag: str) -> Optional[Response]:
+    """An empty 304 when the client's If-None-Match carries ``etag``."""
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
+    return None
+
+
+def _json_with_etag(request: Request, payload, etag: Optional[str] = None) -> Response:
+    """JSON response with an ETag (by default a hash of the body); a matching If-None-Match gets a 304."""
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode()
+    etag = etag or _etag(body)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/notifications/{donor_id}/{student_id}")
+async def get_notifications_feed(
+    donor_id: str,
+    student_id: str,
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[str] = None,
+    since: Optional[str] = None,
+):
+    """Paged notification previews for one donor-student conversation.
+
+    Without cursors the newest page is returned; pass next_before to go
+    further back. Pass the returned sync cursor as since to fetch only
+    notifications created after it. Full reports come from
+    /donor/notifications/{donor_id}/report/{notification_id}.
+    """
+    if before and since:
+        raise HTTPException(status_code=400, detail="Use either before or since, not both")
+    before_key = _decode_cursor(before) if before else None
+    since_key = _decode_cursor(since) if since else None
+
+    # Every insert and read flip in the conversation changes its summary row, so
+    # the summary and the query validate the page without reading it
+    summary = await services.database.get_conversation_summary(donor_id, student_id)
+    etag = _etag(json.dumps([summary, limit, before, since], default=str).encode())
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+
+    rows = await services.database.get_notifications_page(
+        donor_id,
+        student_id,
+        limit=limit + 1,
+        before=before_key,
+        since=since_key,
+    )
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if since:
+        # Oldest first; the last row is the newest one the client now has
+        sync = _encode_cursor(rows[-1]) if rows else since
+        next_before = None
+    else:
+        sync = _encode_cursor(rows[0]) if rows and not before else None
+        next_before = _encode_cursor(rows[-1]) if has_more else None
+
+    return _json_with_etag(
+        request,
+        {"items": rows, "next_before": next_before, "sync": sync, "has_more": has_more},
+        etag=etag,
+    )
+
+
+@router.get("/notifications/{donor_id}/report/{notification_id}")
+async def get_notification_report(donor_id: str, notification_id: int):
+    key = (donor_id, notification_id)
+    report = report_cache.get(key)
+    if report is None:
+        report = await services.database.get_notification_report(donor_id, notification_id)
+        if report is None:
+            raise HTTPException(status_code=404, detail="Notification not found")
+        report_cache.set(key, report)
+    return Response(
+        content=json.dumps(jsonable_encoder(report)).encode(),
+        media_type="application/json",
+        headers={"Cache-Control": "private, max-age=86400, immutable"},
+    )
+
+
+def _format_timestamp(created_at: str) -> str:
+    """Format an ISO timestamp as "Today", "Yesterday", "3d ago" or "MM/DD"."""
+    try:
+        dt = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        now = datetime.now(dt.tzinfo)
+        diff = now - dt
+
+        if diff.days == 0:
+            return "Today"
+        elif diff.days == 1:
+            return "Yesterday"
+        elif diff.days < 7:
+            return f"{diff.days}d ago"
+        return dt.strftime("%m/%d")
+    except:
+        return "Recent"
+
+
+def _last_message_preview(notification: dict) -> str:
+    if notification.get("progress_update"):
+        return notification["progress_update"][:50] + "..."
+    elif notification.get("journal_image"):
+        return "📝 New journal entry"
+    return "No messages yet"
+
+
+async def _load_children(donor_id: str):
+    """The inbox rows for a donor, tagged with every link and student they were built from."""
+    # Get the student-donor links
+    links = await services.linking_service.get_all_children(donor_id)
+    tags = [donor_tag(donor_id)]
+
+    if not links:
+        return [], tags
+
+    # Extract student IDs from the links
+    student_ids = [str(link["student_id"]) for link in links]
+    for student_id in student_ids:
+        tags += [student_tag(student_id), pair_tag(donor_id, student_id)]
+
+    # One query for the students and one for their conversation summaries
+    students = await services.database.get_children_information_by_ids(student_ids)
+    summaries = await services.database.get_conversation_summaries(donor_id, student_ids)
+
+    students_data = []
+    for student_id in student_ids:
+        student_data = students.get(student_id)
+        if not student_data:
+            continue
+
+        summary = summaries.get(student_id)
+        last_message = "No messages yet"
+        timestamp = ""
+        unread_count = 0
+
+        if summary and summary.get("last_at"):
+            last_message = _last_message_preview(
+                {
+                    "progress_update": summary.get("last_message"),
+                    "journal_image": summary.get("last_journal_image"),
+                }
+            )
+            timestamp = _format_timestamp(summary["last_at"])
+            unread_count = summary.get("unread_count") or 0
+
+        students_data.append(
+            {
+                "id": student_data.get("student_id") or student_data.get("id"),
+                "name": student_data.get("name")
+                or f"Student {student_data.get('student_id', 'Unknown')}",
+                "age": student_data.get("age"),
+                "location": student_data.get("location") or "Unknown",
+                "journal_count": student_data.get("submission_count") or 0,
+                "report_count": student_data.get("submission_count") or 0,
+                "online": False,  # Default value
+                "unread": unread_count,
+                "lastMessage": last_message,
+                "timestamp": timestamp,
+            }
+        )
+
+    return students_data, tags
 
 
 @router.get("/get_all_children/{donor_id}")
 async def get_all_children(donor_id: str):
     try:
-        # Get the student-donor links
-        links = database.get_all_children(donor_id)
-        print("Links:", links)
-
-        if not links:
-            return []
-
-        # Extract student IDs from the links
-        student_ids = [link["student_id"] for link in links]
-        print("Student IDs:", student_ids)
-
-        # Get student data for each ID
-        students_data = []
-        for student_id in student_ids:
-            # Remove await since get_child_information_by_id is not async
-            student_data = database.get_child_information_by_id(str(student_id))
-
-            print("Student Data:", student_data)
-            if student_data:
-                # Get the latest notification/message for this student
-                latest_notification = database.get_latest_notification(
-                    donor_id, str(student_id)
-                )
-                last_message = "No messages yet"
-                timestamp = ""
-                unread_count = 0
-
-                if latest_notification:
-                    # Extract a preview of the latest message
-                    if latest_notification.get(
-                        "learning_report"
-                    ) and latest_notification["learning_report"].get("progress_update"):
-                        last_message = (
-                            latest_notification["learning_report"]["progress_update"][
-                                :50
-                            ]
-                            + "..."
-                        )
-                    elif latest_notification.get("journal_image"):
-                        last_message = "📝 New journal entry"
-
-                    # Get and format timestamp
-                    if latest_notification.get("created_at"):
-                        from datetime import datetime
-
-                        try:
-                            # Parse the ISO timestamp and format it nicely
-                            dt = datetime.fromisoformat(
-                                latest_notification["created_at"].replace("Z", "+00:00")
-                            )
-                            # Format as "2 days ago", "Yesterday", "Today", etc.
-                            now = datetime.now(dt.tzinfo)
-                            diff = now - dt
-
-                            if diff.days == 0:
-                                timestamp = "Today"
-                            elif diff.days == 1:
-                                timestamp = "Yesterday"
-                            elif diff.days < 7:
-                                timestamp = f"{diff.days}d ago"
-                            else:
-                                timestamp = dt.strftime("%m/%d")
-                        except:
-                            timestamp = "Recent"
-
-                    # Count unread notifications (you might want to add an 'is_read' field to notifications table)
-                    unread_count = database.count_unread_notifications(
-                        donor_id, str(student_id)
-                    )
-
-                # student_data is now a dictionary, not a Pydantic model
-                students_data.append(
-                    {
-                        "id": student_data.get("student_id") or student_data.get("id"),
-                        "name": student_data.get("name")
-                        or f"Student {student_data.get('student_id', 'Unknown')}",
-                        "age": student_data.get("age"),
-                        "location": student_data.get("location") or "Unknown",
-                        "journal_count": len(student_data.get("journal_list", [])),
-                        "report_count": len(student_data.get("report_list", [])),
-                        "online": False,  # Default value
-                        "unread": unread_count,
-                        "lastMessage": last_message,
-                        "timestamp": timestamp,
-                    }
-                )
-
-        print("Final students data:", students_data)
-        return students_data
-
+        return await services.response_cache.get_or_load(
+            response_key("get_all_children", donor_id), lambda: _load_children(donor_id)
+        )
     except Exception as e:
-        print(f"Error in get_all_children: {str(e)}")
+        logger.exception("error in get_all_children")
         raise HTTPException(
             status_code=500, detail=f"Error fetching children: {str(e)}"
         )
 
 
+@router.get("/events/{donor_id}")
+async def donor_events(donor_id: str, request: Request):
+    """Server-sent events for one donor: new notifications and unread count changes."""
+
+    async def stream():
+        async with services.event_broker.subscribe(donor_channel(donor_id)) as queue:
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), EVENT_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/event_broker/stats")
+async def get_event_broker_stats():
+    return services.event_broker.stats()
+
+
+@router.get("/link_cache/stats")
+async def get_link_cache_stats():
+    return link_cache.stats()
+
+
+@router.get("/response_cache/stats")
+async def get_response_cache_stats():
+    return services.response_cache.stats()
+
+
+@router.get("/report_cache/stats")
+async def get_report_cache_stats():
+    return report_cache.stats()
+
+
+@router.get("/assignment/stats")
+async def get_assignment_stats():
+    return services.assignment_engine.stats()
+
+
 @router.get("/get_donor_id_by_supabase_id/{supabase_id}")
 async def get_donor_id_by_supabase_id(supabase_id: str):
+    async def load():
+        # An unknown id is not cached: the donor row may be created at sign-up
+        return await services.database.get_donor_by_supabase_id(supabase_id), []
+
     try:
-        donor_id = database.get_donor_by_supabase_id(supabase_id)
+        donor_id = await services.response_cache.get_or_load(
+            response_key("get_donor_id_by_supabase_id", supabase_id), load
+        )
         if not donor_id:
             raise HTTPException(status_code=404, detail="Donor not found")
         return donor_id
     except Exception as e:
-        print(f"Error in get_donor_id_by_supabase_id: {str(e)}")
+        logger.exception("error in get_donor_id_by_supabase_id")
         raise HTTPException(status_code=500, detail=f"Error fetching donor: {str(e)}")
 
 
 @router.post("/mark_notifications_read/{donor_id}/{student_id}")
 async def mark_notifications_read(donor_id: str, student_id: str):
     try:
-        result = database.mark_notifications_as_read(donor_id, student_id)
+        result = await services.database.mark_notifications_as_read(donor_id, student_id)
+        await services.notifier.publish_unread_count(donor_id, student_id, 0)
         return {"success": True, "message": "Notifications marked as read"}
     except Exception as e:
-        print(f"Error marking notifications as read: {str(e)}")
+        logger.exception("error marking notifications as read")
         raise HTTPException(
             status_code=500, detail=f"Error marking notifications as read: {str(e)}"
         )
@@ -161,10 +349,10 @@ async def mark_notifications_read(donor_id: str, student_id: str):
 @router.get("/unread_count/{donor_id}/{student_id}")
 async def get_unread_count(donor_id: str, student_id: str):
     try:
-        count = database.count_unread_notifications(donor_id, student_id)
+        count = await services.database.count_unread_notifications(donor_id, student_id)
         return {"unread_count": count}
     except Exception as e:
-        print(f"Error getting unread count: {str(e)}")
+        logger.exception("error getting unread count")
         raise HTTPException(
             status_code=500, detail=f"Error marking notifications as read: {str(e)}"
         )
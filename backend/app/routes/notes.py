@@ -1,24 +1,43 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
-from app.services.ocr_service import extract_text_from_image_url
-from app.services.supabase_service import get_supabase_client
-from app.routes.student import submit_journal
-from app.models.schemas import JournalSubmission 
+import logging
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException
+from app.config import BATCH_UPLOAD_MAX_ITEMS, FUSED_OCR_SCORE, NOTES_UPLOAD_BACKGROUND
+from app.services.container import services
+from app.services.fused_service import fused_stats
+from app.services.gemini_limiter import gemini_limiter
+from app.services.idempotency import idempotency_key
+from app.services.llm_service import parse_stats_summary, prompt_token_stats
+from app.services.ocr_service import aextract_text_from_image_url
+from app.routes.student import link_and_notify, process_submission, run_idempotent
+from app.models.schemas import JournalSubmission, NoteBatchUploadRequest, NoteUploadRequest
 
 router = APIRouter(prefix="/notes", tags=["notes"])
-
-class NoteUploadRequest(BaseModel):
-    student_id: str
-    file_url: str
-    journal_topic: str
+logger = logging.getLogger(__name__)
 
 @router.post("/upload")
-async def upload_note(request: NoteUploadRequest):
-    supabase = get_supabase_client()
+async def upload_note(
+    request: NoteUploadRequest, idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    # A retried upload of the same image replays the first response (or job_id)
+    key = idempotency_key(
+        "notes.upload", request.student_id, request.file_url, request.journal_topic,
+        header=idempotency_key_header,
+    )
+    return await run_idempotent(key, lambda: process_upload(request))
+
+
+async def process_upload(request: NoteUploadRequest) -> tuple:
+    if NOTES_UPLOAD_BACKGROUND:
+        # Job queue mode: OCR and scoring run on the background workers
+        job_id = services.upload_queue.enqueue(request.model_dump())
+        return 202, {"job_id": job_id, "status": "queued"}
+
+    if FUSED_OCR_SCORE:
+        return await upload_note_fused(request)
 
     try:
         # 1️⃣ Extract text from the image
-        extracted_text = extract_text_from_image_url(request.file_url)
+        extracted_text = await aextract_text_from_image_url(request.file_url)
 
         # 2️⃣ Insert record into Supabase
         payload = {
@@ -26,9 +45,12 @@ async def upload_note(request: NoteUploadRequest):
             "image_url": request.file_url,
             "extracted_text": extracted_text
         }
-        print(payload)
+        logger.info(
+            "journal transcribed",
+            extra={"student_id": request.student_id, "text_chars": len(extracted_text)},
+        )
 
-        supabase.table("journal_entries").insert(payload).execute()
+        await services.database.insert_journal_entry(**payload)
 
         submission_payload = JournalSubmission(
             student_id = request.student_id,
@@ -37,10 +59,39 @@ async def upload_note(request: NoteUploadRequest):
             journal_topic = request.journal_topic
         )
 
-        submission_result = await submit_journal(submission_payload)
-        print(submission_result)
+        await process_submission(submission_payload)
+
+        return 200, {
+            "student_id": request.student_id,
+            "image_url": request.file_url,
+            "extracted_text": extracted_text
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 
-        return {
+async def upload_note_fused(request: NoteUploadRequest):
+    """One model call for transcription and scoring, then the usual writes."""
+    try:
+        extracted_text, report = await services.learning_reports.generate_learning_report_from_image(
+            request.student_id, request.file_url, request.journal_topic
+        )
+        await services.database.insert_journal_entry(
+            student_id=request.student_id,
+            image_url=request.file_url,
+            extracted_text=extracted_text,
+        )
+        await link_and_notify(
+            JournalSubmission(
+                student_id=request.student_id,
+                journal=extracted_text,
+                image_url=request.file_url,
+                journal_topic=request.journal_topic,
+            ),
+            report,
+        )
+        return 200, {
             "student_id": request.student_id,
             "image_url": request.file_url,
             "extracted_text": extracted_text
@@ -48,3 +99,71 @@ async def upload_note(request: NoteUploadRequest):
 
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/upload_batch")
+async def upload_note_batch(
+    request: NoteBatchUploadRequest, idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    """OCR and score many journals at once; each item gets its own result or error."""
+    if len(request.items) > BATCH_UPLOAD_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"A batch can hold at most {BATCH_UPLOAD_MAX_ITEMS} items; split it into smaller batches",
+        )
+    # A retried batch replays the first response instead of appending every submission again
+    key = idempotency_key(
+        "notes.upload_batch", "",
+        *(field for item in request.items for field in (item.student_id, item.file_url, item.journal_topic)),
+        header=idempotency_key_header,
+    )
+    return await run_idempotent(key, lambda: process_batch(request))
+
+
+async def process_batch(request: NoteBatchUploadRequest) -> tuple:
+    try:
+        results = await services.batch_uploads.process(request.items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return 200, {"results": results}
+
+
+@router.get("/jobs/{job_id}")
+async def get_upload_job(job_id: str):
+    job = services.upload_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    state = job["state"]
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "stage": job["stage"],
+        "attempts": job["attempts"],
+        "error": job["error"],
+        "extracted_text": state.get("extracted_text"),
+        "report": state.get("report"),
+    }
+
+
+@router.get("/ocr_cache/stats")
+async def get_ocr_cache_stats():
+    return services.ocr_cache.stats()
+
+
+@router.get("/ocr_engine/stats")
+async def get_ocr_engine_stats():
+    """Pages read per engine and, for the cascade, how many escalated to Gemini and why."""
+    return services.ocr_engine.stats()
+
+
+@router.get("/gemini/stats")
+async def get_gemini_stats():
+    """Queue depth, retries and latency of calls through the shared Gemini limiter."""
+    return {**gemini_limiter.stats(), "prompt_tokens": prompt_token_stats, "parsing": parse_stats_summary(),
+            "fused": fused_stats}
+
+
+@router.get("/idempotency/stats")
+async def get_idempotency_stats():
+    """Uploads and submits executed, replayed from the store or coalesced onto an in-flight twin."""
+    return services.idempotency.stats()
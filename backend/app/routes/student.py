@@ -1,32 +1,81 @@
-from fastapi import APIRouter, HTTPException
+import logging
+from typing import Awaitable, Callable, Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from app.models.schemas import JournalSubmission
-from app.services.learning_report import LearningReportClass
-from app.services.linking_service import LinkingServiceClass
-from app.services.notification_service import NotificationService
+from app.services.idempotency import IdempotencyConflict, idempotency_key
+from app.services.container import services
 
 router = APIRouter(prefix="/student", tags=["Student"])
-lr = LearningReportClass()
-notifier = NotificationService()
-linking_service = LinkingServiceClass()
+logger = logging.getLogger(__name__)
+
+
+async def run_idempotent(key: str, handler: Callable[[], Awaitable[tuple]]) -> JSONResponse:
+    """Run ``handler`` once per key; duplicates get the first response back, marked as replayed."""
+    try:
+        (status_code, body), replayed = await services.idempotency.run(key, handler)
+    except IdempotencyConflict:
+        raise HTTPException(status_code=409, detail="The first request with this key did not finish; retry it")
+    headers = {"Idempotent-Replayed": "true"} if replayed else None
+    return JSONResponse(status_code=status_code, content=body, headers=headers)
 
 
 @router.post("/submit")
-async def submit_journal(payload: JournalSubmission):
-    print("Received payload:", payload)
-    report = await lr.generate_learning_report(payload.student_id, payload.journal, payload.journal_topic)
+async def submit_journal(
+    payload: JournalSubmission, idempotency_key_header: Optional[str] = Header(None, alias="Idempotency-Key")
+):
+    key = idempotency_key(
+        "student.submit", payload.student_id, payload.journal_topic, payload.image_url, payload.journal,
+        header=idempotency_key_header,
+    )
+    return await run_idempotent(key, lambda: process_submission(payload))
+
+
+async def process_submission(payload: JournalSubmission) -> tuple:
+    """Score a journal, append it to the student's history and notify their donor."""
+    logger.info(
+        "journal submitted",
+        extra={"student_id": payload.student_id, "journal_chars": len(payload.journal)},
+    )
+    report = await services.learning_reports.generate_learning_report(payload.student_id, payload.journal, payload.journal_topic)
     if report is None:
         raise HTTPException(status_code=500, detail="Report generation failed")
-    
-    print("Before calling linking service")
-    linking_service.ensure_student_donor_link(payload.student_id)
-    print("After calling linking service")
-    print("Before calling notifier")
+    await link_and_notify(payload, report)
+    return 200, jsonable_encoder({"message": "Journal submitted and report generated.", "report": report})
+
+
+async def link_and_notify(payload: JournalSubmission, report):
+    """Make sure the student has a donor and tell them about the new report."""
+    donor_id = await services.linking_service.ensure_student_donor_link(payload.student_id)
     resp_dict = report.model_dump()
-    notifier.notify_donor_of_new_report(
+    await services.notifier.notify_donor_of_new_report(
         student_id=payload.student_id,
         learning_report=resp_dict,
         image_url=payload.image_url,
         journal_topic=payload.journal_topic
     )
-    print("After calling notifier")
-    return {"message": "Journal submitted and report generated.", "report": report}
+    logger.info(
+        "donor notified", extra={"student_id": payload.student_id, "donor_id": donor_id}
+    )
+
+
+@router.get("/submissions/{student_id}")
+async def get_submissions(
+    student_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    before: Optional[int] = None,
+):
+    """Page through a student's journal history; pass next_before to get the next page."""
+    items = await services.database.get_submissions(student_id, limit=limit, before_seq=before)
+    next_before = items[-1].seq if len(items) == limit else None
+    return {"items": items, "next_before": next_before}
+
+
+@router.get("/analytics/{student_id}")
+async def get_progress_analytics(student_id: str, window: Optional[int] = Query(None, ge=1, le=50)):
+    """Per-category score series, rolling averages, slopes and percentile rank within the cohort."""
+    analytics = await services.progress_analytics.student_progress(student_id, window=window)
+    if analytics is None:
+        raise HTTPException(status_code=404, detail="No submissions for this student")
+    return analytics
@@ -0,0 +1,108 @@
+# app/services/batch_upload.py
+import asyncio
+from typing import List
+
+from app.models.schemas import NoteUploadRequest
+from app.services.container import services
+from app.services.ocr_service import aextract_text_from_image_url
+
+
+class BatchUploadService:
+    """Processes a class's worth of journal photos in one request.
+
+    OCR runs for every item at once (bounded by ``concurrency``). Scoring is
+    chained per student in submission order, so each report is compared with
+    the one saved just before it, while different students are scored in
+    parallel. journal_entries and notifications are written with one bulk
+    insert each; a failed insert is recorded on the items it covers, and
+    reports that were already saved are still returned.
+    """
+
+    def __init__(self, concurrency: int = 4):
+        self.concurrency = concurrency
+
+    async def process(self, items: List[NoteUploadRequest]) -> List[dict]:
+        slots = asyncio.Semaphore(self.concurrency)
+        results = [
+            {"index": i, "student_id": item.student_id, "image_url": item.file_url}
+            for i, item in enumerate(items)
+        ]
+
+        async def ocr(i: int, item: NoteUploadRequest):
+            try:
+                async with slots:
+                    results[i]["extracted_text"] = await aextract_text_from_image_url(
+                        item.file_url
+                    )
+            except Exception as e:
+                results[i]["error"] = str(e)
+
+        await asyncio.gather(*(ocr(i, item) for i, item in enumerate(items)))
+
+        transcribed = [r for r in results if "extracted_text" in r]
+        try:
+            await services.database.insert_journal_entries(
+                [
+                    {
+                        "student_id": r["student_id"],
+                        "image_url": r["image_url"],
+                        "extracted_text": r["extracted_text"],
+                    }
+                    for r in transcribed
+                ]
+            )
+        except Exception as e:
+            # Nothing is scored without its journal entry, as in /notes/upload
+            for r in transcribed:
+                r["error"] = f"Could not save journal entry: {e}"
+
+        by_student = {}
+        for i, item in enumerate(items):
+            if "extracted_text" in results[i] and "error" not in results[i]:
+                by_student.setdefault(item.student_id, []).append(i)
+
+        notifications, notified = [], []
+
+        async def score_student(student_id: str, indexes: List[int]):
+            try:
+                donor_id = await services.linking_service.ensure_student_donor_link(student_id)
+            except Exception as e:
+                for i in indexes:
+                    results[i]["error"] = str(e)
+                return
+            for i in indexes:
+                item = items[i]
+                try:
+                    async with slots:
+                        report = await services.learning_reports.generate_learning_report(
+                            student_id, results[i]["extracted_text"], item.journal_topic
+                        )
+                except Exception as e:
+                    results[i]["error"] = str(e)
+                    continue
+                results[i]["report"] = report.model_dump()
+                notified.append(i)
+                notifications.append(
+                    services.database.notification_row(
+                        donor_id=donor_id,
+                        student_id=student_id,
+                        learning_report=results[i]["report"],
+                        journal=item.file_url,
+                        journal_topic=item.journal_topic,
+                    )
+                )
+
+        await asyncio.gather(
+            *(score_student(sid, indexes) for sid, indexes in by_student.items())
+        )
+
+        try:
+            await services.notifier.insert_notifications(notifications)
+        except Exception as e:
+            # The reports are saved; only the donor notifications are missing
+            for i in notified:
+                results[i]["error"] = f"Report saved, but the donor was not notified: {e}"
+
+        for r in results:
+            r["status"] = "error" if "error" in r else "ok"
+        return results
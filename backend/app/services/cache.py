@@ -0,0 +1,116 @@
+# app/services/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ``ttl`` seconds.
+
+    ``on_evict(key, value)`` is called for entries dropped by the LRU bound or
+    found expired, outside the lock. With ``weigh(value)`` and ``max_weight``
+    the cache is also bounded by the summed weight of its entries (e.g. bytes).
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: Optional[float] = None,
+        on_evict: Optional[Callable[[Any, Any], None]] = None,
+        max_weight: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.max_weight = max_weight
+        self.weigh = weigh
+        self.weight = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None) -> Any:
+        expired = None
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.weight -= self._weigh(value)
+                self.evictions += 1
+                expired = value
+            self.misses += 1
+        if expired is not None and self.on_evict is not None:
+            self.on_evict(key, expired)
+        return default
+
+    def _weigh(self, value) -> int:
+        return self.weigh(value) if self.weigh is not None else 0
+
+    def _over(self) -> bool:
+        if len(self._data) > self.max_size:
+            return True
+        return self.max_weight is not None and self.weight > self.max_weight
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        weight = self._weigh(value)
+        if self.max_weight is not None and weight > self.max_weight:
+            # Too heavy to keep at all; storing it would only flush everything else
+            self.pop(key)
+            return
+        evicted = []
+        with self._lock:
+            replaced = self._data.get(key)
+            if replaced is not None:
+                self.weight -= self._weigh(replaced[0])
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            self.weight += weight
+            while self._over():
+                old_key, (old_value, old_expires) = self._data.popitem(last=False)
+                self.weight -= self._weigh(old_value)
+                evicted.append((old_key, (old_value, old_expires)))
+                self.evictions += 1
+        if self.on_evict is not None:
+            for old_key, (old_value, _) in evicted:
+                self.on_evict(old_key, old_value)
+
+    def delete(self, key):
+        self.pop(key)
+
+    def pop(self, key, default=None) -> Any:
+        """Remove and return an entry, expired or not, without counting a lookup."""
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.weight -= self._weigh(entry[0])
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            **({"weight": self.weight} if self.weigh is not None else {}),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
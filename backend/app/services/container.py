@@ -0,0 +1,144 @@
+# app/services/container.py
+import inspect
+import logging
+from functools import cached_property
+
+from app.config import BATCH_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+
+class Services:
+    """The process-wide service instances, each built on first use.
+
+    Routes and pipeline stages read ``services.<name>`` when they handle a
+    request, so importing them constructs nothing. The app's lifespan hook
+    calls ``start()`` to build everything, and the external clients, before
+    the first request, and ``close()`` shuts down only what was built.
+    Assigning ``services.<name>`` swaps an instance, as the benchmarks do.
+    The imports are local because several of these modules use
+    ``services`` themselves.
+    """
+
+    @cached_property
+    def database(self):
+        from app.services.supabase_service import DBServiceClass
+
+        return DBServiceClass()
+
+    @cached_property
+    def linking_service(self):
+        from app.services.linking_service import LinkingServiceClass
+
+        return LinkingServiceClass(db=self.database)
+
+    @cached_property
+    def notifier(self):
+        from app.services.notification_service import NotificationService
+
+        return NotificationService(db=self.database, linking_service=self.linking_service)
+
+    @cached_property
+    def learning_reports(self):
+        from app.services.learning_report import LearningReportClass
+
+        return LearningReportClass(db=self.database)
+
+    @cached_property
+    def batch_uploads(self):
+        from app.services.batch_upload import BatchUploadService
+
+        return BatchUploadService(concurrency=BATCH_CONCURRENCY)
+
+    @cached_property
+    def upload_queue(self):
+        from app.services.upload_pipeline import build_upload_queue
+
+        return build_upload_queue()
+
+    @cached_property
+    def idempotency(self):
+        from app.services.idempotency import build_idempotency
+
+        return build_idempotency()
+
+    @cached_property
+    def ocr_cache(self):
+        from app.services.ocr_service import build_ocr_cache
+
+        return build_ocr_cache()
+
+    @cached_property
+    def image_fetcher(self):
+        from app.services.ocr_service import build_image_fetcher
+
+        return build_image_fetcher()
+
+    @cached_property
+    def ocr_engine(self):
+        from app.services.ocr_service import build_ocr_engine
+
+        return build_ocr_engine()
+
+    @cached_property
+    def progress_analytics(self):
+        from app.services.progress_analytics import build_progress_analytics
+
+        return build_progress_analytics()
+
+    @cached_property
+    def assignment_engine(self):
+        from app.services.donor_assignment import build_assignment_engine
+
+        return build_assignment_engine()
+
+    @cached_property
+    def event_broker(self):
+        from app.services.event_broker import build_broker
+
+        return build_broker()
+
+    @cached_property
+    def response_cache(self):
+        from app.services.response_cache import build_response_cache
+
+        return build_response_cache()
+
+    async def start(self):
+        """Build every service and connect the external clients.
+
+        A missing credential or unreachable service is logged rather than
+        raised, so the app still starts and serves what it can; the calls
+        that need the client fail (and retry the connection) on their own.
+        """
+        from app.services.ocr_service import get_genai_client
+        from app.services.supabase_service import get_async_supabase_client
+
+        llm = self.learning_reports.llm
+        self.batch_uploads
+        self.notifier
+        for name, connect in (
+            ("supabase", get_async_supabase_client),
+            ("genai", get_genai_client),
+            ("generativeai", lambda: llm.model),
+        ):
+            try:
+                result = connect()
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning("client not initialised", extra={"client": name, "error": str(e)})
+
+    async def close(self):
+        """Stop and close the services that were built; the others are left unbuilt."""
+        built = self.__dict__
+        if "upload_queue" in built:
+            await self.upload_queue.stop()
+        for name in ("progress_analytics", "event_broker", "response_cache", "ocr_engine"):
+            if name in built:
+                await built[name].close()
+        if "image_fetcher" in built:
+            await self.image_fetcher.aclose()
+
+
+services = Services()
@@ -0,0 +1,180 @@
+# app/services/donor_assignment.py
+import asyncio
+import heapq
+import random
+import time
+from typing import List, Optional
+
+from app.config import (
+    DONOR_ASSIGNMENT_STRATEGY,
+    DONOR_DEFAULT_CAPACITY,
+    DONOR_INDEX_TTL,
+)
+from app.services.supabase_service import DBServiceClass
+
+STRATEGIES = ("random", "fewest_linked", "capacity")
+
+
+class FenwickTree:
+    """Prefix sums over non-negative weights with O(log n) update and sampling."""
+
+    def __init__(self, weights: List[int]):
+        self.size = len(weights)
+        self.tree = [0] + list(weights)
+        for i in range(1, self.size + 1):
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+        self.total = sum(weights)
+        self._top = 1 << max(self.size.bit_length() - 1, 0)
+
+    def add(self, i: int, delta: int):
+        self.total += delta
+        i += 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def find(self, target: int) -> int:
+        """Index whose cumulative weight range contains ``target`` (0 <= target < total)."""
+        pos, step = 0, self._top
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return pos
+
+
+class DonorIndex:
+    """Donors with their linked-student counts, indexed for every strategy.
+
+    Built once from the donors table. After that every pick and every new
+    link costs O(1) or O(log n):
+    - random: uniform choice from the id list.
+    - fewest_linked: min-heap on load, with stale entries skipped lazily.
+    - capacity: weighted draw over remaining slots, kept in a Fenwick tree.
+    """
+
+    def __init__(self, rows: List[dict], default_capacity: int = 10):
+        self.ids = [row["id"] for row in rows]
+        self.positions = {donor_id: i for i, donor_id in enumerate(self.ids)}
+        self.loads = [row.get("linked_students") or 0 for row in rows]
+        self.capacities = [
+            row["capacity"] if row.get("capacity") is not None else default_capacity
+            for row in rows
+        ]
+        self.heap = [(load, i) for i, load in enumerate(self.loads)]
+        heapq.heapify(self.heap)
+        self.slots = FenwickTree(
+            [max(cap - load, 0) for cap, load in zip(self.capacities, self.loads)]
+        )
+
+    def __len__(self):
+        return len(self.ids)
+
+    def pick(self, strategy: str) -> str:
+        if not self.ids:
+            raise RuntimeError("No donors available")
+        if strategy == "fewest_linked":
+            while self.heap[0][0] != self.loads[self.heap[0][1]]:
+                heapq.heappop(self.heap)
+            return self.ids[self.heap[0][1]]
+        if strategy == "capacity" and self.slots.total > 0:
+            return self.ids[self.slots.find(random.randrange(self.slots.total))]
+        # Plain random, and the fallback once every donor is at capacity
+        return self.ids[random.randrange(len(self.ids))]
+
+    def record_link(self, donor_id: str, delta: int = 1):
+        i = self.positions.get(donor_id)
+        if i is None:
+            # Donor joined after the last refresh; picked up by the next one
+            return
+        before = max(self.capacities[i] - self.loads[i], 0)
+        self.loads[i] += delta
+        heapq.heappush(self.heap, (self.loads[i], i))
+        after = max(self.capacities[i] - self.loads[i], 0)
+        if after != before:
+            self.slots.add(i, after - before)
+
+    def stats(self) -> dict:
+        return {
+            "donors": len(self.ids),
+            "linked_students": sum(self.loads),
+            "free_slots": self.slots.total,
+            "max_load": max(self.loads, default=0),
+            "min_load": min(self.loads, default=0),
+        }
+
+
+class DonorAssignmentEngine:
+    """Chooses a donor for a newly linked student without reading all donors per pick.
+
+    The index is loaded from the donors table (``linked_students`` is kept
+    up to date by a trigger, see migrations/002) and rebuilt after
+    ``ttl`` seconds. Links made in this process update it in between.
+    """
+
+    def __init__(
+        self,
+        strategy: str = "random",
+        ttl: Optional[float] = 600,
+        default_capacity: int = 10,
+        db: Optional[DBServiceClass] = None,
+        page_size: int = 1000,
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown donor assignment strategy: {strategy}")
+        self.strategy = strategy
+        self.ttl = ttl
+        self.default_capacity = default_capacity
+        self.db = db or DBServiceClass()
+        self.page_size = page_size
+        self.index: Optional[DonorIndex] = None
+        self.loaded_at = 0.0
+        self.refreshes = 0
+        self.picks = 0
+        self._lock = asyncio.Lock()
+
+    def _stale(self) -> bool:
+        if self.index is None:
+            return True
+        return bool(self.ttl) and time.monotonic() - self.loaded_at > self.ttl
+
+    async def refresh(self):
+        rows = await self.db.get_donor_loads(page_size=self.page_size)
+        self.index = DonorIndex(rows, self.default_capacity)
+        self.loaded_at = time.monotonic()
+        self.refreshes += 1
+
+    async def pick_donor(self) -> str:
+        if self._stale():
+            async with self._lock:
+                if self._stale():
+                    await self.refresh()
+        self.picks += 1
+        return self.index.pick(self.strategy)
+
+    def record_link(self, donor_id: str):
+        if self.index is not None:
+            self.index.record_link(donor_id)
+
+    def invalidate(self):
+        self.index = None
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "picks": self.picks,
+            "refreshes": self.refreshes,
+            **(self.index.stats() if self.index else {}),
+        }
+
+
+def build_assignment_engine() -> DonorAssignmentEngine:
+    return DonorAssignmentEngine(
+        strategy=DONOR_ASSIGNMENT_STRATEGY,
+        ttl=DONOR_INDEX_TTL,
+        default_capacity=DONOR_DEFAULT_CAPACITY,
+    )
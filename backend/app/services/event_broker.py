@@ -0,0 +1,114 @@
+# app/services/event_broker.py
+import asyncio
+import json
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from app.config import EVENT_BROKER_URL, EVENT_QUEUE_SIZE
+
+
+def donor_channel(donor_id: str) -> str:
+    return f"donor:{donor_id}"
+
+
+class InMemoryBroker:
+    """Pub/sub within one process: every subscriber gets its own bounded queue.
+
+    A subscriber that falls behind loses its oldest events rather than
+    blocking publishers.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self.queue_size = queue_size
+        self.subscribers = defaultdict(set)
+        self.published = 0
+        self.dropped = 0
+
+    async def publish(self, channel: str, event: dict):
+        self.deliver(channel, event)
+
+    def deliver(self, channel: str, event: dict):
+        self.published += 1
+        for queue in list(self.subscribers.get(channel, ())):
+            if queue.full():
+                queue.get_nowait()
+                self.dropped += 1
+            queue.put_nowait(event)
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self.subscribers[channel].add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers[channel].discard(queue)
+            if not self.subscribers[channel]:
+                del self.subscribers[channel]
+
+    async def close(self):
+        self.subscribers.clear()
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self).__name__,
+            "channels": len(self.subscribers),
+            "subscribers": sum(len(s) for s in self.subscribers.values()),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+class RedisBroker(InMemoryBroker):
+    """Shares events between uvicorn workers through Redis pub/sub.
+
+    Events are published to Redis only. One listener per process receives
+    every ``donor:*`` message and fans it out to that process's local
+    subscribers, so an event reaches each subscriber exactly once.
+    Requires the ``redis`` package.
+    """
+
+    def __init__(self, url: str, queue_size: int = 100):
+        super().__init__(queue_size)
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self._listener: Optional[asyncio.Task] = None
+
+    async def publish(self, channel: str, event: dict):
+        await self.redis.publish(channel, json.dumps(event))
+
+    async def _listen(self):
+        pubsub = self.redis.pubsub()
+        await pubsub.psubscribe(donor_channel("*"))
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "pmessage":
+                    channel = message["channel"]
+                    if isinstance(channel, bytes):
+                        channel = channel.decode()
+                    self.deliver(channel, json.loads(message["data"]))
+        finally:
+            await pubsub.aclose()
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str):
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        async with super().subscribe(channel) as queue:
+            yield queue
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        await super().close()
+        await self.redis.aclose()
+
+
+def build_broker(url: str = EVENT_BROKER_URL, queue_size: int = EVENT_QUEUE_SIZE) -> InMemoryBroker:
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBroker(url, queue_size)
+    return InMemoryBroker(queue_size)
+
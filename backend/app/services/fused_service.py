@@ -0,0 +1,98 @@
+# app/services/fused_service.py
+import asyncio
+from functools import cached_property
+from typing import Optional, Tuple
+
+from app.config import FUSED_MODEL
+from app.services.gemini_limiter import gemini_limiter
+from app.services.llm_service import LLMClass
+from app.services.telemetry import span
+from app.services.ocr_service import (
+    aload_image_bytes,
+    get_genai_client,
+    lookup_cached_text,
+    model_image,
+)
+
+# Counters for fused calls and how often they fell back to text-only scoring
+fused_stats = {"calls": 0, "ocr_cache_hits": 0, "rescored": 0}
+
+
+class FusedOCRScoringClass:
+    """Transcribes and scores a journal photo in one multimodal Gemini call.
+
+    The prompt reuses the scoring prefix and previous-report summary from
+    LLMClass and asks for the transcription alongside the report. When the
+    photo was already transcribed (OCR cache hit) only the text is scored.
+    A transcription without a valid report is scored again as text. A
+    response without a transcription raises ValueError so callers can fall
+    back to the two-call path.
+    """
+
+    def __init__(self, llm: Optional[LLMClass] = None, model: str = FUSED_MODEL):
+        self.llm = llm or LLMClass()
+        self.model = model
+        schema = self.llm.response_schema()
+        schema["properties"] = {"transcription": {"type": "string"}, **schema["properties"]}
+        schema["required"] = ["transcription", *schema["required"]]
+        self.schema = schema
+
+    @cached_property
+    def config(self):
+        from google.genai import types
+
+        return types.GenerateContentConfig(
+            response_mime_type="application/json",
+            response_json_schema=self.schema,
+        )
+
+    def build_prompt(self, previous_report: Optional[dict], journal_topic: str) -> str:
+        return f"""{self.llm.prompt_prefix}
+
+The new journal entry is the handwritten page in the image. Before scoring,
+transcribe all of its handwritten text into "transcription" as a single
+paragraph, exactly as written: do not correct spelling or grammar and do not
+add commentary.
+
+Journal Topic:
+{journal_topic}
+
+Previous Report:
+{self.llm.summarize_report(previous_report)}"""
+
+    async def atranscribe_and_score(
+        self, file_url: str, previous_report: Optional[dict], journal_topic: str
+    ) -> Tuple[str, dict]:
+        image_bytes = await aload_image_bytes(file_url)
+
+        text = lookup_cached_text(image_bytes)
+        if text is not None:
+            fused_stats["ocr_cache_hits"] += 1
+            report = await self.llm.aget_updated_learning_report(text, previous_report, journal_topic)
+            return text, report
+
+        contents = [
+            await asyncio.to_thread(model_image, image_bytes),
+            self.build_prompt(previous_report, journal_topic),
+        ]
+        try:
+            with span("fused.model"):
+                response = await gemini_limiter.run(
+                    lambda: get_genai_client().aio.models.generate_content(
+                        model=self.model, contents=contents, config=self.config
+                    )
+                )
+        except Exception as e:
+            raise ValueError(f"Gemini fused OCR Error: {e}")
+        fused_stats["calls"] += 1
+
+        data = self.llm.load_json(getattr(response, "text", None) or "")
+        text = data.pop("transcription", None)
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("No text extracted from the image.")
+
+        report, missing, _ = self.llm.validate_report(data)
+        if missing:
+            fused_stats["rescored"] += 1
+            report = await self.llm.aget_updated_learning_report(text, previous_report, journal_topic)
+        return text, report
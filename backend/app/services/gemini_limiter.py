@@ -0,0 +1,138 @@
+# app/services/gemini_limiter.py
+import asyncio
+import random
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Optional
+
+from app.config import (
+    GEMINI_BACKOFF,
+    GEMINI_MAX_ATTEMPTS,
+    GEMINI_MAX_CONCURRENCY,
+    GEMINI_RPM,
+    GEMINI_TIMEOUT,
+)
+
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+def is_retryable(error: Exception) -> bool:
+    """Timeouts, rate limits and 5xx from either Gemini SDK are worth another try."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    # google.api_core exceptions and google.genai APIError both carry the HTTP status as .code
+    return getattr(error, "code", None) in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute: float, capacity: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class GeminiLimiter:
+    """Shared gate for every Gemini call: bounded concurrency, a requests-per-minute
+    token bucket, per-call timeouts and jittered exponential backoff on retryable errors.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        requests_per_minute: float = 0,
+        timeout: float = 30.0,
+        max_attempts: int = 3,
+        backoff_base: float = 1.0,
+    ):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.bucket = (
+            TokenBucket(requests_per_minute, max_concurrency) if requests_per_minute else None
+        )
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.waiting = 0
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.latencies = deque(maxlen=1000)
+
+    @asynccontextmanager
+    async def slot(self):
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            if self.bucket:
+                await self.bucket.acquire()
+            self.in_flight += 1
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+
+    async def run(self, make_call: Callable[[], Awaitable], timeout: Optional[float] = None):
+        """Await ``make_call()`` under the limiter, retrying retryable failures."""
+        for attempt in range(1, self.max_attempts + 1):
+            async with self.slot():
+                start = time.perf_counter()
+                try:
+                    result = await asyncio.wait_for(make_call(), timeout or self.timeout)
+                    self.calls += 1
+                    self.latencies.append(time.perf_counter() - start)
+                    return result
+                except Exception as e:
+                    self.errors += 1
+                    if isinstance(e, asyncio.TimeoutError):
+                        self.timeouts += 1
+                    if attempt == self.max_attempts or not is_retryable(e):
+                        raise
+            self.retries += 1
+            await asyncio.sleep(self.backoff_base * 2 ** (attempt - 1) * random.uniform(0.5, 1.5))
+
+    def stats(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float):
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 4)
+
+        return {
+            "queue_depth": self.waiting,
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "errors": self.errors,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "latency_p50": percentile(0.50),
+            "latency_p95": percentile(0.95),
+            "latency_max": round(latencies[-1], 4) if latencies else None,
+        }
+
+
+gemini_limiter = GeminiLimiter(
+    max_concurrency=GEMINI_MAX_CONCURRENCY,
+    requests_per_minute=GEMINI_RPM,
+    timeout=GEMINI_TIMEOUT,
+    max_attempts=GEMINI_MAX_ATTEMPTS,
+    backoff_base=GEMINI_BACKOFF,
+)
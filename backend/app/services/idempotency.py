@@ -0,0 +1,212 @@
+# app/services/idempotency.py
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import IDEMPOTENCY_DB, IDEMPOTENCY_PENDING_TIMEOUT, IDEMPOTENCY_TTL
+
+logger = logging.getLogger(__name__)
+
+# A handler returns the status code and JSON body to store for the key
+Response = Tuple[int, dict]
+
+
+class IdempotencyConflict(Exception):
+    """Another worker claimed the same key and gave it up without storing a result."""
+
+
+def idempotency_key(scope: str, student_id: str, *parts: str, header: Optional[str] = None) -> str:
+    """
+    A client-supplied ``Idempotency-Key`` is scoped to the endpoint and student;
+    without one the key is derived from the request fields that identify the work.
+    """
+    kind, values = ("hdr", (header,)) if header else ("req", parts)
+    digest = hashlib.sha256(student_id.encode())
+    for value in values:
+        digest.update(b"\0")
+        digest.update((value or "").encode())
+    return f"{scope}:{kind}:{digest.hexdigest()}"
+
+
+class SQLiteIdempotencyStore:
+    """Completed responses and in-progress claims, shared by workers on the same host."""
+
+    def __init__(self, path: str = ":memory:", ttl: float = 86400, pending_timeout: float = 30):
+        self.ttl = ttl
+        self.pending_timeout = pending_timeout
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("pragma journal_mode=wal")
+        self.conn.execute(
+            """
+            create table if not exists idempotency_keys (
+                key text primary key,
+                status text not null,
+                status_code integer,
+                response text,
+                expires_at real not null
+            )
+            """
+        )
+        self.conn.commit()
+
+    def get(self, key: str) -> Optional[Response]:
+        with self.lock:
+            row = self.conn.execute(
+                "select status_code, response from idempotency_keys"
+                " where key = ? and status = 'done' and expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def claim(self, key: str) -> bool:
+        """Record that this worker is processing ``key``; False if someone else already is."""
+        now = time.time()
+        with self.lock:
+            # Expired results and claims abandoned by a crashed worker can be taken over
+            self.conn.execute(
+                "delete from idempotency_keys where key = ? and expires_at <= ?", (key, now)
+            )
+            cur = self.conn.execute(
+                "insert or ignore into idempotency_keys (key, status, expires_at)"
+                " values (?, 'pending', ?)",
+                (key, now + self.pending_timeout),
+            )
+            self.conn.commit()
+        return cur.rowcount == 1
+
+    def renew(self, key: str) -> bool:
+        """Push back the expiry of the pending claim on ``key``; False if it is gone."""
+        with self.lock:
+            cur = self.conn.execute(
+                "update idempotency_keys set expires_at = ? where key = ? and status = 'pending'",
+                (time.time() + self.pending_timeout, key),
+            )
+            self.conn.commit()
+        return cur.rowcount == 1
+
+    def complete(self, key: str, response: Response):
+        status_code, body = response
+        with self.lock:
+            self.conn.execute(
+                "update idempotency_keys set status = 'done', status_code = ?, response = ?,"
+                " expires_at = ? where key = ?",
+                (status_code, json.dumps(body), time.time() + self.ttl, key),
+            )
+            self.conn.commit()
+
+    def release(self, key: str):
+        """Drop a claim whose request failed so the client can retry it."""
+        with self.lock:
+            self.conn.execute(
+                "delete from idempotency_keys where key = ? and status = 'pending'", (key,)
+            )
+            self.conn.commit()
+
+    def purge(self) -> int:
+        with self.lock:
+            cur = self.conn.execute(
+                "delete from idempotency_keys where expires_at <= ?", (time.time(),)
+            )
+            self.conn.commit()
+        return cur.rowcount
+
+
+class IdempotencyService:
+    """
+    Runs each request key at most once. Duplicates that arrive while the first
+    request is still running wait on its result; later ones get the stored response.
+    Failures are not stored, so a retry after an error does the work again.
+    The claim is renewed while the handler runs, so ``pending_timeout`` only
+    bounds how long a crashed worker's key stays blocked, not how long the
+    work may take.
+    """
+
+    def __init__(self, store: SQLiteIdempotencyStore, poll_interval: float = 0.2):
+        self.store = store
+        self.poll_interval = poll_interval
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.counters = {"executed": 0, "replayed": 0, "coalesced": 0, "conflicts": 0}
+
+    async def run(self, key: str, handler: Callable[[], Awaitable[Response]]) -> Tuple[Response, bool]:
+        """Return ``(response, replayed)``; ``replayed`` is False only for the call that did the work."""
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(pending), True
+
+        stored = self.store.get(key)
+        if stored is not None:
+            self.counters["replayed"] += 1
+            return stored, True
+
+        if not self.store.claim(key):
+            # Claimed by another worker process: wait for it to finish
+            self.counters["coalesced"] += 1
+            return await self._wait_for_other_worker(key), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        heartbeat = asyncio.create_task(self._heartbeat(key))
+        try:
+            response = await handler()
+        except BaseException as e:
+            self.store.release(key)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # Mark retrieved so a lone caller does not log "exception never retrieved"
+                future.exception()
+            raise
+        else:
+            status_code, _ = response
+            if 200 <= status_code < 300:
+                self.store.complete(key, response)
+            else:
+                self.store.release(key)
+            future.set_result(response)
+            self.counters["executed"] += 1
+            return response, False
+        finally:
+            heartbeat.cancel()
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {**self.counters, "in_flight": len(self._inflight)}
+
+    async def _heartbeat(self, key: str):
+        while True:
+            await asyncio.sleep(self.store.pending_timeout / 3)
+            if not self.store.renew(key):
+                logger.warning("idempotency claim lost", extra={"key": key})
+                return
+
+    async def _wait_for_other_worker(self, key: str) -> Response:
+        # The other worker renews its claim while it runs, so wait until it
+        # stores a result, releases the claim or stops renewing it
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            stored = self.store.get(key)
+            if stored is not None:
+                return stored
+            if self.store.claim(key):
+                # The other worker failed, or died and its claim expired
+                self.store.release(key)
+                break
+        self.counters["conflicts"] += 1
+        logger.warning("idempotency key released without a result", extra={"key": key})
+        raise IdempotencyConflict(key)
+
+
+def build_idempotency() -> IdempotencyService:
+    return IdempotencyService(
+        SQLiteIdempotencyStore(
+            IDEMPOTENCY_DB, ttl=IDEMPOTENCY_TTL, pending_timeout=IDEMPOTENCY_PENDING_TIMEOUT
+        )
+    )
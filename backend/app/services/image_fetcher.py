@@ -0,0 +1,111 @@
+# app/services/image_fetcher.py
+from typing import Optional
+
+import httpx
+
+from app.services.cache import TTLCache
+
+
+class ImageTooLargeError(ValueError):
+    pass
+
+
+class ImageFetcher:
+    """Downloads journal images over shared keep-alive connection pools.
+
+    Bodies are streamed and abandoned as soon as they exceed ``max_bytes``.
+    Responses carrying an ETag are remembered so repeat fetches of the same
+    URL become conditional requests that usually come back as 304. The
+    remembered bodies are bounded by ``etag_cache_bytes`` in total as well as
+    by ``etag_cache_size`` entries.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 15 * 1024 * 1024,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 20.0,
+        max_connections: int = 20,
+        etag_cache_size: int = 32,
+        etag_cache_bytes: int = 32 * 1024 * 1024,
+    ):
+        self.max_bytes = max_bytes
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self.etags = TTLCache(
+            max_size=etag_cache_size, max_weight=etag_cache_bytes, weigh=lambda entry: len(entry[1])
+        )
+        self.client = httpx.Client(
+            timeout=self.timeout, limits=self.limits, follow_redirects=True
+        )
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                timeout=self.timeout, limits=self.limits, follow_redirects=True
+            )
+        return self._async_client
+
+    def _conditional(self, url: str):
+        """Request headers plus the cached (etag, content) they were built from."""
+        cached = self.etags.get(url)
+        return ({"If-None-Match": cached[0]} if cached else {}), cached
+
+    def _check_length(self, response: httpx.Response):
+        length = response.headers.get("Content-Length")
+        if length and int(length) > self.max_bytes:
+            raise ImageTooLargeError(
+                f"Image is {length} bytes, limit is {self.max_bytes}"
+            )
+
+    def _append(self, body: bytearray, chunk: bytes):
+        body.extend(chunk)
+        if len(body) > self.max_bytes:
+            raise ImageTooLargeError(f"Image exceeds {self.max_bytes} bytes")
+
+    def _finish(self, url: str, response: httpx.Response, body: bytearray) -> bytes:
+        content = bytes(body)
+        etag = response.headers.get("ETag")
+        if etag:
+            self.etags.set(url, (etag, content))
+        return content
+
+    def fetch(self, url: str) -> bytes:
+        headers, cached = self._conditional(url)
+        with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached:
+                # Drain the empty body so the connection goes back to the pool
+                response.read()
+                return cached[1]
+            response.raise_for_status()
+            self._check_length(response)
+            body = bytearray()
+            for chunk in response.iter_bytes():
+                self._append(body, chunk)
+            return self._finish(url, response, body)
+
+    async def afetch(self, url: str) -> bytes:
+        headers, cached = self._conditional(url)
+        async with self.async_client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 304 and cached:
+                await response.aread()
+                return cached[1]
+            response.raise_for_status()
+            self._check_length(response)
+            body = bytearray()
+            async for chunk in response.aiter_bytes():
+                self._append(body, chunk)
+            return self._finish(url, response, body)
+
+    def close(self):
+        self.client.close()
+
+    async def aclose(self):
+        self.client.close()
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
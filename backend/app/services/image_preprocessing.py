@@ -0,0 +1,88 @@
+# app/services/image_preprocessing.py
+from contextlib import contextmanager
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Tuple
+
+
+class InvalidImageError(ValueError):
+    """The upload is not an image Pillow can decode."""
+
+
+@contextmanager
+def decoding():
+    """Report Pillow's decode failures (unknown format, truncated data) as InvalidImageError.
+
+    Only wrap decoding: Pillow raises these as OSError, which would also match
+    network and timeout errors.
+    """
+    try:
+        yield
+    except OSError as e:
+        raise InvalidImageError(f"Invalid image format or corrupted file: {e}") from e
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    max_long_edge: int = 1600
+    grayscale: bool = True
+    autocontrast: bool = True
+    format: str = "JPEG"  # JPEG or WEBP
+    quality: int = 80
+
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+# EXIF orientation tag values and the PIL transpose that puts the page upright
+_ORIENTATION_TRANSPOSE = {
+    2: "FLIP_LEFT_RIGHT",
+    3: "ROTATE_180",
+    4: "FLIP_TOP_BOTTOM",
+    5: "TRANSPOSE",
+    6: "ROTATE_270",
+    7: "TRANSVERSE",
+    8: "ROTATE_90",
+}
+
+
+def _draft_size(size: Tuple[int, int], max_long_edge: int) -> Tuple[int, int]:
+    """Smallest size with the original aspect ratio whose long edge fits the target."""
+    width, height = size
+    scale = max_long_edge / max(width, height)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+
+def preprocess_image(image_bytes: bytes, config: PreprocessConfig) -> Tuple[bytes, str]:
+    """
+    Shrink a journal photo before OCR.
+    Args:
+        image_bytes: Encoded image as uploaded
+        config: Target size, colour and encoding
+    Returns:
+        (encoded bytes, mime type)
+    """
+    # Imported here so that loading the app does not pay for Pillow
+    from PIL import Image, ImageOps
+
+    with decoding():
+        image = Image.open(BytesIO(image_bytes))
+        orientation = image.getexif().get(0x0112)
+        mode = "L" if config.grayscale else "RGB"
+
+        if max(image.size) > config.max_long_edge:
+            # For JPEGs this makes the decoder scale by 1/2, 1/4 or 1/8 in the DCT
+            # domain, so a 12MP photo is never fully decoded just to be shrunk
+            image.draft(mode, _draft_size(image.size, config.max_long_edge))
+
+        # Shrink before rotating so the transpose only touches the small image
+        image = image.convert(mode)
+    image.thumbnail((config.max_long_edge, config.max_long_edge), Image.LANCZOS, reducing_gap=2.0)
+    if orientation in _ORIENTATION_TRANSPOSE:
+        image = image.transpose(Image.Transpose[_ORIENTATION_TRANSPOSE[orientation]])
+
+    if config.autocontrast:
+        image = ImageOps.autocontrast(image, cutoff=1)
+
+    out = BytesIO()
+    image.save(out, format=config.format, quality=config.quality, optimize=True)
+    return out.getvalue(), MIME_TYPES[config.format]
@@ -0,0 +1,264 @@
+# app/services/job_queue.py
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+from app.services.telemetry import request_id_var, span
+
+logger = logging.getLogger(__name__)
+
+# A stage takes the job's accumulated state and returns fields to merge into it
+Stage = Tuple[str, Callable[[dict], Awaitable[dict]]]
+
+
+class SQLiteJobStore:
+    """Job persistence in a local SQLite file, so the queue needs no external services.
+
+    Several processes may share the file. A claimed job is leased to one
+    worker until ``lease_until``; the worker renews the lease while it runs,
+    and a job whose lease lapsed (its worker died) can be claimed again.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute(
+            """
+            create table if not exists jobs (
+                id text primary key,
+                status text not null,
+                stage text,
+                attempts integer not null default 0,
+                state text not null,
+                error text,
+                available_at real not null,
+                created_at real not null,
+                updated_at real not null,
+                lease_owner text,
+                lease_until real
+            )
+            """
+        )
+        columns = {row["name"] for row in self.conn.execute("pragma table_info(jobs)")}
+        for column, kind in (("lease_owner", "text"), ("lease_until", "real")):
+            if column not in columns:
+                self.conn.execute(f"alter table jobs add column {column} {kind}")
+        self.conn.execute(
+            "create index if not exists jobs_queued on jobs (status, available_at)"
+        )
+        self.conn.commit()
+
+    def _row_to_job(self, row) -> dict:
+        job = dict(row)
+        job["state"] = json.loads(job["state"])
+        return job
+
+    def enqueue(self, state: dict, stage: str) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "insert into jobs (id, status, stage, state, available_at, created_at, updated_at)"
+                " values (?, 'queued', ?, ?, ?, ?, ?)",
+                (job_id, stage, json.dumps(state), now, now, now),
+            )
+            self.conn.commit()
+        return job_id
+
+    def claim(self, owner: str, lease: float) -> Optional[dict]:
+        """Lease the oldest runnable job to ``owner`` and return it.
+
+        Runnable means queued and due, or running with a lapsed lease. The
+        pick and the status change are one conditional statement, so two
+        processes cannot claim the same row.
+        """
+        now = time.time()
+        runnable = (
+            "(status = 'queued' and available_at <= :now)"
+            " or (status = 'running' and coalesce(lease_until, 0) < :now)"
+        )
+        with self.lock:
+            row = self.conn.execute(
+                "update jobs set status = 'running', lease_owner = :owner, lease_until = :until,"
+                " updated_at = :now"
+                f" where id = (select id from jobs where {runnable} order by created_at limit 1)"
+                f" and ({runnable})"
+                " returning *",
+                {"now": now, "owner": owner, "until": now + lease},
+            ).fetchone()
+            self.conn.commit()
+        return self._row_to_job(row) if row else None
+
+    def renew(self, job_id: str, owner: str, lease: float) -> bool:
+        """Extend ``owner``'s lease; False if the job was taken over or is no longer running."""
+        now = time.time()
+        with self.lock:
+            cursor = self.conn.execute(
+                "update jobs set lease_until = ?, updated_at = ?"
+                " where id = ? and status = 'running' and lease_owner = ?",
+                (now + lease, now, job_id, owner),
+            )
+            self.conn.commit()
+        return cursor.rowcount == 1
+
+    def update(self, job_id: str, owner: Optional[str] = None, **fields) -> bool:
+        """Write ``fields``; with ``owner``, only while that worker still holds the lease."""
+        if "state" in fields:
+            fields["state"] = json.dumps(fields["state"])
+        fields["updated_at"] = time.time()
+        columns = ", ".join(f"{key} = ?" for key in fields)
+        where, params = "id = ?", [job_id]
+        if owner is not None:
+            where += " and lease_owner = ?"
+            params.append(owner)
+        with self.lock:
+            cursor = self.conn.execute(
+                f"update jobs set {columns} where {where}", (*fields.values(), *params)
+            )
+            self.conn.commit()
+        return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[dict]:
+        with self.lock:
+            row = self.conn.execute("select * from jobs where id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+
+class JobQueue:
+    """Runs each job through an ordered list of stages on a pool of asyncio workers.
+
+    Stage output is persisted after every stage, so a failed stage is retried
+    with jittered exponential backoff without repeating the stages before it.
+    A running job is leased for ``lease`` seconds and renewed every third of
+    that; if this process dies, another one resumes the job at its stage once
+    the lease lapses. A worker that loses its lease stops without writing.
+    """
+
+    def __init__(
+        self,
+        stages: List[Stage],
+        store: SQLiteJobStore,
+        workers: int = 4,
+        max_attempts: int = 3,
+        backoff_base: float = 1.0,
+        poll_interval: float = 1.0,
+        lease: float = 60.0,
+    ):
+        self.stages = stages
+        self.store = store
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.owner = uuid.uuid4().hex
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, state: dict) -> str:
+        # Logs from the workers carry the id of the request that queued the job
+        state = {**state, "request_id": request_id_var.get()}
+        job_id = self.store.enqueue(state, stage=self.stages[0][0])
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.store.get(job_id)
+
+    async def _worker(self):
+        failures = 0
+        while True:
+            try:
+                job = self.store.claim(self.owner, self.lease)
+                if job is None:
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                await self._run(job)
+                failures = 0
+            except Exception as e:
+                # A locked or full database must not end the worker; a job it held
+                # is picked up again once its lease runs out
+                failures += 1
+                delay = min(self.poll_interval * 2 ** failures, 30.0)
+                logger.exception("job worker error", extra={"error": str(e), "retry_in": delay})
+                await asyncio.sleep(delay)
+
+    async def _heartbeat(self, job_id: str, lost: asyncio.Event):
+        while True:
+            await asyncio.sleep(self.lease / 3)
+            if not self.store.renew(job_id, self.owner, self.lease):
+                lost.set()
+                return
+
+    async def _run(self, job: dict):
+        lost = asyncio.Event()
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"], lost))
+        try:
+            await self._run_stages(job, lost)
+        finally:
+            heartbeat.cancel()
+
+    async def _run_stages(self, job: dict, lost: asyncio.Event):
+        names = [name for name, _ in self.stages]
+        state = job["state"]
+        request_id_var.set(state.get("request_id") or job["id"])
+        owner = self.owner
+
+        def save(**fields) -> bool:
+            if lost.is_set() or not self.store.update(job["id"], owner=owner, **fields):
+                logger.warning("job lease lost, leaving it to its new owner", extra={"job_id": job["id"]})
+                return False
+            return True
+
+        for name, stage in self.stages[names.index(job["stage"]):]:
+            if not save(stage=name):
+                return
+            try:
+                with span(f"job.{name}"):
+                    state.update(await stage(state))
+            except Exception as e:
+                attempts = job["attempts"] + 1
+                logger.warning(
+                    "job stage failed",
+                    extra={"job_id": job["id"], "stage": name, "attempt": attempts, "error": str(e)},
+                )
+                if attempts >= self.max_attempts:
+                    save(status="failed", attempts=attempts, error=str(e), state=state, lease_owner=None)
+                    return
+                delay = self.backoff_base * 2 ** (attempts - 1) * random.uniform(0.5, 1.5)
+                save(
+                    status="queued",
+                    attempts=attempts,
+                    error=str(e),
+                    state=state,
+                    available_at=time.time() + delay,
+                    lease_owner=None,
+                )
+                return
+            # Attempts are counted per stage
+            job["attempts"] = 0
+            if not save(attempts=0, error=None, state=state):
+                return
+        save(status="succeeded", stage=None, lease_owner=None)
@@ -1,34 +1,76 @@
+import logging
+from typing import Tuple
 from app.services.supabase_service import DBServiceClass
 from app.services.llm_service import LLMClass
 from app.models.schemas import LearningReportResponse
-from app.services.notification_service import NotificationService
-from app.services.linking_service import LinkingServiceClass
+from app.services.fused_service import FusedOCRScoringClass
+from app.services.ocr_service import aextract_text_from_image_url
+from app.services.container import services
+
+logger = logging.getLogger(__name__)
 
 
 class LearningReportClass:
-    def __init__(self):
-        self.db = DBServiceClass()
+    def __init__(self, db=None):
+        self.db = db or DBServiceClass()
         self.llm = LLMClass()
-        self.notifier = NotificationService()
-        self.linking_service = LinkingServiceClass()
+        self.fused = FusedOCRScoringClass(self.llm)
 
-    async def generate_learning_report(self, student_id: str, new_journal: str, journal_topic: str):
+    async def _latest_report(self, student_id: str) -> dict:
         existing_data = await self.db.get_data_by_student(student_id)
+        return existing_data.latest_report if existing_data else {}
 
-        latest_report = existing_data.latest_report if existing_data else {}
-
-        report = self.llm.get_updated_learning_report(new_journal, latest_report, journal_topic)
-        print("Generated Report:", report)
+    async def _save_report(self, student_id: str, new_journal: str, report: dict):
+        logger.info(
+            "learning report generated",
+            extra={"student_id": student_id, "overall_score": report.get("overall_score")},
+        )
+        logger.debug("learning report", extra={"student_id": student_id, "report": report})
 
-        await self.db.save_new_submission(
+        result = await self.db.save_new_submission(
             student_id=student_id,
             new_journal=new_journal,
             new_report=report
         )
+        row = getattr(result, "data", None)
+        # Keep the analytics matrix current without rereading the history
+        services.progress_analytics.record_submission(row)
+
+        if isinstance(row, list):
+            row = row[0] if row else None
+        # The donor's notification references this row instead of copying the report
+        return LearningReportResponse.from_report(report, submission_id=(row or {}).get("id"))
 
-        return LearningReportResponse(
-            updated_report=report.get("summary", ""),
-            progress_update=report.get("progress_update", ""),
-            scores=report.get("scores", {}),
-            overall_score=report.get("overall_score", 0.0),
+    async def generate_learning_report(self, student_id: str, new_journal: str, journal_topic: str):
+        latest_report = await self._latest_report(student_id)
+
+        report = await self.llm.aget_updated_learning_report(
+            new_journal, latest_report, journal_topic
         )
+        return await self._save_report(student_id, new_journal, report)
+
+    async def generate_learning_report_from_image(
+        self, student_id: str, file_url: str, journal_topic: str
+    ) -> Tuple[str, LearningReportResponse]:
+        """Fused mode: transcribe and score the photo in one call.
+
+        Falls back to OCR followed by text scoring if the fused call fails.
+        Returns the transcription together with the saved report.
+        """
+        latest_report = await self._latest_report(student_id)
+
+        try:
+            new_journal, report = await self.fused.atranscribe_and_score(
+                file_url, latest_report, journal_topic
+            )
+        except ValueError as e:
+            logger.warning(
+                "fused OCR and scoring failed, using two calls",
+                extra={"student_id": student_id, "error": str(e)},
+            )
+            new_journal = await aextract_text_from_image_url(file_url)
+            report = await self.llm.aget_updated_learning_report(
+                new_journal, latest_report, journal_topic
+            )
+        response = await self._save_report(student_id, new_journal, report)
+        return new_journal, response
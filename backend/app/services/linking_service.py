@@ -1,13 +1,79 @@
 # app/services/linking_service.py
-import os, random
+from typing import List, Optional
+
+from app.config import LINK_CACHE_SIZE, LINK_CACHE_TTL
+from app.services.cache import TTLCache
+from app.services.container import services
+from app.services.donor_assignment import DonorAssignmentEngine
 from app.services.supabase_service import DBServiceClass
 
-database = DBServiceClass()
+
+class LinkCache:
+    """Read-through cache of student -> donor and donor -> [student links].
+
+    Links almost never change, so lookups are served from memory until the
+    TTL runs out. A new link made in this process updates the student's
+    entry and drops the donor's child list straight away.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: Optional[float] = 300):
+        self.donor_by_student = TTLCache(max_size=max_size, ttl=ttl)
+        self.students_by_donor = TTLCache(max_size=max_size, ttl=ttl)
+
+    def link_created(self, student_id: str, donor_id: str):
+        self.donor_by_student.set(student_id, donor_id)
+        self.students_by_donor.delete(donor_id)
+
+    def clear(self):
+        self.donor_by_student.clear()
+        self.students_by_donor.clear()
+
+    def stats(self) -> dict:
+        return {
+            "donor_by_student": self.donor_by_student.stats(),
+            "students_by_donor": self.students_by_donor.stats(),
+        }
+
+
+link_cache = LinkCache(max_size=LINK_CACHE_SIZE, ttl=LINK_CACHE_TTL)
+
 
 class LinkingServiceClass:
 
-    def ensure_student_donor_link(self, student_id: str) -> str:
-        return database.ensure_student_donor_link(student_id)
+    def __init__(
+        self,
+        cache: Optional[LinkCache] = None,
+        assignment: Optional[DonorAssignmentEngine] = None,
+        db: Optional[DBServiceClass] = None,
+    ):
+        self.cache = cache or link_cache
+        self.assignment = assignment or services.assignment_engine
+        self.db = db or DBServiceClass()
+
+    async def ensure_student_donor_link(self, student_id: str) -> str:
+        donor_id = await self.get_linked_donor_id(student_id)
+        if donor_id:
+            return donor_id
+        donor_id = await self.assignment.pick_donor()
+        await self.db.link_student_to_donor(student_id, donor_id)
+        self.assignment.record_link(donor_id)
+        self.cache.link_created(student_id, donor_id)
+        return donor_id
+
+    async def get_linked_donor_id(self, student_id: str):
+        donor_id = self.cache.donor_by_student.get(student_id)
+        if donor_id is None:
+            # Missing links are not cached; ensure_student_donor_link creates them
+            donor_id = await self.db.get_linked_donor_id(student_id)
+            if donor_id:
+                self.cache.donor_by_student.set(student_id, donor_id)
+        return donor_id
 
-    def get_linked_donor_id(self, student_id: str):
-        return database.get_linked_donor_id(student_id)
+    async def get_all_children(self, donor_id: str) -> List[dict]:
+        links = self.cache.students_by_donor.get(donor_id)
+        if links is None:
+            links = await self.db.get_all_children(donor_id) or []
+            self.cache.students_by_donor.set(donor_id, links)
+            for link in links:
+                self.cache.donor_by_student.set(str(link["student_id"]), donor_id)
+        return links
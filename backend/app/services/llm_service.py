@@ -1,41 +1,135 @@
 import os
 import json
-from typing import Optional
-import google.generativeai as genai
+from functools import cached_property
+from typing import Annotated, List, Optional, Tuple
+from pydantic import BaseModel, Field, ValidationError, create_model
 import re
 
+from app.services.gemini_limiter import gemini_limiter
+from app.services.telemetry import span
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+
+_genai_configured = False
+
+
+def _genai():
+    """google.generativeai, imported and configured on first use (the import alone takes ~1s)."""
+    global _genai_configured
+    import google.generativeai as genai
+
+    if not _genai_configured:
+        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+        _genai_configured = True
+    return genai
+
+# Progress notes from the previous report are cut to this many characters in the prompt
+PREVIOUS_NOTE_CHARS = 300
+
+# Prompt tokens per scoring call, as reported by Gemini (or estimated when it doesn't say)
+prompt_token_stats = {"calls": 0, "total": 0, "max": 0, "last": 0}
+
+# How often scoring output fails validation and what it costs to fix
+parse_stats = {"reports": 0, "parse_failures": 0, "local_repairs": 0, "reasks": 0, "failures": 0}
+
+# Follow-up calls allowed per report to fill fields that came back missing or invalid
+MAX_REASKS = 1
+
+ScoreValue = Annotated[int, Field(ge=1, le=5)]
+
+# Writing skills every report scores from 1 to 5
+SCORE_CATEGORIES = {
+    "Spelling and Punctuation": "Accuracy in basic mechanics.",
+    "Sentence Variety": "Uses different sentence types.",
+    "Cohesion and Coherence": "Logical flow using connectors.",
+    "Paragraphing": "Organized structure (start–end).",
+    "Clarity of Expression": "Meaning conveyed clearly.",
+    "Content Relevance": "Stays on topic and appropriate.",
+    "Detail and Elaboration": "Goes beyond basic responses.",
+    "Creativity in Expression": "Interesting or vivid language.",
+    "Tone and Formality": "Respectful, donor-appropriate.",
+    "Length of Writing": "Increased word/sentence count.",
+    "Error Reduction": "Fewer repeated mistakes.",
+    "Lexical Sophistication": "Richer vocabulary.",
+}
+
+
+def parse_stats_summary() -> dict:
+    reports = parse_stats["reports"] or 1
+    return {
+        **parse_stats,
+        "parse_failure_rate": round(parse_stats["parse_failures"] / reports, 4),
+        "reask_rate": round(parse_stats["reasks"] / reports, 4),
+    }
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for when usage metadata is missing."""
+    return max(1, len(text) // 4)
 
 
 class LLMClass:
     def __init__(self):
-        self.score_categories = {
-            "Spelling and Punctuation": "Accuracy in basic mechanics.",
-            "Sentence Variety": "Uses different sentence types.",
-            "Cohesion and Coherence": "Logical flow using connectors.",
-            "Paragraphing": "Organized structure (start–end).",
-            "Clarity of Expression": "Meaning conveyed clearly.",
-            "Content Relevance": "Stays on topic and appropriate.",
-            "Detail and Elaboration": "Goes beyond basic responses.",
-            "Creativity in Expression": "Interesting or vivid language.",
-            "Tone and Formality": "Respectful, donor-appropriate.",
-            "Length of Writing": "Increased word/sentence count.",
-            "Error Reduction": "Fewer repeated mistakes.",
-            "Lexical Sophistication": "Richer vocabulary.",
-        }
-        self.model = genai.GenerativeModel(
+        self.score_categories = dict(SCORE_CATEGORIES)
+        self.prompt_prefix = self._build_prompt_prefix()
+        self.last_prompt_tokens = 0
+        self.report_model = self._build_report_model()
+
+    @cached_property
+    def model(self):
+        return _genai().GenerativeModel(
             "gemini-1.5-flash"
         )  # ✅ Use updated model name
 
-    def build_prompt(self, new_entry: str, previous_report: Optional[dict], journal_topic: str) -> str:
-        prev = json.dumps(previous_report, indent=2) if previous_report else "None"
+    @cached_property
+    def generation_config(self):
+        return _genai().GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=self.response_schema(),
+        )
 
+    def _build_report_model(self) -> type:
+        """Pydantic model of a scoring response, one 1–5 field per score category."""
+        scores = create_model(
+            "CategoryScores",
+            **{f"c{i}": (ScoreValue, Field(alias=key)) for i, key in enumerate(self.score_categories)},
+        )
+        return create_model(
+            "ScoredReport",
+            scores=(scores, ...),
+            overall_score=(float, ...),
+            progress_update=(str, ...),
+            summary=(str, ...),
+        )
+
+    def response_schema(self, fields: Optional[List[str]] = None, categories: Optional[List[str]] = None) -> dict:
+        """JSON schema for Gemini's structured output, optionally narrowed to some fields."""
+        categories = list(self.score_categories) if categories is None else categories
+        properties = {
+            "scores": {
+                "type": "object",
+                "properties": {key: {"type": "integer"} for key in categories},
+                "required": categories,
+            },
+            "overall_score": {"type": "number"},
+            "progress_update": {"type": "string"},
+            "summary": {"type": "string"},
+        }
+        fields = list(properties) if fields is None else fields
+        return {
+            "type": "object",
+            "properties": {name: properties[name] for name in fields},
+            "required": fields,
+        }
+
+    def _build_prompt_prefix(self) -> str:
+        """Static instructions, categories and schema, rendered once per instance.
+
+        Everything that does not change between calls comes first so repeated
+        requests share an identical prefix that Gemini can serve from its cache.
+        """
         categories = "\n".join(
-            [
-                f"{i+1}. {key} – {desc}"
-                for i, (key, desc) in enumerate(self.score_categories.items())
-            ]
+            f"{i+1}. {key} – {desc}"
+            for i, (key, desc) in enumerate(self.score_categories.items())
         )
 
         output_format = {
@@ -45,59 +139,191 @@ class LLMClass:
             "summary": "string",
         }
 
-        return f"""
-        You are an educational language assessor.
+        return f"""You are an educational language assessor.
 
-        You will receive:
-        - A new journal entry from a child
-        - The previous learning report (or None)
-        - A journal topic to guide your evaluation
+You will receive:
+- A new journal entry from a child
+- A summary of the previous learning report (or None)
+- A journal topic to guide your evaluation
 
-        Your tasks:
-        1. Score the journal in each of the 13 categories (1–5 scale) based on the journal topic provided
-        2. Provide the average overall score (1 decimal)
-        3. Compare the new journal to the previous report and describe improvements or regressions
-        4. Write a donor-friendly summary of this submission
+Your tasks:
+1. Score the journal in each of the {len(self.score_categories)} categories (1–5 scale) based on the journal topic provided
+2. Provide the average overall score (1 decimal)
+3. Compare the new journal to the previous report and describe improvements or regressions
+4. Write a donor-friendly summary of this submission
 
-        Scoring Categories:
-        {categories}
+Scoring Categories:
+{categories}
 
-        New Journal Entry:
-        {new_entry}
+Output format (must follow this JSON structure):
+{json.dumps(output_format, separators=(",", ":"), ensure_ascii=False)}"""
 
-        Previous Report:
-        {prev}
+    def summarize_report(self, previous_report: Optional[dict]) -> str:
+        """Bounded stand-in for the previous report: scores plus a truncated progress note."""
+        if not previous_report:
+            return "None"
+        scores = previous_report.get("scores") or {}
+        progress = previous_report.get("progress_update") or ""
+        if len(progress) > PREVIOUS_NOTE_CHARS:
+            progress = progress[:PREVIOUS_NOTE_CHARS].rsplit(" ", 1)[0] + "…"
+        summary = {
+            "scores": {key: scores[key] for key in self.score_categories if key in scores},
+            "overall_score": previous_report.get("overall_score"),
+            "progress_update": progress,
+        }
+        return json.dumps(summary, separators=(",", ":"), ensure_ascii=False)
 
-        Journal Topic:
-        {journal_topic}
+    def build_prompt(self, new_entry: str, previous_report: Optional[dict], journal_topic: str) -> str:
+        return f"""{self.prompt_prefix}
+
+Journal Topic:
+{journal_topic}
+
+Previous Report:
+{self.summarize_report(previous_report)}
+
+New Journal Entry:
+{new_entry}"""
+
+    def _record_prompt_tokens(self, prompt: str, response):
+        usage = getattr(response, "usage_metadata", None)
+        tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+        self.last_prompt_tokens = tokens
+        prompt_token_stats["calls"] += 1
+        prompt_token_stats["total"] += tokens
+        prompt_token_stats["max"] = max(prompt_token_stats["max"], tokens)
+        prompt_token_stats["last"] = tokens
+
+    def load_json(self, raw_text: str) -> dict:
+        """Structured output is plain JSON; fall back to scraping for anything else."""
+        try:
+            data = json.loads(raw_text)
+        except ValueError:
+            parse_stats["parse_failures"] += 1
+            try:
+                data = self.parse_report(raw_text)
+            except ValueError:
+                return {}
+        return data if isinstance(data, dict) else {}
+
+    def validate_report(self, data: dict) -> Tuple[dict, List[str], List[str]]:
+        """Keep the valid parts of ``data`` and list what is missing or invalid.
+
+        Returns ``(report, missing_fields, missing_categories)``. An overall
+        score that can be computed from complete category scores is repaired
+        here rather than asked for again.
+        """
+        try:
+            return self.report_model.model_validate(data).model_dump(by_alias=True), [], []
+        except ValidationError as e:
+            errors = e.errors()
+
+        bad_fields, bad_categories = set(), set()
+        for error in errors:
+            loc = error["loc"]
+            if loc[0] == "scores" and len(loc) > 1:
+                bad_categories.add(loc[1])
+            else:
+                bad_fields.add(loc[0])
+
+        report = {k: v for k, v in data.items() if k in self.report_model.model_fields and k not in bad_fields}
+        scores = data.get("scores") if isinstance(data.get("scores"), dict) else {}
+        if "scores" in bad_fields:
+            bad_fields.discard("scores")
+            bad_categories.update(k for k in self.score_categories if k not in scores)
+        report["scores"] = {k: scores[k] for k in self.score_categories if k in scores and k not in bad_categories}
 
-        Output format (must follow this JSON structure):
-        {json.dumps(output_format, indent=2)}
-        """.strip()
+        if "overall_score" in bad_fields and not bad_categories:
+            report["overall_score"] = round(sum(report["scores"].values()) / len(report["scores"]), 1)
+            bad_fields.discard("overall_score")
+            parse_stats["local_repairs"] += 1
 
-    def get_updated_learning_report(
+        missing_categories = [k for k in self.score_categories if k in bad_categories]
+        missing_fields = [f for f in self.report_model.model_fields if f in bad_fields]
+        if missing_categories:
+            missing_fields.insert(0, "scores")
+        if not missing_fields:
+            return self.validate_report(report)
+        return report, missing_fields, missing_categories
+
+    def build_reask_prompt(self, prompt: str, missing_fields: List[str], missing_categories: List[str]) -> str:
+        wanted = [f for f in missing_fields if f != "scores"]
+        if missing_categories:
+            wanted = [f"scores.{key}" for key in missing_categories] + wanted
+        return f"""{prompt}
+
+Your previous answer was missing or had invalid values for: {", ".join(wanted)}.
+Return JSON containing only those fields."""
+
+    def merge_reask(self, report: dict, answer: dict) -> dict:
+        merged = {**report, **{k: v for k, v in answer.items() if k != "scores"}}
+        if isinstance(answer.get("scores"), dict):
+            merged["scores"] = {**report.get("scores", {}), **answer["scores"]}
+        return merged
+
+    def _reask_config(self, missing_fields: List[str], missing_categories: List[str]):
+        return _genai().GenerationConfig(
+            response_mime_type="application/json",
+            response_schema=self.response_schema(missing_fields, missing_categories),
+        )
+
+    def _finish(self, report: dict, missing_fields: List[str]) -> dict:
+        if missing_fields:
+            parse_stats["failures"] += 1
+            raise ValueError(f"Gemini response still missing {', '.join(missing_fields)}")
+        return report
+
+    def parse_report(self, raw_text: str) -> dict:
+        raw_text = raw_text.strip()
+
+        # Remove markdown-style code block wrapper ```json ... ```
+        if raw_text.startswith("```json"):
+            raw_text = raw_text.removeprefix("```json").removesuffix("```").strip()
+        elif raw_text.startswith("```"):
+            raw_text = raw_text.removeprefix("```").removesuffix("```").strip()
+
+        # Optional fallback: extract JSON block
+        json_match = re.search(r'\{.*\}', raw_text, re.DOTALL)
+        if json_match:
+            json_str = json_match.group(0)
+        else:
+            raise ValueError(f"Could not extract JSON from Gemini response:\n{raw_text}")
+
+        return json.loads(json_str)
+
+    async def aget_updated_learning_report(
         self, new_journal: str, previous_report: Optional[dict] = None, journal_topic: str = ""
     ) -> dict:
+        """Async scoring through the shared limiter (timeout, retries, concurrency and RPM caps)."""
         prompt = self.build_prompt(new_journal, previous_report, journal_topic)
 
         try:
-            response = self.model.generate_content(prompt)
-            raw_text = response.text.strip()
-
-            # Remove markdown-style code block wrapper ```json ... ```
-            if raw_text.startswith("```json"):
-                raw_text = raw_text.removeprefix("```json").removesuffix("```").strip()
-            elif raw_text.startswith("```"):
-                raw_text = raw_text.removeprefix("```").removesuffix("```").strip()
-
-            # Optional fallback: extract JSON block
-            json_match = re.search(r'\{.*\}', raw_text, re.DOTALL)
-            if json_match:
-                json_str = json_match.group(0)
-            else:
-                raise ValueError(f"Could not extract JSON from Gemini response:\n{raw_text}")
+            with span("llm.score"):
+                response = await gemini_limiter.run(
+                    lambda: self.model.generate_content_async(
+                        prompt, generation_config=self.generation_config
+                    )
+                )
+            self._record_prompt_tokens(prompt, response)
+            parse_stats["reports"] += 1
+            report, missing, categories = self.validate_report(self.load_json(response.text))
 
-            return json.loads(json_str)
+            for _ in range(MAX_REASKS if missing else 0):
+                parse_stats["reasks"] += 1
+                reask_prompt = self.build_reask_prompt(prompt, missing, categories)
+                reask_config = self._reask_config(missing, categories)
+                with span("llm.reask"):
+                    response = await gemini_limiter.run(
+                        lambda: self.model.generate_content_async(
+                            reask_prompt, generation_config=reask_config
+                        )
+                    )
+                report, missing, categories = self.validate_report(
+                    self.merge_reask(report, self.load_json(response.text))
+                )
+                if not missing:
+                    break
+            return self._finish(report, missing)
 
         except Exception as e:
             raise ValueError(f"Error parsing Gemini JSON response: {e}")
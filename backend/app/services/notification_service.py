@@ -1,14 +1,66 @@
 # app/services/notification_service.py
+import logging
+
+from app.services.container import services
+from app.services.event_broker import donor_channel
 from app.services.supabase_service import DBServiceClass
 from app.services.linking_service import LinkingServiceClass
 
-database = DBServiceClass()
-linking_service = LinkingServiceClass()
+logger = logging.getLogger(__name__)
+
+
+def notification_preview(row: dict) -> dict:
+    """The fields of a notification that the inbox shows before opening the report."""
+    report = row.get("report_preview") or row.get("learning_report") or {}
+    return {
+        "id": row.get("id"),
+        "created_at": row.get("created_at"),
+        "is_read": row.get("is_read", False),
+        "journal_topic": row.get("journal_topic"),
+        "journal_image": row.get("journal_image"),
+        "progress_update": report.get("progress_update"),
+        "overall_score": report.get("overall_score"),
+    }
 
 
 class NotificationService:
 
-    def notify_donor_of_new_report(
+    def __init__(self, broker=None, db=None, linking_service=None):
+        self.broker = broker or services.event_broker
+        self.db = db or DBServiceClass()
+        self.linking_service = linking_service or LinkingServiceClass(db=self.db)
+
+    async def publish_new_notifications(self, rows: list):
+        """Push each inserted notification, and the unread bump it causes, to its donor."""
+        try:
+            for row in rows:
+                channel = donor_channel(row["donor_id"])
+                student_id = str(row["student_id"])
+                await self.broker.publish(channel, {
+                    "type": "notification",
+                    "student_id": student_id,
+                    "notification": notification_preview(row),
+                })
+                await self.broker.publish(channel, {
+                    "type": "unread",
+                    "student_id": student_id,
+                    "delta": 1,
+                })
+        except Exception:
+            # Push is best effort; the notification itself is already stored
+            logger.warning("publishing notification events failed", exc_info=True)
+
+    async def publish_unread_count(self, donor_id: str, student_id: str, unread_count: int):
+        try:
+            await self.broker.publish(donor_channel(donor_id), {
+                "type": "unread",
+                "student_id": str(student_id),
+                "unread_count": unread_count,
+            })
+        except Exception:
+            logger.warning("publishing unread count failed", exc_info=True)
+
+    async def notify_donor_of_new_report(
         self,
         student_id: str,
         learning_report: dict,
@@ -16,14 +68,24 @@ class NotificationService:
         journal_topic: str,
     ):
         try:
-            donor_id = LinkingServiceClass.get_linked_donor_id(self, student_id)
+            donor_id = await self.linking_service.get_linked_donor_id(student_id)
 
-            return database.notify_donor_of_new_report(
+            result = await self.db.notify_donor_of_new_report(
                 donor_id=donor_id,
                 student_id=student_id,
                 learning_report=learning_report,
                 journal=image_url,
                 journal_topic=journal_topic,
             )
+            if getattr(result, "data", None):
+                await self.publish_new_notifications(result.data)
+            return result
         except Exception as e:
             raise e
+
+    async def insert_notifications(self, rows: list):
+        """Bulk insert rows built with DBServiceClass.notification_row and push them."""
+        result = await self.db.insert_notifications(rows)
+        if getattr(result, "data", None):
+            await self.publish_new_notifications(result.data)
+        return result
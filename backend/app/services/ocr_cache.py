@@ -0,0 +1,130 @@
+# app/services/ocr_cache.py
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+
+def ocr_cache_key(image_bytes: bytes, model: str, prompt: str, options: str = "") -> str:
+    """Content address for an OCR result: the image bytes plus the model, prompt and options that read them."""
+    digest = hashlib.sha256()
+    digest.update(model.encode())
+    digest.update(b"\0")
+    digest.update(hashlib.sha256(prompt.encode()).digest())
+    digest.update(hashlib.sha256(options.encode()).digest())
+    digest.update(b"\0")
+    digest.update(image_bytes)
+    return digest.hexdigest()
+
+
+class SQLiteCacheBackend:
+    """Disk tier that survives restarts and is shared by workers on the same host."""
+
+    def __init__(self, path: str, max_entries: int = 100_000, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("pragma journal_mode=wal")
+        self.conn.execute(
+            """
+            create table if not exists ocr_cache (
+                key text primary key,
+                value text not null,
+                expires_at real,
+                accessed_at real not null
+            )
+            """
+        )
+        self.conn.execute(
+            "create index if not exists ocr_cache_accessed on ocr_cache (accessed_at)"
+        )
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "select value, expires_at from ocr_cache where key = ?", (key,)
+            ).fetchone()
+            if row is not None and (row[1] is None or row[1] > now):
+                self.conn.execute(
+                    "update ocr_cache set accessed_at = ? where key = ?", (now, key)
+                )
+                self.conn.commit()
+                self.hits += 1
+                return row[0]
+            if row is not None:
+                self.conn.execute("delete from ocr_cache where key = ?", (key,))
+                self.conn.commit()
+                self.evictions += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        expires_at = now + self.ttl if self.ttl else None
+        with self._lock:
+            self.conn.execute(
+                "insert or replace into ocr_cache (key, value, expires_at, accessed_at)"
+                " values (?, ?, ?, ?)",
+                (key, value, expires_at, now),
+            )
+            overflow = (
+                self.conn.execute("select count(*) from ocr_cache").fetchone()[0]
+                - self.max_entries
+            )
+            if overflow > 0:
+                self.conn.execute(
+                    "delete from ocr_cache where key in"
+                    " (select key from ocr_cache order by accessed_at limit ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self.conn.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            size = self.conn.execute("select count(*) from ocr_cache").fetchone()[0]
+        return {
+            "size": size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class OCRCache:
+    """Tiered OCR result cache; tiers are checked in order and hits are copied upwards."""
+
+    def __init__(self, tiers: List):
+        self.tiers = tiers
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        for i, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is not None:
+                for upper in self.tiers[:i]:
+                    upper.set(key, value)
+                self.hits += 1
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        for tier in self.tiers:
+            tier.set(key, value)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": sum(tier.evictions for tier in self.tiers),
+            "tiers": {type(tier).__name__: tier.stats() for tier in self.tiers},
+        }
@@ -0,0 +1,214 @@
+# app/services/ocr_engines.py
+import asyncio
+import logging
+import os
+from collections import Counter
+from concurrent.futures import BrokenExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from app.services.image_preprocessing import decoding
+from app.services.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class OCRResult:
+    text: str
+    engine: str
+    # (word, confidence 0-100) in reading order; empty for engines that report no scores
+    words: List[Tuple[str, float]] = field(default_factory=list)
+    # Why a cascade sent the page to its fallback engine, if it did
+    escalation: Optional[str] = None
+
+    @property
+    def confidence(self) -> Optional[float]:
+        """Mean word confidence weighted by word length; None without word scores."""
+        letters = sum(len(word) for word, _ in self.words)
+        if not letters:
+            return None
+        return sum(len(word) * conf for word, conf in self.words) / letters
+
+    def low_confidence_share(self, threshold: float) -> float:
+        if not self.words:
+            return 1.0
+        return sum(conf < threshold for _, conf in self.words) / len(self.words)
+
+
+class OCREngine:
+    """Turns image bytes into text. Subclasses set ``name`` and implement ``recognize``."""
+
+    name = "base"
+    # Part of the OCR cache key, so results from different engines are not mixed up
+    cache_tag = ""
+
+    async def recognize(self, image_bytes: bytes) -> OCRResult:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        return {"engine": self.name}
+
+    async def close(self):
+        pass
+
+
+def tesseract_words(image_bytes: bytes, lang: str, config: str, max_long_edge: int) -> List[Tuple[str, float]]:
+    """OCR one page with Tesseract and return its words with their confidence.
+
+    Runs in a pool process, so it imports its own dependencies.
+    """
+    import pytesseract
+    from PIL import Image, ImageOps
+
+    with decoding():
+        image = Image.open(BytesIO(image_bytes))
+        image = ImageOps.exif_transpose(image).convert("L")
+    if max(image.size) > max_long_edge:
+        image.thumbnail((max_long_edge, max_long_edge))
+    data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+    words = []
+    for text, conf in zip(data["text"], data["conf"]):
+        text = text.strip()
+        # Layout rows (blocks, lines) have no text and a confidence of -1
+        if text and float(conf) >= 0:
+            words.append((text, float(conf)))
+    return words
+
+
+class TesseractEngine(OCREngine):
+    """Local Tesseract OCR in a process pool, one page per core at a time.
+
+    Needs the ``tesseract`` binary as well as pytesseract. The pool starts on
+    the first page; ``spawn`` keeps the workers free of the event loop's
+    threads and sockets.
+    """
+
+    name = "tesseract"
+
+    def __init__(
+        self,
+        processes: Optional[int] = None,
+        lang: str = "eng",
+        config: str = "--psm 6",
+        max_long_edge: int = 2000,
+    ):
+        self.processes = processes or os.cpu_count() or 1
+        self.lang = lang
+        self.config = config
+        self.max_long_edge = max_long_edge
+        self.cache_tag = f"tesseract:{lang}:{config}:{max_long_edge}"
+        self._pool = None
+        self.pages = 0
+        self.errors = 0
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+
+    async def recognize(self, image_bytes: bytes) -> OCRResult:
+        loop = asyncio.get_running_loop()
+        try:
+            with span("ocr.tesseract"):
+                words = await loop.run_in_executor(
+                    self.pool, tesseract_words, image_bytes, self.lang, self.config, self.max_long_edge
+                )
+        except BrokenExecutor:
+            # A worker died (e.g. out of memory); the next page gets a fresh pool
+            self._pool = None
+            self.errors += 1
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        self.pages += 1
+        return OCRResult(" ".join(word for word, _ in words), self.name, words)
+
+    def stats(self) -> dict:
+        return {"engine": self.name, "processes": self.processes, "pages": self.pages, "errors": self.errors}
+
+    async def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+
+class CascadeOCREngine(OCREngine):
+    """Reads each page with a fast local engine and escalates the ones it is unsure of.
+
+    A page goes to ``fallback`` when the primary engine fails or finds fewer
+    than ``min_words`` words, when its mean word confidence is under
+    ``min_confidence``, or when more than ``max_low_share`` of its words score
+    under ``word_confidence``. That last signal is how handwriting shows up
+    in Tesseract's output, even on pages whose printed parts read cleanly.
+    """
+
+    name = "cascade"
+
+    def __init__(
+        self,
+        primary: OCREngine,
+        fallback: OCREngine,
+        min_confidence: float = 80,
+        word_confidence: float = 60,
+        max_low_share: float = 0.15,
+        min_words: int = 5,
+    ):
+        self.primary = primary
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.word_confidence = word_confidence
+        self.max_low_share = max_low_share
+        self.min_words = min_words
+        self.cache_tag = (
+            f"cascade:{primary.cache_tag}>{fallback.cache_tag}:"
+            f"{min_confidence}:{word_confidence}:{max_low_share}:{min_words}"
+        )
+        self.outcomes = Counter()
+
+    def escalation_reason(self, result: OCRResult) -> Optional[str]:
+        if len(result.words) < self.min_words:
+            return "too_few_words"
+        if result.confidence < self.min_confidence:
+            return "low_confidence"
+        if result.low_confidence_share(self.word_confidence) > self.max_low_share:
+            return "handwriting"
+        return None
+
+    async def recognize(self, image_bytes: bytes) -> OCRResult:
+        try:
+            result = await self.primary.recognize(image_bytes)
+            reason = self.escalation_reason(result)
+        except Exception as e:
+            logger.warning("primary OCR engine failed", extra={"engine": self.primary.name, "error": str(e)})
+            reason = "primary_error"
+        if reason is None:
+            self.outcomes["accepted"] += 1
+            return result
+        self.outcomes[reason] += 1
+        result = await self.fallback.recognize(image_bytes)
+        result.escalation = reason
+        return result
+
+    def stats(self) -> dict:
+        pages = sum(self.outcomes.values())
+        return {
+            "engine": self.name,
+            "pages": pages,
+            "escalation_rate": round(1 - self.outcomes["accepted"] / pages, 4) if pages else None,
+            "outcomes": dict(self.outcomes),
+            "primary": self.primary.stats(),
+            "fallback": self.fallback.stats(),
+        }
+
+    async def close(self):
+        await self.primary.close()
+        await self.fallback.close()
@@ -1,31 +1,56 @@
 # app/services/ocr_service.py
-from PIL import Image
-import requests
+import asyncio
+from contextlib import contextmanager
+from typing import Optional
+import httpx
 from io import BytesIO
-from google import genai
 
-client = genai.Client()
+from app.config import (
+    OCR_AUTOCONTRAST,
+    OCR_CACHE_DB,
+    OCR_CACHE_SIZE,
+    OCR_CACHE_TTL,
+    OCR_ENGINE,
+    OCR_FETCH_CONNECT_TIMEOUT,
+    OCR_FETCH_ETAG_CACHE_BYTES,
+    OCR_FETCH_MAX_BYTES,
+    OCR_FETCH_READ_TIMEOUT,
+    OCR_GRAYSCALE,
+    OCR_IMAGE_FORMAT,
+    OCR_IMAGE_QUALITY,
+    OCR_MAX_LONG_EDGE,
+    OCR_MAX_LOW_CONFIDENCE_SHARE,
+    OCR_MIN_CONFIDENCE,
+    OCR_MIN_WORDS,
+    OCR_PREPROCESS,
+    OCR_TESSERACT_LANG,
+    OCR_TESSERACT_PROCESSES,
+    OCR_WORD_CONFIDENCE,
+)
+from app.services.cache import TTLCache
+from app.services.container import services
+from app.services.gemini_limiter import gemini_limiter
+from app.services.image_fetcher import ImageFetcher, ImageTooLargeError
+from app.services.image_preprocessing import InvalidImageError, PreprocessConfig, decoding, preprocess_image
+from app.services.ocr_cache import OCRCache, SQLiteCacheBackend, ocr_cache_key
+from app.services.ocr_engines import CascadeOCREngine, OCREngine, OCRResult, TesseractEngine
+from app.services.telemetry import span
 
-def extract_text_from_image_url(file_url: str) -> str:
-    """
-    Extract text from an image using Google Gemini (gemini-2.5-flash model)
-    Args:
-        file_url: Local path or remote URL to the image
-    Returns:
-        Extracted text as a string
-    Raises:
-        ValueError: if the image cannot be processed or Gemini fails
-    """
-    try:
-        # Open image from URL or local file
-        if file_url.startswith("http"):
-            response = requests.get(file_url)
-            response.raise_for_status()
-            image = Image.open(BytesIO(response.content))
-        else:
-            image = Image.open(file_url)
+# Built on first use: importing google.genai is slow and the client needs credentials
+_genai_client = None
+
+
+def get_genai_client():
+    """Shared google.genai client for OCR and fused calls."""
+    global _genai_client
+    if _genai_client is None:
+        from google import genai
+
+        _genai_client = genai.Client()
+    return _genai_client
 
-        prompt = """
+OCR_MODEL = "gemini-2.5-flash-lite"
+OCR_PROMPT = """
         You are an OCR assistant. Extract **all handwritten text** from the image below.
 
         - Return the extracted text as a **single paragraph**.
@@ -35,20 +60,171 @@ def extract_text_from_image_url(file_url: str) -> str:
         - Output only the raw text in **one continuous paragraph**, exactly as it appears in the handwriting.
         """
 
-        # Call Gemini model
-        gemini_response = client.models.generate_content(
-            model="gemini-2.5-flash-lite",
-            contents=[image, prompt]
+preprocess_config = (
+    PreprocessConfig(
+        max_long_edge=OCR_MAX_LONG_EDGE,
+        grayscale=OCR_GRAYSCALE,
+        autocontrast=OCR_AUTOCONTRAST,
+        format=OCR_IMAGE_FORMAT,
+        quality=OCR_IMAGE_QUALITY,
+    )
+    if OCR_PREPROCESS
+    else None
+)
+
+
+def build_ocr_cache() -> OCRCache:
+    tiers = [TTLCache(max_size=OCR_CACHE_SIZE, ttl=OCR_CACHE_TTL)]
+    if OCR_CACHE_DB:
+        tiers.append(SQLiteCacheBackend(OCR_CACHE_DB, ttl=OCR_CACHE_TTL))
+    return OCRCache(tiers)
+
+
+def build_image_fetcher() -> ImageFetcher:
+    return ImageFetcher(
+        max_bytes=OCR_FETCH_MAX_BYTES,
+        connect_timeout=OCR_FETCH_CONNECT_TIMEOUT,
+        read_timeout=OCR_FETCH_READ_TIMEOUT,
+        etag_cache_bytes=OCR_FETCH_ETAG_CACHE_BYTES,
+    )
+
+
+class ImageReadError(ValueError):
+    """A local image path could not be read."""
+
+
+def _load_image_bytes(file_url: str) -> bytes:
+    with span("image.fetch"):
+        if file_url.startswith("http"):
+            return services.image_fetcher.fetch(file_url)
+        try:
+            with open(file_url, "rb") as f:
+                return f.read()
+        except OSError as e:
+            raise ImageReadError(f"Failed to read image file: {e}") from e
+
+
+def _cache_key(image_bytes: bytes) -> str:
+    options = repr(preprocess_config) + services.ocr_engine.cache_tag
+    return ocr_cache_key(image_bytes, OCR_MODEL, OCR_PROMPT, options=options)
+
+
+def lookup_cached_text(image_bytes: bytes) -> Optional[str]:
+    """Transcription of this image from an earlier OCR call, if still cached."""
+    return services.ocr_cache.get(_cache_key(image_bytes))
+
+
+def model_image(image_bytes: bytes):
+    with span("image.preprocess"):
+        if preprocess_config:
+            from google.genai import types
+
+            data, mime_type = preprocess_image(image_bytes, preprocess_config)
+            return types.Part.from_bytes(data=data, mime_type=mime_type)
+        from PIL import Image
+
+        with decoding():
+            return Image.open(BytesIO(image_bytes))
+
+
+def _model_contents(image_bytes: bytes) -> list:
+    return [model_image(image_bytes), OCR_PROMPT]
+
+
+async def aload_image_bytes(file_url: str) -> bytes:
+    if file_url.startswith("http"):
+        with span("image.fetch"):
+            return await services.image_fetcher.afetch(file_url)
+    return await asyncio.to_thread(_load_image_bytes, file_url)
+
+
+def _response_text(gemini_response) -> str:
+    if not gemini_response or not getattr(gemini_response, "text", None):
+        raise ValueError("No text extracted from the image.")
+    return gemini_response.text
+
+
+class GeminiOCREngine(OCREngine):
+    """Transcription by the Gemini OCR model, through the shared limiter. Reports no word scores."""
+
+    name = "gemini"
+
+    def __init__(self):
+        self.pages = 0
+
+    async def recognize(self, image_bytes: bytes) -> OCRResult:
+        contents = await asyncio.to_thread(_model_contents, image_bytes)
+        with span("ocr.model"):
+            gemini_response = await gemini_limiter.run(
+                lambda: get_genai_client().aio.models.generate_content(model=OCR_MODEL, contents=contents)
+            )
+        self.pages += 1
+        return OCRResult(_response_text(gemini_response), self.name)
+
+    def stats(self) -> dict:
+        return {"engine": self.name, "model": OCR_MODEL, "pages": self.pages}
+
+
+def build_ocr_engine(name: str = OCR_ENGINE) -> OCREngine:
+    if name == "gemini":
+        return GeminiOCREngine()
+    tesseract = TesseractEngine(processes=OCR_TESSERACT_PROCESSES or None, lang=OCR_TESSERACT_LANG)
+    if name == "tesseract":
+        return tesseract
+    if name == "cascade":
+        return CascadeOCREngine(
+            tesseract,
+            GeminiOCREngine(),
+            min_confidence=OCR_MIN_CONFIDENCE,
+            word_confidence=OCR_WORD_CONFIDENCE,
+            max_low_share=OCR_MAX_LOW_CONFIDENCE_SHARE,
+            min_words=OCR_MIN_WORDS,
         )
+    raise ValueError(f"Unknown OCR_ENGINE: {name}")
 
-        if not gemini_response or not getattr(gemini_response, "text", None):
-            raise ValueError("No text extracted from the image.")
 
-        return gemini_response.text
 
-    except requests.RequestException as req_err:
+@contextmanager
+def _ocr_errors():
+    """Translate fetch, decode and model failures into the ValueErrors callers expect."""
+    try:
+        yield
+    except (ImageTooLargeError, InvalidImageError, ImageReadError):
+        raise
+    except httpx.HTTPError as req_err:
         raise ValueError(f"Failed to fetch image from URL: {req_err}")
-    except IOError as img_err:
-        raise ValueError(f"Invalid image format or corrupted file: {img_err}")
+    # Both are OSErrors, like Pillow's decode errors, so they are named here
+    except asyncio.TimeoutError:
+        raise ValueError(f"{services.ocr_engine.name.capitalize()} OCR timed out")
+    except ConnectionError as e:
+        raise ValueError(f"{services.ocr_engine.name.capitalize()} OCR connection failed: {e}")
     except Exception as e:
-        raise ValueError(f"Gemini OCR Error: {e}")
+        raise ValueError(f"{services.ocr_engine.name.capitalize()} OCR Error: {e}")
+
+
+async def aextract_text_from_image_url(file_url: str) -> str:
+    """
+    Extract text from an image with the configured OCR_ENGINE.
+    Results are cached by image content, so re-uploads skip the engine. Gemini
+    calls go through the shared limiter, and preprocessing and Tesseract run
+    off the event loop.
+    Args:
+        file_url: Local path or remote URL to the image
+    Returns:
+        Extracted text as a string
+    Raises:
+        ValueError: if the image cannot be processed or the engine fails
+    """
+    with _ocr_errors():
+        image_bytes = await aload_image_bytes(file_url)
+
+        cache_key = _cache_key(image_bytes)
+        cached_text = services.ocr_cache.get(cache_key)
+        if cached_text is not None:
+            return cached_text
+
+        result = await services.ocr_engine.recognize(image_bytes)
+        if not result.text.strip():
+            raise ValueError("No text extracted from the image.")
+        services.ocr_cache.set(cache_key, result.text)
+        return result.text
@@ -0,0 +1,158 @@
+# app/services/progress_analytics.py
+import asyncio
+import logging
+import math
+from typing import Optional
+
+from app.config import ANALYTICS_TTL, ANALYTICS_WINDOW
+from app.services.llm_service import SCORE_CATEGORIES
+from app.services.supabase_service import DBServiceClass
+
+CATEGORIES = list(SCORE_CATEGORIES)
+
+logger = logging.getLogger(__name__)
+
+
+def _clean(values) -> list:
+    """JSON-safe floats: NaN becomes null."""
+    return [None if math.isnan(v) else round(float(v), 3) for v in values]
+
+
+class ProgressAnalyticsEngine:
+    """Per-student trends and cohort percentiles served from an in-memory ScoreMatrix.
+
+    The matrix holds every student's latest ``window`` submissions, which is
+    all the cohort percentiles need. ``start`` builds it in the background and
+    rebuilds it every ``ttl`` seconds, and submissions saved by this process
+    are appended in between, so requests never wait for a rebuild. A
+    student's full history is read the first time their progress is asked for.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 600,
+        window: int = 5,
+        db: Optional[DBServiceClass] = None,
+        page_size: int = 1000,
+    ):
+        self.ttl = ttl
+        self.window = window
+        self.db = db or DBServiceClass()
+        self.page_size = page_size
+        self.matrix = None
+        self.refreshes = 0
+        self.appends = 0
+        self.history_loads = 0
+        self._pending: Optional[list] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                async with self._lock:
+                    await self.refresh()
+            except Exception as e:
+                # Requests build the matrix themselves while there is none
+                logger.warning("progress analytics refresh failed", extra={"error": str(e)})
+            if not self.ttl:
+                return
+            await asyncio.sleep(self.ttl)
+
+    async def refresh(self):
+        self._pending = []
+        try:
+            # NumPy is imported here, off the request path, not when the app is imported
+            from app.services.score_matrix import ScoreMatrix
+
+            rows = await self.db.get_recent_submission_scores(self.window, page_size=self.page_size)
+            matrix = ScoreMatrix(CATEGORIES, window=self.window)
+            # Building the arrays is CPU-bound; keep the event loop free
+            await asyncio.to_thread(matrix.load, rows)
+            # Submissions saved while the history was being read
+            for row in self._pending:
+                matrix.append(*row)
+        finally:
+            self._pending = None
+        self.matrix = matrix
+        self.refreshes += 1
+
+    async def _ready(self):
+        if self.matrix is None:
+            async with self._lock:
+                if self.matrix is None:
+                    await self.refresh()
+        return self.matrix
+
+    def record_submission(self, row):
+        """Fold the row returned by append_submission() into the loaded matrix."""
+        if isinstance(row, list):
+            row = row[0] if row else None
+        if not row:
+            return
+        args = (str(row["student_id"]), int(row["seq"]), (row.get("report") or {}).get("scores"), row.get("created_at"))
+        if self._pending is not None:
+            self._pending.append(args)
+        if self.matrix is not None:
+            self.matrix.append(*args)
+            self.appends += 1
+
+    def invalidate(self):
+        self.matrix = None
+
+    async def student_progress(self, student_id: str, window: Optional[int] = None) -> Optional[dict]:
+        matrix = await self._ready()
+        student_id = str(student_id)
+        if student_id not in matrix.full_history:
+            rows = await self.db.get_student_submission_scores(student_id, page_size=self.page_size)
+            matrix.load_history(student_id, rows)
+            self.history_loads += 1
+        row = matrix.rows.get(student_id)
+        if row is None:
+            return None
+        window = window or self.window
+        length, first_seq = int(matrix.lengths[row]), int(matrix.first_seq[row])
+        series = matrix.scores[matrix.segment(row)].T
+        rolling = matrix.rolling_means(row, window).T
+        slopes = matrix.slopes(row)
+        ranks = matrix.percentile_ranks(row)
+        return {
+            "student_id": student_id,
+            "submissions": length,
+            "window": window,
+            "cohort_size": len(matrix),
+            "seq": list(range(first_seq, first_seq + length)),
+            "created_at": matrix.created_at[matrix.segment(row)].tolist(),
+            "categories": {
+                name: {
+                    "scores": _clean(series[i]),
+                    "rolling_average": _clean(rolling[i]),
+                    "slope": _clean([slopes[i]])[0],
+                    "level": _clean([matrix.levels[row, i]])[0],
+                    "percentile": _clean([ranks[i]])[0],
+                }
+                for i, name in enumerate(matrix.categories)
+            },
+            "overall_percentile": _clean([ranks[-1]])[0],
+        }
+
+    def stats(self) -> dict:
+        return {
+            "refreshes": self.refreshes,
+            "appends": self.appends,
+            "history_loads": self.history_loads,
+            **(self.matrix.stats() if self.matrix is not None else {}),
+        }
+
+
+def build_progress_analytics() -> ProgressAnalyticsEngine:
+    return ProgressAnalyticsEngine(ttl=ANALYTICS_TTL, window=ANALYTICS_WINDOW)
@@ -0,0 +1,338 @@
+# app/services/response_cache.py
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from app.config import (
+    RESPONSE_CACHE_SIZE,
+    RESPONSE_CACHE_STALE,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_URL,
+)
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# A loader returns the response and the tags that invalidate it
+Loader = Callable[[], Awaitable[Tuple[Any, Iterable[str]]]]
+
+
+def response_key(endpoint: str, *ids) -> str:
+    return ":".join([endpoint, *(str(i) for i in ids)])
+
+
+def donor_tag(donor_id) -> str:
+    return f"donor:{donor_id}"
+
+
+def student_tag(student_id) -> str:
+    return f"student:{student_id}"
+
+
+def pair_tag(donor_id, student_id) -> str:
+    return f"pair:{donor_id}:{student_id}"
+
+
+class RedisResponseTier:
+    """Response entries shared by every worker, plus the invalidation channel between them.
+
+    Each entry is stored as JSON under its key, and its tags are Redis sets of
+    keys, so one worker's write drops entries that other workers cached.
+    Requires the ``redis`` package.
+    """
+
+    channel = "response_cache:invalidate"
+
+    def __init__(self, url: str, prefix: str = "response_cache:"):
+        import redis.asyncio as redis
+
+        self.redis = redis.from_url(url)
+        self.prefix = prefix
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.redis.get(self.prefix + key)
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, entry: dict, ttl: float):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(self.prefix + key, json.dumps(entry, default=str), px=int(ttl * 1000))
+            for tag in entry["tags"]:
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.pexpire(self._tag_key(tag), int(ttl * 1000))
+            await pipe.execute()
+
+    async def invalidate(self, tags: list, origin: str):
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            members = await pipe.execute()
+        keys = {self.prefix + (k.decode() if isinstance(k, bytes) else k) for m in members for k in m}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.delete(*keys, *tag_keys)
+            pipe.publish(self.channel, json.dumps({"origin": origin, "tags": tags}))
+            await pipe.execute()
+
+    async def listen(self, on_invalidate: Callable[[dict], None]):
+        pubsub = self.redis.pubsub()
+        await pubsub.subscribe(self.channel)
+        try:
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    on_invalidate(json.loads(message["data"]))
+        finally:
+            await pubsub.aclose()
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+class ResponseCache:
+    """Cache of read responses with tag invalidation and stale-while-revalidate.
+
+    An entry is fresh for ``ttl`` seconds and may then be served stale for
+    ``stale`` more while one background load replaces it. Writes call
+    ``invalidate()`` with the tags they touch; the entries are dropped and
+    reloaded in the background, so the next read waits on at most that load.
+    Loads of the same key are coalesced. ``ttl=0`` turns caching off.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60,
+        stale: float = 600,
+        max_size: int = 10000,
+        shared: Optional[RedisResponseTier] = None,
+    ):
+        self.ttl = ttl
+        self.stale = stale
+        self.local = TTLCache(max_size=max_size, ttl=ttl + stale, on_evict=self._evicted)
+        self.shared = shared
+        self.origin = uuid.uuid4().hex
+        self._keys_by_tag = defaultdict(set)
+        self._inflight = {}
+        # Recent invalidations as (sequence number, tags), so a load can tell
+        # whether a write touched its response while it was reading
+        self._invalidation_seq = 0
+        self._invalidation_log = deque(maxlen=1024)
+        self._tasks = set()
+        self._listener: Optional[asyncio.Task] = None
+        self.fresh_hits = 0
+        self.stale_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.loads = 0
+        self.invalidations = 0
+        self.refresh_errors = 0
+        self.shared_errors = 0
+
+    async def get_or_load(self, key: str, loader: Loader):
+        if not self.ttl:
+            value, _ = await loader()
+            return value
+        self._ensure_listener()
+        now = time.time()
+        cached = self.local.get(key)
+        entry = cached[0] if cached else await self._shared_get(key, loader)
+        if entry is not None and now < entry["stale_until"]:
+            if now < entry["fresh_until"]:
+                self.fresh_hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh(key, loader)
+            return entry["value"]
+        self.misses += 1
+        return await self._load(key, loader)
+
+    async def invalidate(self, *tags: str):
+        """Drop every response tagged with ``tags`` here and in the shared tier, then reload it."""
+        if not self.ttl or not tags:
+            return
+        self.invalidations += 1
+        loaders = self._drop(tags)
+        if self.shared is not None:
+            try:
+                await self.shared.invalidate(list(tags), self.origin)
+            except Exception:
+                self.shared_errors += 1
+                logger.warning("shared response cache invalidation failed", exc_info=True)
+        for key, loader in loaders:
+            self._refresh(key, loader)
+
+    def _drop(self, tags) -> list:
+        self._invalidation_seq += 1
+        self._invalidation_log.append((self._invalidation_seq, frozenset(tags)))
+        keys = set()
+        for tag in tags:
+            keys |= self._keys_by_tag.pop(tag, set())
+        loaders = []
+        for key in keys:
+            # A running reload of a dropped key may have read the old rows: it
+            # still answers its callers but is not stored, and new reads start
+            # a fresh load. First loads are checked by _fetch instead.
+            self._inflight.pop(key, None)
+            cached = self.local.pop(key)
+            if cached is not None:
+                self._untag(key, cached[0]["tags"])
+                loaders.append((key, cached[1]))
+        return loaders
+
+    def _invalidated_since(self, seq: int, tags) -> bool:
+        if self._invalidation_seq == seq:
+            return False
+        if not self._invalidation_log or self._invalidation_log[0][0] > seq + 1:
+            # The log no longer reaches back that far; assume the worst
+            return True
+        tags = set(tags)
+        return any(n > seq and tags & touched for n, touched in self._invalidation_log)
+
+    def _untag(self, key: str, tags):
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def _evicted(self, key: str, cached):
+        self._untag(key, cached[0]["tags"])
+
+    def _remote_invalidate(self, message: dict):
+        if message.get("origin") != self.origin:
+            # The worker that wrote reloads the shared entry; here the next read picks it up
+            self._drop(message.get("tags") or [])
+
+    def _store(self, key: str, entry: dict, loader: Loader):
+        replaced = self.local.pop(key)
+        if replaced is not None:
+            self._untag(key, replaced[0]["tags"])
+        self.local.set(key, (entry, loader), ttl=max(entry["stale_until"] - time.time(), 0.001))
+        for tag in entry["tags"]:
+            self._keys_by_tag[tag].add(key)
+
+    async def _shared_get(self, key: str, loader: Loader) -> Optional[dict]:
+        if self.shared is None:
+            return None
+        try:
+            entry = await self.shared.get(key)
+        except Exception:
+            self.shared_errors += 1
+            logger.warning("shared response cache read failed", exc_info=True)
+            return None
+        if entry is not None:
+            self.shared_hits += 1
+            self._store(key, entry, loader)
+        return entry
+
+    async def _load(self, key: str, loader: Loader):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key, loader))
+            self._inflight[key] = task
+
+            def finished(t):
+                if self._inflight.get(key) is t:
+                    del self._inflight[key]
+
+            task.add_done_callback(finished)
+        # One caller disconnecting must not cancel the load the others are waiting on
+        return await asyncio.shield(task)
+
+    async def _fetch(self, key: str, loader: Loader):
+        for _ in range(2):
+            started = self._invalidation_seq
+            value, tags = await loader()
+            self.loads += 1
+            stale = self._invalidated_since(started, tags)
+            if not stale:
+                break
+            # A write touched this response while it was read; read it again
+            # so no caller waiting on this load gets the old rows
+        # Not stored when empty, when a write invalidated it while loading,
+        # or when the key was dropped and a newer load has taken over
+        if value is None or stale or self._inflight.get(key) is not asyncio.current_task():
+            return value
+        now = time.time()
+        entry = {
+            "value": value,
+            "tags": sorted(set(tags)),
+            "fresh_until": now + self.ttl,
+            "stale_until": now + self.ttl + self.stale,
+        }
+        self._store(key, entry, loader)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, entry, self.ttl + self.stale)
+            except Exception:
+                self.shared_errors += 1
+                logger.warning("shared response cache write failed", exc_info=True)
+        return value
+
+    def _refresh(self, key: str, loader: Loader):
+        if key in self._inflight:
+            return
+        task = asyncio.ensure_future(self._background_load(key, loader))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _background_load(self, key: str, loader: Loader):
+        try:
+            await self._load(key, loader)
+        except Exception as e:
+            # The stale entry (if any) keeps being served until the next attempt
+            self.refresh_errors += 1
+            logger.warning("response refresh failed", extra={"key": key, "error": str(e)})
+
+    def _ensure_listener(self):
+        if self.shared is not None and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.create_task(self.shared.listen(self._remote_invalidate))
+
+    def clear(self):
+        self.local.clear()
+        self._keys_by_tag.clear()
+        self._inflight.clear()
+
+    async def close(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        for task in list(self._tasks):
+            task.cancel()
+        if self.shared is not None:
+            await self.shared.close()
+
+    def stats(self) -> dict:
+        lookups = self.fresh_hits + self.stale_hits + self.misses
+        return {
+            "shared": type(self.shared).__name__ if self.shared else None,
+            "fresh_hits": self.fresh_hits,
+            "stale_hits": self.stale_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.fresh_hits + self.stale_hits) / lookups, 4) if lookups else None,
+            "loads": self.loads,
+            "invalidations": self.invalidations,
+            "refresh_errors": self.refresh_errors,
+            "shared_errors": self.shared_errors,
+            "in_flight": len(self._inflight),
+            "tags": len(self._keys_by_tag),
+            "local": self.local.stats(),
+        }
+
+
+def build_response_cache(
+    url: str = RESPONSE_CACHE_URL,
+    ttl: float = RESPONSE_CACHE_TTL,
+    stale: float = RESPONSE_CACHE_STALE,
+    max_size: int = RESPONSE_CACHE_SIZE,
+) -> ResponseCache:
+    shared = RedisResponseTier(url) if url.startswith(("redis://", "rediss://")) else None
+    return ResponseCache(ttl=ttl, stale=stale, max_size=max_size, shared=shared)
+
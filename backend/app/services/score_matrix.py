@@ -0,0 +1,271 @@
+# app/services/score_matrix.py
+from operator import itemgetter
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+
+def _positions(starts: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """Buffer positions of every segment ``starts[i]`` .. ``starts[i] + lengths[i]``, concatenated."""
+    lengths = lengths.astype(np.int64)
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts.astype(np.int64), lengths) + np.arange(int(lengths.sum())) - offsets
+
+
+class ScoreMatrix:
+    """Category scores of every student, one variable-length segment per student.
+
+    A student's submissions sit contiguously in one (points x categories)
+    buffer, from ``first_seq`` on, with some room to grow; missing scores are
+    NaN. A student with five stored submissions takes about five slots however
+    long anyone else's history is. Alongside the scores it keeps per-student
+    running sums for a least-squares slope (x = seq - 1) and the mean of the
+    latest ``window`` submissions (the student's current level), so appending a
+    submission touches one student's segment instead of the buffer.
+    """
+
+    def __init__(self, categories: List[str], window: int = 5, students: int = 64, points: int = 1024):
+        self.categories = categories
+        self.column = {name: i for i, name in enumerate(categories)}
+        self._getter = itemgetter(*categories)
+        self.window = window
+        self.rows: Dict[str, int] = {}
+        self.student_ids: List[str] = []
+        # Students whose whole history is loaded, not just their latest submissions
+        self.full_history: Set[str] = set()
+        width = len(categories)
+        self.scores = np.full((points, width), np.nan, dtype=np.float32)
+        self.created_at = np.full(points, None, dtype=object)
+        # Buffer slots handed out so far, including the ones moved segments left behind
+        self.used = 0
+        self.starts = np.zeros(students, dtype=np.int64)
+        self.capacity = np.zeros(students, dtype=np.int64)
+        self.first_seq = np.ones(students, dtype=np.int64)
+        self.lengths = np.zeros(students, dtype=np.int64)
+        self.n = np.zeros((students, width))
+        self.sx = np.zeros((students, width))
+        self.sy = np.zeros((students, width))
+        self.sxy = np.zeros((students, width))
+        self.sxx = np.zeros((students, width))
+        self.levels = np.full((students, width), np.nan, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.student_ids)
+
+    def _grow_students(self, students: int):
+        """Make room for ``students`` rows of per-student state, at least doubling."""
+        capacity = len(self.starts)
+        if students <= capacity:
+            return
+        extra = max(students, 2 * capacity) - capacity
+        width = len(self.categories)
+        for name in ("starts", "capacity", "lengths"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra, dtype=np.int64)]))
+        self.first_seq = np.concatenate([self.first_seq, np.ones(extra, dtype=np.int64)])
+        for name in ("n", "sx", "sy", "sxy", "sxx"):
+            setattr(self, name, np.vstack([getattr(self, name), np.zeros((extra, width))]))
+        self.levels = np.vstack([self.levels, np.full((extra, width), np.nan, dtype=np.float32)])
+
+    def _row(self, student_id: str) -> int:
+        row = self.rows.get(student_id)
+        if row is None:
+            row = self.rows[student_id] = len(self.student_ids)
+            self.student_ids.append(student_id)
+            self._grow_students(row + 1)
+        return row
+
+    def segment(self, row: int) -> slice:
+        """Buffer slice holding one student's stored submissions, oldest first."""
+        start = int(self.starts[row])
+        return slice(start, start + int(self.lengths[row]))
+
+    def _allocate(self, sizes: np.ndarray) -> np.ndarray:
+        """Starts of new segments of ``sizes`` slots at the end of the buffer."""
+        needed = int(sizes.sum())
+        if self.used + needed > len(self.scores):
+            self._compact(needed)
+        starts = self.used + np.cumsum(sizes) - sizes
+        self.used += needed
+        return starts
+
+    def _compact(self, extra: int):
+        """Repack the live segments, dropping the slots moved ones left behind, with room for ``extra`` more."""
+        students = len(self.student_ids)
+        capacity = self.capacity[:students]
+        live = int(capacity.sum())
+        size = max(len(self.scores), 2 * (live + extra))
+        starts = np.cumsum(capacity) - capacity
+        source, target = _positions(self.starts[:students], capacity), _positions(starts, capacity)
+        scores = np.full((size, len(self.categories)), np.nan, dtype=np.float32)
+        scores[target] = self.scores[source]
+        created_at = np.full(size, None, dtype=object)
+        created_at[target] = self.created_at[source]
+        self.scores, self.created_at = scores, created_at
+        self.starts[:students] = starts
+        self.used = live
+
+    def _span(self, rows: np.ndarray, low: np.ndarray, high: np.ndarray):
+        """Stretch the segments of (distinct) ``rows`` to cover seqs ``low``..``high`` as well."""
+        held = self.lengths[rows] > 0
+        first = np.where(held, np.minimum(self.first_seq[rows], low), low)
+        end = np.where(held, np.maximum(self.first_seq[rows] + self.lengths[rows], high + 1), high + 1)
+        size = end - first
+        moved = (size > self.capacity[rows]) | (first < self.first_seq[rows])
+        if moved.any():
+            moving, old = rows[moved], held[moved]
+            # Half again as much room, so a run of appends moves a segment O(log n) times
+            capacity = size[moved] + np.maximum(size[moved] // 2, 1)
+            starts = self._allocate(capacity)
+            kept = moving[old]
+            source = _positions(self.starts[kept], self.lengths[kept])
+            target = _positions(starts[old] + self.first_seq[kept] - first[moved][old], self.lengths[kept])
+            self.scores[target] = self.scores[source]
+            self.created_at[target] = self.created_at[source]
+            self.starts[moving] = starts
+            self.capacity[moving] = capacity
+        self.first_seq[rows] = first
+        self.lengths[rows] = size
+
+    def _values(self, rows: List[Optional[dict]]) -> np.ndarray:
+        """(len(rows) x categories) float array from score dicts; unknown or non-numeric scores are NaN."""
+        try:
+            # Fast path for complete, numeric reports
+            return np.array([self._getter(scores) for scores in rows], dtype=np.float32).reshape(
+                len(rows), len(self.categories)
+            )
+        except (KeyError, TypeError, ValueError):
+            pass
+        return np.array(
+            [
+                [value if isinstance(value, (int, float)) else np.nan
+                 for value in ((scores or {}).get(name) for name in self.categories)]
+                for scores in rows
+            ],
+            dtype=np.float32,
+        ).reshape(len(rows), len(self.categories))
+
+    def load(self, rows: List[dict]):
+        """Bulk add submission rows (student_id, seq, created_at, scores) in a few array ops."""
+        if not rows:
+            return
+        student_rows = np.fromiter((self._row(str(r["student_id"])) for r in rows), dtype=np.int64, count=len(rows))
+        seqs = np.fromiter((int(r["seq"]) for r in rows), dtype=np.int64, count=len(rows))
+        touched, index = np.unique(student_rows, return_inverse=True)
+        low = np.full(len(touched), np.iinfo(np.int64).max)
+        high = np.zeros(len(touched), dtype=np.int64)
+        np.minimum.at(low, index, seqs)
+        np.maximum.at(high, index, seqs)
+        self._span(touched, low, high)
+        positions = self.starts[student_rows] + seqs - self.first_seq[student_rows]
+        self.scores[positions] = self._values([r.get("scores") for r in rows])
+        self.created_at[positions] = [r.get("created_at") for r in rows]
+        # Chunked so the float64 temporaries stay small for large cohorts
+        for start in range(0, len(touched), 1024):
+            self._recompute(touched[start:start + 1024])
+
+    def load_history(self, student_id: str, rows: List[dict]):
+        """Add one student's complete history; later calls for them can be skipped."""
+        self.load(rows)
+        self.full_history.add(student_id)
+
+    def _recompute(self, rows: np.ndarray):
+        """Slope sums and current levels for ``rows``, batched over their segments and categories."""
+        rows = rows[self.lengths[rows] > 0]
+        if not len(rows):
+            return
+        lengths = self.lengths[rows]
+        bounds = np.cumsum(lengths) - lengths
+        scores = self.scores[_positions(self.starts[rows], lengths)]
+        observed = ~np.isnan(scores)
+        x = (np.repeat(self.first_seq[rows] - 1, lengths) + np.arange(int(lengths.sum()))
+             - np.repeat(bounds, lengths)).astype(np.float64)[:, None]
+        y = np.where(observed, scores, 0).astype(np.float64)
+        self.n[rows] = np.add.reduceat(observed.astype(np.float64), bounds)
+        self.sx[rows] = np.add.reduceat(x * observed, bounds)
+        self.sy[rows] = np.add.reduceat(y, bounds)
+        self.sxy[rows] = np.add.reduceat(x * y, bounds)
+        self.sxx[rows] = np.add.reduceat(x * x * observed, bounds)
+        self.levels[rows] = self._levels(rows)
+
+    def _levels(self, rows: np.ndarray) -> np.ndarray:
+        """Mean of the last ``window`` submissions of each of ``rows`` (all with stored submissions)."""
+        counts = np.minimum(self.lengths[rows], self.window)
+        recent = self.scores[_positions(self.starts[rows] + self.lengths[rows] - counts, counts)]
+        observed = ~np.isnan(recent)
+        bounds = np.cumsum(counts) - counts
+        seen = np.add.reduceat(observed.astype(np.int64), bounds)
+        totals = np.add.reduceat(np.where(observed, recent, 0), bounds)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(seen > 0, totals / seen, np.nan)
+
+    def append(self, student_id: str, seq: int, scores: Optional[dict], created_at: Optional[str] = None):
+        """Add one submission and update only that student's sums and level."""
+        row = self._row(student_id)
+        rows = np.array([row])
+        first, length = int(self.first_seq[row]), int(self.lengths[row])
+        if length and first <= seq < first + length:
+            if not np.isnan(self.scores[self.starts[row] + seq - first]).all():
+                return
+        else:
+            self._span(rows, np.array([seq]), np.array([seq]))
+        position = self.starts[row] + seq - self.first_seq[row]
+        values = self._values([scores])[0]
+        self.scores[position] = values
+        self.created_at[position] = created_at
+
+        x = seq - 1
+        observed = ~np.isnan(values)
+        y = np.where(observed, values, 0)
+        self.n[row] += observed
+        self.sx[row] += x * observed
+        self.sy[row] += y
+        self.sxy[row] += x * y
+        self.sxx[row] += x * x * observed
+        self.levels[row] = self._levels(rows)[0]
+
+    def slopes(self, rows) -> np.ndarray:
+        """Least-squares score change per submission, from the running sums."""
+        n, sx, sy, sxy, sxx = (getattr(self, name)[rows] for name in ("n", "sx", "sy", "sxy", "sxx"))
+        denominator = n * sxx - sx * sx
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where((n >= 2) & (denominator > 0), (n * sxy - sx * sy) / denominator, np.nan)
+
+    def percentile_ranks(self, row: int) -> np.ndarray:
+        """Share of the cohort (every tracked student) below this student's level, per category and overall."""
+        cohort = self.levels[: len(self.student_ids)]
+        scored = (~np.isnan(cohort)).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            overall = np.where(scored > 0, np.where(np.isnan(cohort), 0, cohort).sum(axis=1) / scored, np.nan)
+        cohort = np.column_stack([cohort, overall])
+        mine = cohort[row]
+        valid = ~np.isnan(cohort)
+        below = ((cohort < mine) & valid).sum(axis=0)
+        equal = ((cohort == mine) & valid).sum(axis=0)
+        counts = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            ranks = 100.0 * (below + 0.5 * equal) / counts
+        return np.where(np.isnan(mine) | (counts == 0), np.nan, ranks)
+
+    def rolling_means(self, row: int, window: int) -> np.ndarray:
+        """Trailing ``window``-submission mean at every point of one student's stored series."""
+        length = int(self.lengths[row])
+        series = self.scores[self.segment(row)].astype(np.float64)
+        observed = ~np.isnan(series)
+        totals = np.vstack([np.zeros((1, series.shape[1])), np.cumsum(np.where(observed, series, 0), axis=0)])
+        counts = np.vstack([np.zeros((1, series.shape[1])), np.cumsum(observed, axis=0)])
+        end = np.arange(1, length + 1)
+        start = np.maximum(end - window, 0)
+        sums, seen = totals[end] - totals[start], counts[end] - counts[start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(seen > 0, sums / np.maximum(seen, 1), np.nan)
+
+    def stats(self) -> dict:
+        students = len(self.student_ids)
+        return {
+            "students": students,
+            "submissions": int(self.lengths[:students].sum()),
+            "full_histories": len(self.full_history),
+            "buffer_points": len(self.scores),
+            "used_points": self.used,
+            "array_mb": round(self.scores.nbytes / 2**20, 1),
+        }
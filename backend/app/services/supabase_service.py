@@ -1,28 +1,93 @@
-from supabase import create_client
-from app.config import SUPABASE_URL, SUPABASE_KEY
-from app.models.schemas import JournalData
-import random
+import asyncio
+from datetime import datetime
+from typing import List, Optional, Tuple
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+import httpx
+from app.config import (
+    REPORT_PREVIEW_CHARS,
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    SUPABASE_MAX_CONNECTIONS,
+    SUPABASE_TIMEOUT,
+)
+from app.models.schemas import JournalData, JournalSubmissionRecord, LearningReportResponse
+from app.services.container import services
+from app.services.response_cache import donor_tag, pair_tag, student_tag
+from app.services.telemetry import instrument
+
+# Clients are built on first use, so importing this module needs neither the
+# supabase package nor credentials
+_supabase = None
+_async_supabase = None
+_async_supabase_lock = asyncio.Lock()
 
 
 def get_supabase_client():
-    return supabase
+    global _supabase
+    if _supabase is None:
+        from supabase import create_client
+
+        _supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    return _supabase
+
+
+async def get_async_supabase_client():
+    """Shared async client; every query goes through one bounded HTTP connection pool."""
+    global _async_supabase
+    if _async_supabase is None:
+        async with _async_supabase_lock:
+            if _async_supabase is None:
+                from supabase import AsyncClientOptions, acreate_client
+
+                http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=SUPABASE_MAX_CONNECTIONS,
+                        max_keepalive_connections=SUPABASE_MAX_CONNECTIONS,
+                    ),
+                    timeout=SUPABASE_TIMEOUT,
+                    follow_redirects=True,
+                    http2=True,
+                )
+                _async_supabase = await acreate_client(
+                    SUPABASE_URL,
+                    SUPABASE_KEY,
+                    options=AsyncClientOptions(httpx_client=http_client),
+                )
+    return _async_supabase
 
 
+async def close_async_supabase_client():
+    global _async_supabase
+    options = getattr(_async_supabase, "options", None)
+    if options is not None:
+        await options.httpx_client.aclose()
+    _async_supabase = None
+
+
+# Every public method is timed as a supabase.<method> stage
+@instrument("supabase")
 class DBServiceClass:
-    def test_connection():
+    def __init__(self, client=None):
+        # An injected client (e.g. a fake in benchmarks) bypasses the shared pool
+        self.client = client
+
+    async def _get_client(self):
+        return self.client or await get_async_supabase_client()
+
+    async def test_connection(self):
         try:
+            client = await self._get_client()
             # Fetch the first row in the donor table
-            response = supabase.table("donors").select("*").limit(1).execute()
+            response = await client.table("donors").select("*").limit(1).execute()
             return response.data
         except Exception as e:
             return {"error": str(e)}
 
     async def get_data_by_student(self, student_id: str):
-        result = (
-            supabase.table("students")
-            .select("*")
+        client = await self._get_client()
+        result = await (
+            client.table("students")
+            .select("student_id, submission_count, latest_report")
             .eq("student_id", student_id)
             .execute()
         )
@@ -30,8 +95,7 @@ class DBServiceClass:
             row = result.data[0]
             return JournalData(
                 student_id=str(row["student_id"]),
-                journal_list=row.get("journal_list") or [],
-                report_list=row.get("report_list") or [],
+                submission_count=row.get("submission_count") or 0,
                 latest_report=row.get("latest_report") or {},
             )
         return None
@@ -39,34 +103,85 @@ class DBServiceClass:
     async def save_new_submission(
         self, student_id: str, new_journal: str, new_report: dict
     ):
-        # Fetch current data
-        existing = await self.get_data_by_student(student_id)
-        journals_list = (
-            existing.journal_list + [new_journal] if existing else [new_journal]
+        """Append one submission; latest_report and submission_count are updated in the same transaction"""
+        try:
+            client = await self._get_client()
+            result = await client.rpc(
+                "append_submission",
+                {
+                    "p_student_id": student_id,
+                    "p_journal": new_journal,
+                    "p_report": new_report,
+                },
+            ).execute()
+            # The donor's child list shows the submission count
+            await services.response_cache.invalidate(student_tag(student_id))
+            return result
+        except Exception as e:
+            raise e
+
+    async def get_submissions(self, student_id: str, limit: int = 20, before_seq: int = None):
+        """Page through a student's submissions, newest first"""
+        client = await self._get_client()
+        query = (
+            client.table("journal_submissions")
+            .select("seq, journal, report, created_at")
+            .eq("student_id", student_id)
         )
-        report_list = existing.report_list + [new_report] if existing else [new_report]
+        if before_seq is not None:
+            query = query.lt("seq", before_seq)
+        res = await query.order("seq", desc=True).limit(limit).execute()
+        return [JournalSubmissionRecord(**row) for row in (res.data or [])]
 
-        data = {
-            "student_id": student_id,
-            "journal_list": journals_list,
-            "report_list": report_list,
-            "latest_report": new_report,
-        }
+    async def get_recent_submission_scores(self, window: int, page_size: int = 1000) -> List[dict]:
+        """Category scores (no journal text) of every student's latest ``window`` submissions.
 
-        try:
-            result = (
-                supabase.table("students")
-                .update(data)
+        Students are paged by id, ``page_size // window`` at a time so no
+        response holds more than ``page_size`` rows, and each page's
+        submissions come from recent_submission_scores() (migrations/006).
+        """
+        client = await self._get_client()
+        per_page = max(page_size // max(window, 1), 1)
+        rows, last_id = [], None
+        while True:
+            query = client.table("students").select("student_id").order("student_id").limit(per_page)
+            if last_id is not None:
+                query = query.gt("student_id", last_id)
+            students = (await query.execute()).data or []
+            if students:
+                res = await client.rpc(
+                    "recent_submission_scores",
+                    {"p_student_ids": [str(s["student_id"]) for s in students], "p_window": window},
+                ).execute()
+                rows.extend(res.data or [])
+            if len(students) < per_page:
+                return rows
+            last_id = students[-1]["student_id"]
+
+    async def get_student_submission_scores(self, student_id: str, page_size: int = 1000) -> List[dict]:
+        """One student's category scores (no journal text) in seq order, paged by seq."""
+        client = await self._get_client()
+        rows, last_seq = [], None
+        while True:
+            query = (
+                client.table("journal_submissions")
+                .select("student_id, seq, created_at, scores:report->scores")
                 .eq("student_id", student_id)
-                .execute()
+                .order("seq")
+                .limit(page_size)
             )
-            return result
-        except Exception as e:
-            raise e
+            if last_seq is not None:
+                query = query.gt("seq", last_seq)
+            res = await query.execute()
+            rows.extend(res.data or [])
+            if len(res.data or []) < page_size:
+                return rows
+            last_seq = res.data[-1]["seq"]
 
-    def get_linked_donor_id(self, student_id: str):
-        res = (
-            supabase.table("student_donor_links")
+    async def get_linked_donor_id(self, student_id: str):
+        client = await self._get_client()
+        res = await (
+            client.table("student_donor_links")
             .select("donor_id")
             .eq("student_id", student_id)
             .maybe_single()
@@ -76,64 +191,197 @@ class DBServiceClass:
             return None
         return res.data["donor_id"]
 
-    def pick_random_donor_id(self) -> str:
-        res = supabase.table("donors").select("id").execute()
-        ids = [row["id"] for row in (res.data or [])]
-        if not ids:
-            raise RuntimeError("No donors available")
-        return random.choice(ids)
-
-    def ensure_student_donor_link(self, student_id: str) -> str:
-        donor_id = self.get_linked_donor_id(student_id)
-        if donor_id:
-            return donor_id
-        donor_id = self.pick_random_donor_id()
+    async def get_donor_loads(self, page_size: int = 1000) -> List[dict]:
+        """Every donor's id, capacity and linked-student counter, paged by id."""
+        client = await self._get_client()
+        rows, last_id = [], None
+        while True:
+            query = (
+                client.table("donors")
+                .select("id, capacity, linked_students")
+                .order("id")
+                .limit(page_size)
+            )
+            if last_id is not None:
+                query = query.gt("id", last_id)
+            res = await query.execute()
+            rows.extend(res.data or [])
+            if len(res.data or []) < page_size:
+                return rows
+            last_id = res.data[-1]["id"]
+
+    async def link_student_to_donor(self, student_id: str, donor_id: str):
+        client = await self._get_client()
         # idempotent: student_id is PK in link table, so duplicates won’t create multiple links
-        supabase.table("student_donor_links").upsert(
+        await client.table("student_donor_links").upsert(
             {"student_id": student_id, "donor_id": donor_id}
         ).execute()
-        return donor_id
+        await services.response_cache.invalidate(donor_tag(donor_id))
+
+    @staticmethod
+    def report_preview(learning_report: dict) -> dict:
+        """What a notification keeps of its report; mirrors the backfill in migrations/005."""
+        progress_update = learning_report.get("progress_update") or ""
+        if len(progress_update) > REPORT_PREVIEW_CHARS:
+            progress_update = progress_update[: REPORT_PREVIEW_CHARS - 1].rstrip(" ") + "…"
+        return {
+            "overall_score": learning_report.get("overall_score"),
+            "progress_update": progress_update,
+        }
+
+    @staticmethod
+    def notification_row(
+        donor_id: str, student_id: str, learning_report: dict, journal: str, journal_topic: str
+    ) -> dict:
+        """A notification referencing the report's journal_submissions row, with a preview.
+
+        A report without a submission id (not saved through append_submission)
+        is still stored whole, so get_notification_report can always answer.
+        """
+        submission_id = learning_report.get("submission_id")
+        return {
+            "donor_id": donor_id,
+            "student_id": student_id,
+            "submission_id": submission_id,
+            "report_preview": DBServiceClass.report_preview(learning_report),
+            "learning_report": None if submission_id is not None else learning_report,
+            "journal_image": journal,
+            "journal_topic": journal_topic,
+            "is_read": False,
+        }
 
-    def notify_donor_of_new_report(
+    async def notify_donor_of_new_report(
         self, donor_id: str, student_id: str, learning_report: dict, journal: str, journal_topic: str
     ):
         try:
-            data = {
-                "donor_id": donor_id,
-                "student_id": student_id,
-                "learning_report": learning_report,
-                "journal_image": journal,
-                "journal_topic": journal_topic,
-                "is_read": False,
-            }
-            res = supabase.table("notifications").insert(data).execute()
+            client = await self._get_client()
+            data = self.notification_row(
+                donor_id, student_id, learning_report, journal, journal_topic
+            )
+            res = await client.table("notifications").insert(data).execute()
+            await services.response_cache.invalidate(pair_tag(donor_id, student_id))
             return res
         except Exception as e:
             return {"error": str(e)}
 
-    def get_all_notifications(self, donor_id: str, student_id: str):
-        res = (
-            supabase.table("notifications")
-            .select("*")
+    async def insert_notifications(self, rows: list):
+        """Bulk insert notification rows built with notification_row"""
+        if not rows:
+            return None
+        client = await self._get_client()
+        res = await client.table("notifications").insert(rows).execute()
+        await services.response_cache.invalidate(*{pair_tag(row["donor_id"], row["student_id"]) for row in rows})
+        return res
+
+    # Everything but the legacy learning_report column; open a report with get_notification_report
+    NOTIFICATION_COLUMNS = (
+        "id, donor_id, student_id, created_at, is_read, journal_topic, journal_image, "
+        "submission_id, report_preview"
+    )
+
+    async def get_all_notifications(self, donor_id: str, student_id: str):
+        client = await self._get_client()
+        res = await (
+            client.table("notifications")
+            .select(self.NOTIFICATION_COLUMNS)
             .eq("student_id", student_id)
             .eq("donor_id", donor_id)
             .execute()
         )
-        print(res.data)
         return res.data
 
-    def get_all_children(self, donor_id: str):
-        res = (
-            supabase.table("student_donor_links")
+    NOTIFICATION_PREVIEW_COLUMNS = (
+        "id, created_at, is_read, journal_topic, journal_image, "
+        "progress_update:report_preview->>progress_update, "
+        "overall_score:report_preview->overall_score"
+    )
+
+    async def get_notifications_page(
+        self,
+        donor_id: str,
+        student_id: str,
+        limit: int = 20,
+        before: Optional[Tuple[datetime, int]] = None,
+        since: Optional[Tuple[datetime, int]] = None,
+    ):
+        """Keyset page of notification previews ordered by (created_at, id).
+
+        ``before`` pages backwards through history, newest first. ``since``
+        returns rows created after the cursor, oldest first, for incremental
+        sync. Report bodies are left out; see get_notification_report.
+        """
+        client = await self._get_client()
+        query = (
+            client.table("notifications")
+            .select(self.NOTIFICATION_PREVIEW_COLUMNS)
+            .eq("donor_id", donor_id)
+            .eq("student_id", student_id)
+        )
+        if since is not None:
+            created_at, row_id = since
+            query = query.or_(
+                f'created_at.gt."{created_at.isoformat()}",'
+                f'and(created_at.eq."{created_at.isoformat()}",id.gt.{int(row_id)})'
+            )
+            query = query.order("created_at").order("id")
+        else:
+            if before is not None:
+                created_at, row_id = before
+                query = query.or_(
+                    f'created_at.lt."{created_at.isoformat()}",'
+                    f'and(created_at.eq."{created_at.isoformat()}",id.lt.{int(row_id)})'
+                )
+            query = query.order("created_at", desc=True).order("id", desc=True)
+        res = await query.limit(limit).execute()
+        return res.data or []
+
+    async def get_notification_report(self, donor_id: str, notification_id: int):
+        """The full report of one of the donor's notifications, read from journal_submissions.
+
+        Rows the migration could not match to a submission still carry the
+        report in learning_report and are answered from there.
+        """
+        client = await self._get_client()
+        res = await (
+            client.table("notifications")
+            .select("id, submission_id, learning_report")
+            .eq("donor_id", donor_id)
+            .eq("id", notification_id)
+            .maybe_single()
+            .execute()
+        )
+        if not res:
+            return None
+        submission_id = res.data.get("submission_id")
+        if submission_id is None:
+            return res.data.get("learning_report")
+        submission = await (
+            client.table("journal_submissions")
+            .select("id, report")
+            .eq("id", submission_id)
+            .maybe_single()
+            .execute()
+        )
+        if not submission:
+            return None
+        return LearningReportResponse.from_report(
+            submission.data["report"], submission_id=submission_id
+        ).model_dump()
+
+    async def get_all_children(self, donor_id: str):
+        client = await self._get_client()
+        res = await (
+            client.table("student_donor_links")
             .select("student_id")
             .eq("donor_id", donor_id)
             .execute()
         )
         return res.data
 
-    def get_child_information_by_id(self, student_id: str):
-        res = (
-            supabase.table("students")
+    async def get_child_information_by_id(self, student_id: str):
+        client = await self._get_client()
+        res = await (
+            client.table("students")
             .select("*")
             .eq("student_id", student_id)
             .execute()
@@ -142,19 +390,21 @@ class DBServiceClass:
             return res.data[0]
         return None
 
-    def get_donor_by_supabase_id(self, supabase_id: str):
-        res = (
-            supabase.table("donors").select("id").eq("auth_uid", supabase_id).execute()
+    async def get_donor_by_supabase_id(self, supabase_id: str):
+        client = await self._get_client()
+        res = await (
+            client.table("donors").select("id").eq("auth_uid", supabase_id).execute()
         )
         if res.data:
             return res.data
         return None
 
-    def get_latest_notification(self, donor_id: str, student_id: str):
+    async def get_latest_notification(self, donor_id: str, student_id: str):
         """Get the most recent notification for a donor-student pair"""
-        res = (
-            supabase.table("notifications")
-            .select("*")
+        client = await self._get_client()
+        res = await (
+            client.table("notifications")
+            .select(self.NOTIFICATION_COLUMNS)
             .eq("donor_id", donor_id)
             .eq("student_id", student_id)
             .order("created_at", desc=True)
@@ -165,19 +415,87 @@ class DBServiceClass:
             return res.data[0]
         return None
 
-    def count_unread_notifications(self, donor_id: str, student_id: str):
-        """Count unread notifications for a donor-student pair"""
-        res = (
-            supabase.table("notifications")
-            .select("*", count="exact")
+    async def count_unread_notifications(self, donor_id: str, student_id: str):
+        """Unread notifications for a donor-student pair, from its summary row"""
+        client = await self._get_client()
+        res = await (
+            client.table("conversation_summaries")
+            .select("unread_count")
+            .eq("donor_id", donor_id)
+            .eq("student_id", student_id)
+            .maybe_single()
+            .execute()
+        )
+        if not res:
+            return 0
+        return res.data["unread_count"] or 0
+
+    async def get_conversation_summary(self, donor_id: str, student_id: str):
+        """Unread count and newest notification of a donor-student pair; None before the first one"""
+        client = await self._get_client()
+        res = await (
+            client.table("conversation_summaries")
+            .select("unread_count, last_notification_id, last_at")
             .eq("donor_id", donor_id)
             .eq("student_id", student_id)
-            .eq("is_read", False) 
+            .maybe_single()
             .execute()
         )
-        return res.count or 0
+        return res.data if res else None
+
+    async def get_children_information_by_ids(self, student_ids: list):
+        """Fetch all students in one query, keyed by student_id"""
+        if not student_ids:
+            return {}
+        client = await self._get_client()
+        res = await (
+            client.table("students")
+            .select("student_id, name, age, location, submission_count")
+            .in_("student_id", student_ids)
+            .execute()
+        )
+        return {str(row["student_id"]): row for row in (res.data or [])}
+
+    async def get_conversation_summaries(self, donor_id: str, student_ids: list = None):
+        """Unread count and last message per student, from the maintained summary table"""
+        client = await self._get_client()
+        query = (
+            client.table("conversation_summaries")
+            .select("student_id, unread_count, last_message, last_journal_image, last_at")
+            .eq("donor_id", donor_id)
+        )
+        if student_ids is not None:
+            query = query.in_("student_id", student_ids)
+        res = await query.execute()
+        return {str(row["student_id"]): row for row in (res.data or [])}
 
-    def mark_notifications_as_read(self, donor_id: str, student_id: str):
+    async def mark_notifications_as_read(self, donor_id: str, student_id: str):
         """Mark all notifications as read for a donor-student pair"""
-        supabase.table("notifications").update({"is_read": True}).eq("donor_id", donor_id).eq("student_id", student_id).execute()
+        client = await self._get_client()
+        # Only unread rows are rewritten; the summary trigger resets the counter
+        await (
+            client.table("notifications")
+            .update({"is_read": True})
+            .eq("donor_id", donor_id)
+            .eq("student_id", student_id)
+            .eq("is_read", False)
+            .execute()
+        )
+        await services.response_cache.invalidate(pair_tag(donor_id, student_id))
         return {"success": True, "message": "Notifications marked as read"}
+
+    async def insert_journal_entry(self, student_id: str, image_url: str, extracted_text: str):
+        client = await self._get_client()
+        payload = {
+            "student_id": student_id,
+            "image_url": image_url,
+            "extracted_text": extracted_text,
+        }
+        return await client.table("journal_entries").insert(payload).execute()
+
+    async def insert_journal_entries(self, rows: list):
+        """Bulk insert journal_entries rows of student_id, image_url and extracted_text"""
+        if not rows:
+            return None
+        client = await self._get_client()
+        return await client.table("journal_entries").insert(rows).execute()
@@ -0,0 +1,76 @@
+# app/services/upload_pipeline.py
+from app.config import (
+    FUSED_OCR_SCORE,
+    JOB_LEASE,
+    JOB_QUEUE_DB,
+    JOB_STAGE_BACKOFF,
+    JOB_STAGE_MAX_ATTEMPTS,
+    JOB_WORKERS,
+)
+from app.services.container import services
+from app.services.job_queue import JobQueue, SQLiteJobStore
+from app.services.ocr_service import aextract_text_from_image_url
+
+
+async def ocr_stage(state: dict) -> dict:
+    # Gemini concurrency and rate are bounded by the shared limiter
+    if FUSED_OCR_SCORE:
+        # Also appends the submission, so nothing after it may fail in this stage
+        extracted_text, report = await services.learning_reports.generate_learning_report_from_image(
+            state["student_id"], state["file_url"], state["journal_topic"]
+        )
+        return {"extracted_text": extracted_text, "report": report.model_dump()}
+    return {"extracted_text": await aextract_text_from_image_url(state["file_url"])}
+
+
+async def journal_stage(state: dict) -> dict:
+    # Its own stage: retrying a failed insert must not redo the OCR or the fused append
+    await services.database.insert_journal_entry(
+        student_id=state["student_id"],
+        image_url=state["file_url"],
+        extracted_text=state["extracted_text"],
+    )
+    return {}
+
+
+async def report_stage(state: dict) -> dict:
+    if "report" in state:
+        # Already scored by the fused call in the ocr stage
+        return {}
+    report = await services.learning_reports.generate_learning_report(
+        state["student_id"], state["extracted_text"], state["journal_topic"]
+    )
+    return {"report": report.model_dump()}
+
+
+async def link_stage(state: dict) -> dict:
+    donor_id = await services.linking_service.ensure_student_donor_link(state["student_id"])
+    return {"donor_id": donor_id}
+
+
+async def notify_stage(state: dict) -> dict:
+    await services.notifier.notify_donor_of_new_report(
+        student_id=state["student_id"],
+        learning_report=state["report"],
+        image_url=state["file_url"],
+        journal_topic=state["journal_topic"],
+    )
+    return {}
+
+
+def build_upload_queue() -> JobQueue:
+    """The upload pipeline's queue; its job store is opened here, not at import."""
+    return JobQueue(
+        stages=[
+            ("ocr", ocr_stage),
+            ("journal", journal_stage),
+            ("report", report_stage),
+            ("link", link_stage),
+            ("notify", notify_stage),
+        ],
+        store=SQLiteJobStore(JOB_QUEUE_DB),
+        workers=JOB_WORKERS,
+        max_attempts=JOB_STAGE_MAX_ATTEMPTS,
+        backoff_base=JOB_STAGE_BACKOFF,
+        lease=JOB_LEASE,
+    )
@@ -0,0 +1,100 @@
+"""Donor assignment cost at 100k donors: full-table pick vs the assignment engine.
+
+The legacy pick downloads every donor id for each new student. The engine
+loads the donors once into an in-memory index and then picks in O(1) or
+O(log n). It is compared on time per pick, rows read from the database and
+how evenly students end up spread over donors.
+
+    python -m benchmarks.bench_donor_assignment --donors 100000 --students 5000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.fakes import FakeAsyncSupabaseClient
+from app.services import supabase_service
+from app.services.donor_assignment import STRATEGIES, DonorAssignmentEngine
+from app.services.supabase_service import DBServiceClass
+
+
+def seed(donors: int) -> FakeAsyncSupabaseClient:
+    fake = FakeAsyncSupabaseClient()
+    rng = random.Random(7)
+    fake.tables["donors"] = [
+        {
+            "id": f"donor-{i:06d}",
+            "capacity": rng.choice([None, 1, 2, 5, 20]),
+            "linked_students": rng.randrange(3),
+        }
+        for i in range(donors)
+    ]
+    return fake
+
+
+async def legacy_pick(db: DBServiceClass) -> str:
+    client = await db._get_client()
+    res = await client.table("donors").select("id").execute()
+    return random.choice([row["id"] for row in res.data])
+
+
+def spread(loads: dict, rows: list) -> dict:
+    counts = [row["linked_students"] + loads.get(row["id"], 0) for row in rows]
+    return {"max_load": max(counts), "min_load": min(counts)}
+
+
+async def run(args) -> dict:
+    fake = seed(args.donors)
+    supabase_service._async_supabase = fake
+    db = DBServiceClass()
+    results = {}
+
+    picks = max(1, args.students // 100)
+    start = time.perf_counter()
+    for _ in range(picks):
+        await legacy_pick(db)
+    elapsed = time.perf_counter() - start
+    results["legacy_select_all"] = {
+        "picks": picks,
+        "ms_per_pick": round(elapsed / picks * 1000, 3),
+        "rows_read_per_pick": fake.rows_returned // picks,
+    }
+
+    for strategy in STRATEGIES:
+        fake.rows_returned = 0
+        # Large pages keep the fake's per-query scan from dominating the refresh
+        engine = DonorAssignmentEngine(strategy=strategy, ttl=None, db=db, page_size=10_000)
+        start = time.perf_counter()
+        await engine.refresh()
+        refresh = time.perf_counter() - start
+        refresh_rows = fake.rows_returned
+
+        loads = {}
+        start = time.perf_counter()
+        for _ in range(args.students):
+            donor_id = await engine.pick_donor()
+            engine.record_link(donor_id)
+            loads[donor_id] = loads.get(donor_id, 0) + 1
+        elapsed = time.perf_counter() - start
+        results[strategy] = {
+            "picks": args.students,
+            "refresh_seconds": round(refresh, 3),
+            "refresh_rows_read": refresh_rows,
+            "us_per_pick": round(elapsed / args.students * 1e6, 2),
+            "rows_read_per_pick": (fake.rows_returned - refresh_rows) / args.students,
+            **spread(loads, fake.tables["donors"]),
+        }
+    return {"donors": args.donors, **results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--donors", type=int, default=100_000)
+    parser.add_argument("--students", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compare Supabase round trips for the donor inbox: per-child queries vs summary reads.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_donor_inbox --children 10 40 100 --latency 0.005
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.fakes import FakeAsyncSupabaseClient, seed_donor_inbox
+from app.routes import donor
+from app.services import supabase_service
+from app.services.container import services
+from app.services.linking_service import link_cache
+from app.services.supabase_service import DBServiceClass
+
+DONOR_ID = "donor-1"
+
+
+async def per_child_inbox(database: DBServiceClass, donor_id: str):
+    """The original 1 + 3N query pattern of get_all_children."""
+    links = await database.get_all_children(donor_id)
+    for link in links:
+        student_id = str(link["student_id"])
+        if await database.get_child_information_by_id(student_id):
+            if await database.get_latest_notification(donor_id, student_id):
+                await database.count_unread_notifications(donor_id, student_id)
+
+
+def run(children: int, latency: float) -> dict:
+    client = FakeAsyncSupabaseClient(latency=latency)
+    seed_donor_inbox(client, DONOR_ID, children)
+    database = DBServiceClass(client=client)
+    # The app's services (route database, link cache) use the shared client, so they hit the fake too
+    supabase_service._async_supabase = client
+    link_cache.clear()
+    services.response_cache.clear()
+
+    client.round_trips = 0
+    start = time.perf_counter()
+    asyncio.run(per_child_inbox(database, DONOR_ID))
+    per_child = {"round_trips": client.round_trips, "seconds": time.perf_counter() - start}
+
+    client.round_trips = 0
+    start = time.perf_counter()
+    rows = asyncio.run(donor.get_all_children(DONOR_ID))
+    batched = {"round_trips": client.round_trips, "seconds": time.perf_counter() - start}
+    assert len(rows) == children
+
+    return {"children": children, "per_child": per_child, "batched": batched}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--children", type=int, nargs="+", default=[10, 40, 100])
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="simulated seconds per Supabase round trip")
+    args = parser.parse_args()
+    print(json.dumps([run(n, args.latency) for n in args.children], indent=2))
+
+
+if __name__ == "__main__":
+    main()
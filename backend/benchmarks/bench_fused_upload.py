@@ -0,0 +1,144 @@
+"""End-to-end upload latency: OCR then scoring (two calls) vs one fused call.
+
+Both Gemini SDKs are replaced by stubs whose latency is a fixed per-call
+overhead, plus a transfer cost whenever the request carries the image.
+Supabase is the in-process fake. Each upload uses a distinct photo so the
+OCR cache never hits.
+
+    python -m benchmarks.bench_fused_upload --uploads 20 --call-overhead 0.3
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("OCR_CACHE_DB", "")
+os.environ.setdefault("GEMINI_RPM", "0")
+os.environ.setdefault("GEMINI_MAX_CONCURRENCY", "64")
+
+from benchmarks.fakes import FakeAsyncSupabaseClient  # noqa: E402
+from benchmarks.fixtures import journal_photo  # noqa: E402
+from app.services import ocr_service, supabase_service  # noqa: E402
+from app.services.cache import TTLCache  # noqa: E402
+from app.services.container import services  # noqa: E402
+from app.services.ocr_cache import OCRCache  # noqa: E402
+from app.services.learning_report import LearningReportClass  # noqa: E402
+
+TRANSCRIPTION = "Today I went to the park with my brother and we played football."
+
+
+class StubResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+class StubModels:
+    """Stands in for ``genai.Client().aio.models`` (OCR and fused calls)."""
+
+    def __init__(self, bench):
+        self.bench = bench
+
+    async def generate_content(self, model, contents, config=None):
+        await self.bench.model_call(with_image=True)
+        schema = getattr(config, "response_json_schema", None) or {}
+        if "transcription" in schema.get("properties", {}):
+            return StubResponse(json.dumps({"transcription": TRANSCRIPTION, **self.bench.report}))
+        return StubResponse(TRANSCRIPTION)
+
+
+class StubGenai:
+    def __init__(self, bench):
+        self.aio = type("Aio", (), {"models": StubModels(bench)})()
+
+
+class Bench:
+    def __init__(self, call_overhead: float, image_cost: float, categories):
+        self.call_overhead = call_overhead
+        self.image_cost = image_cost
+        self.calls = 0
+        self.report = {
+            "scores": {key: 3 for key in categories},
+            "overall_score": 3.0,
+            "progress_update": "Steady progress.",
+            "summary": "A clear entry about the weekend.",
+        }
+
+    async def model_call(self, with_image: bool):
+        self.calls += 1
+        await asyncio.sleep(self.call_overhead + (self.image_cost if with_image else 0))
+
+    async def score(self, prompt, generation_config=None):
+        await self.model_call(with_image=False)
+        return StubResponse(json.dumps(self.report))
+
+
+async def run(mode: str, args, photos) -> dict:
+    supabase_service._async_supabase = fake = FakeAsyncSupabaseClient(latency=args.db_latency)
+    for i in range(len(photos)):
+        fake.tables.setdefault("students", []).append(
+            {"student_id": str(i), "submission_count": 0, "latest_report": {}}
+        )
+    lr = LearningReportClass()
+    bench = Bench(args.call_overhead, args.image_cost, lr.llm.score_categories)
+    ocr_service._genai_client = StubGenai(bench)
+    lr.llm.model.generate_content_async = bench.score
+    services.ocr_cache = OCRCache([TTLCache()])
+
+    async def upload(i: int, path: str) -> float:
+        start = time.perf_counter()
+        if mode == "fused":
+            await lr.generate_learning_report_from_image(str(i), path, "My weekend")
+        else:
+            text = await ocr_service.aextract_text_from_image_url(path)
+            await lr.generate_learning_report(str(i), text, "My weekend")
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = sorted(await asyncio.gather(*(upload(i, p) for i, p in enumerate(photos))))
+    wall = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "uploads": len(photos),
+        "model_calls": bench.calls,
+        "latency_p50": round(statistics.median(latencies), 4),
+        "latency_p95": round(latencies[int(0.95 * (len(latencies) - 1))], 4),
+        "wall_seconds": round(wall, 4),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=20)
+    parser.add_argument("--call-overhead", type=float, default=0.3,
+                        help="simulated seconds per Gemini call")
+    parser.add_argument("--image-cost", type=float, default=0.15,
+                        help="extra simulated seconds when the call carries the image")
+    parser.add_argument("--db-latency", type=float, default=0.01)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        photos = []
+        for i in range(args.uploads):
+            path = os.path.join(tmp, f"journal-{i}.jpg")
+            with open(path, "wb") as f:
+                f.write(journal_photo(size=(1600, 1200), seed=i))
+            photos.append(path)
+        # The report service prints every report; keep stdout for the results
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = [asyncio.run(run(mode, args, photos)) for mode in ("two_call", "fused")]
+
+    two_call, fused = results
+    print(json.dumps({
+        "results": results,
+        "p50_speedup": round(two_call["latency_p50"] / fused["latency_p50"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
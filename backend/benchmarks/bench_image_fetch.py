@@ -0,0 +1,68 @@
+"""Connections, bytes and latency for journal image downloads against a local HTTP server.
+
+Compares the old bare ``requests.get`` per upload with the pooled, conditional
+``ImageFetcher`` and checks that oversized bodies are cut off.
+
+    python -m benchmarks.bench_image_fetch --fetches 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import requests
+
+from benchmarks.fixtures import journal_photo
+from benchmarks.local_http import LocalFileServer
+from app.services.image_fetcher import ImageFetcher, ImageTooLargeError
+
+
+def timed(server: LocalFileServer, fn, fetches: int) -> dict:
+    server.reset_stats()
+    start = time.perf_counter()
+    for _ in range(fetches):
+        fn()
+    elapsed = time.perf_counter() - start
+    return {**server.stats, "seconds": round(elapsed, 4)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fetches", type=int, default=50)
+    args = parser.parse_args()
+
+    photo = journal_photo((1600, 1200))
+    with LocalFileServer({"/journal.jpg": photo, "/huge.jpg": b"\0" * (2 * 1024 * 1024)}) as server:
+        url = server.url("/journal.jpg")
+        results = {
+            "bare_requests": timed(server, lambda: requests.get(url).content, args.fetches),
+        }
+
+        # Without an ETag cache this measures connection reuse alone
+        no_etag = ImageFetcher(etag_cache_size=0)
+        results["pooled"] = timed(server, lambda: no_etag.fetch(url), args.fetches)
+
+        fetcher = ImageFetcher()
+        results["pooled_conditional"] = timed(server, lambda: fetcher.fetch(url), args.fetches)
+
+        async def fetch_concurrently():
+            await asyncio.gather(*(fetcher.afetch(url) for _ in range(args.fetches)))
+            await fetcher.aclose()
+
+        server.reset_stats()
+        start = time.perf_counter()
+        asyncio.run(fetch_concurrently())
+        results["async_conditional"] = {**server.stats, "seconds": round(time.perf_counter() - start, 4)}
+
+        capped = ImageFetcher(max_bytes=1024 * 1024)
+        try:
+            capped.fetch(server.url("/huge.jpg"))
+            results["size_cap"] = "not enforced"
+        except ImageTooLargeError as e:
+            results["size_cap"] = str(e)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
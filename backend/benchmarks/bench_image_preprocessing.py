@@ -0,0 +1,96 @@
+"""Bytes sent to Gemini, decode time and peak RSS with and without OCR preprocessing.
+
+Each measurement runs in a fresh interpreter so peak RSS is not polluted by
+earlier fixtures.
+
+    python -m benchmarks.bench_image_preprocessing --count 3
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+
+def peak_rss_kb() -> int:
+    # ru_maxrss survives fork/exec on Linux, so prefer the per-process high-water mark
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(mode: str, path: str) -> dict:
+    from PIL import Image
+    from app.services.image_preprocessing import PreprocessConfig, _draft_size, preprocess_image
+
+    data = Path(path).read_bytes()
+    config = PreprocessConfig()
+    baseline_rss = peak_rss_kb()
+    start = time.perf_counter()
+    image = Image.open(BytesIO(data))
+    if mode == "preprocessed":
+        image.draft("L", _draft_size(image.size, config.max_long_edge))
+    image.load()
+    decode_seconds = time.perf_counter() - start
+
+    del image
+
+    if mode == "original":
+        # What the OCR path did before: decode the upload and send it as is
+        sent = len(data)
+    else:
+        sent = len(preprocess_image(data, config)[0])
+    total_seconds = time.perf_counter() - start
+    return {
+        "bytes_sent": sent,
+        "decode_seconds": round(decode_seconds, 4),
+        "total_seconds": round(total_seconds, 4),
+        "peak_rss_delta_kb": peak_rss_kb() - baseline_rss,
+    }
+
+
+def run_isolated(mode: str, path: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_image_preprocessing", "--measure", mode, path],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(out.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=3, help="number of JPEG fixtures")
+    parser.add_argument("--measure", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(*args.measure)))
+        return
+
+    from benchmarks.fixtures import fixture_set
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, data in fixture_set(args.count):
+            path = Path(tmp) / name
+            path.write_bytes(data)
+            results.append({
+                "fixture": name,
+                "upload_bytes": len(data),
+                "before": run_isolated("original", str(path)),
+                "after": run_isolated("preprocessed", str(path)),
+            })
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Notification row size and donor feed payload with full report copies vs report references.
+
+Seeds journal_submissions and, for each submission, a notification in the old
+layout, carrying the whole learning report. Row size and the payloads of
+get_all_notifications and one keyset feed page are measured as compact JSON.
+Then the rows are migrated the way migrations/005 does it and the same reads
+are measured again through DBServiceClass. Last, ``--opens`` reports are opened
+through the report route, cold and then from the report cache, and every one
+must equal the copy the notification used to carry.
+
+    python -m benchmarks.bench_notification_payload --donors 5 --children 10 --reports 20
+
+JSON bytes stand in for row size; run the queries at the end of
+migrations/005 against Postgres for on-disk numbers.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from benchmarks.fakes import FakeAsyncSupabaseClient, conversation_summaries, migrate_notification_reports
+from app.models.schemas import LearningReportResponse
+from app.routes import donor
+from app.services import supabase_service
+from app.services.container import services
+from app.services.llm_service import SCORE_CATEGORIES
+
+# What get_notifications_page selected before notifications referenced their report
+LEGACY_PREVIEW_COLUMNS = (
+    "id, created_at, is_read, journal_topic, journal_image, "
+    "progress_update:learning_report->>progress_update, "
+    "overall_score:learning_report->overall_score"
+)
+WORDS = ("writing", "sentences", "vocabulary", "paragraph", "detail", "story", "clearly",
+         "improved", "weekend", "family", "describes", "connectors", "spelling", "careful")
+
+
+def text(rng: random.Random, chars: int) -> str:
+    words = []
+    while sum(len(w) + 1 for w in words) < chars:
+        words.append(rng.choice(WORDS))
+    return " ".join(words).capitalize() + "."
+
+
+def model_report(rng: random.Random, args) -> dict:
+    """A report as the scoring model returns it and journal_submissions stores it."""
+    scores = {category: rng.randint(1, 5) for category in SCORE_CATEGORIES}
+    return {
+        "summary": text(rng, args.summary_chars),
+        "progress_update": text(rng, args.progress_chars),
+        "scores": scores,
+        "overall_score": round(statistics.mean(scores.values()), 1),
+    }
+
+
+def seed_legacy(client, args) -> dict:
+    """Submissions plus old-layout notifications; returns each notification's report copy."""
+    rng = random.Random(args.seed)
+    students, notifications = client.tables.setdefault("students", []), client.tables.setdefault("notifications", [])
+    copies = {}
+    for d in range(args.donors):
+        donor_id = f"donor-{d}"
+        for c in range(args.children):
+            student_id = str(10_000 * (d + 1) + c)
+            students.append({"student_id": student_id, "submission_count": 0, "latest_report": {}})
+            client.tables.setdefault("student_donor_links", []).append(
+                {"student_id": student_id, "donor_id": donor_id}
+            )
+            for n in range(args.reports):
+                created_at = f"2025-{1 + n // 28:02d}-{1 + n % 28:02d}T09:00:00+00:00"
+                submission = client.functions["append_submission"](
+                    client, student_id, text(rng, 400), model_report(rng, args)
+                )
+                submission["created_at"] = created_at
+                # The old rows held the response exactly as the submit path dumped it
+                report = LearningReportResponse.from_report(submission["report"]).model_dump(
+                    exclude={"submission_id"}
+                )
+                row = client.with_defaults({
+                    "donor_id": donor_id,
+                    "student_id": student_id,
+                    "learning_report": report,
+                    "journal_image": f"https://example.com/journals/{student_id}/{n}.jpg",
+                    "journal_topic": "My weekend",
+                    "is_read": n < args.reports - 2,
+                    "created_at": created_at,
+                })
+                notifications.append(row)
+                copies[(donor_id, row["id"])] = report
+    conversation_summaries(client, notifications)
+    return copies
+
+
+def payload_bytes(value) -> int:
+    return len(json.dumps(value, separators=(",", ":"), default=str).encode())
+
+
+def size_stats(sizes: list) -> dict:
+    sizes = sorted(sizes)
+    return {
+        "mean": round(statistics.mean(sizes)),
+        "p50": sizes[len(sizes) // 2],
+        "max": sizes[-1],
+        "total_kb": round(sum(sizes) / 1024, 1),
+    }
+
+
+async def measure(client, args, pairs: list, legacy: bool) -> dict:
+    """Row size and inbox payloads; ``legacy`` issues the queries the old code made."""
+    db = services.database
+    all_sizes, page_sizes = [], []
+    for donor_id, student_id in pairs:
+        if legacy:
+            rows = (await client.table("notifications").select("*")
+                    .eq("student_id", student_id).eq("donor_id", donor_id).execute()).data
+            page = (await client.table("notifications").select(LEGACY_PREVIEW_COLUMNS)
+                    .eq("donor_id", donor_id).eq("student_id", student_id)
+                    .order("created_at", desc=True).order("id", desc=True).limit(args.page).execute()).data
+        else:
+            rows = await db.get_all_notifications(donor_id, student_id)
+            page = await db.get_notifications_page(donor_id, student_id, limit=args.page)
+        all_sizes.append(payload_bytes(rows))
+        page_sizes.append(payload_bytes({"items": page}))
+    return {
+        "row_bytes": size_stats([payload_bytes(row) for row in client.tables["notifications"]]),
+        "get_all_notifications_bytes": size_stats(all_sizes),
+        "feed_page_bytes": size_stats(page_sizes),
+    }
+
+
+async def open_reports(client, copies: dict, args) -> dict:
+    """Open reports through the route: every one cold, then again from the report cache."""
+    sample = random.Random(args.seed).sample(sorted(copies), min(args.opens, len(copies)))
+    donor.report_cache.clear()
+    result = {}
+    for phase in ("cold", "cached"):
+        client.round_trips = 0
+        times = []
+        for donor_id, notification_id in sample:
+            start = time.perf_counter()
+            response = await donor.get_notification_report(donor_id, notification_id)
+            times.append(time.perf_counter() - start)
+            report = json.loads(response.body)
+            assert report.pop("submission_id") is not None, "report not read from journal_submissions"
+            assert report == copies[(donor_id, notification_id)], "opened report differs from the old copy"
+        times.sort()
+        result[phase] = {
+            "opens": len(times),
+            "round_trips_per_open": round(client.round_trips / len(times), 2),
+            "p50_ms": round(statistics.median(times) * 1000, 2),
+            "p95_ms": round(times[int(round(0.95 * (len(times) - 1)))] * 1000, 2),
+        }
+    result["report_cache"] = donor.report_cache.stats()
+    return result
+
+
+async def run(args) -> dict:
+    client = FakeAsyncSupabaseClient(latency=args.latency, jitter=args.jitter, seed=args.seed)
+    supabase_service._async_supabase = client
+    services.response_cache.clear()
+    copies = seed_legacy(client, args)
+    pairs = sorted({(r["donor_id"], r["student_id"]) for r in client.tables["notifications"]})
+
+    before = await measure(client, args, pairs, legacy=True)
+    migrate_notification_reports(client)
+    unmatched = sum(1 for row in client.tables["notifications"] if row.get("submission_id") is None)
+    after = await measure(client, args, pairs, legacy=False)
+
+    # A notification written after the migration, through the live write path
+    donor_id, student_id = pairs[0]
+    submission = client.tables["journal_submissions"][-1]
+    report = LearningReportResponse.from_report(submission["report"], submission_id=submission["id"])
+    new_row = services.database.notification_row(
+        donor_id, student_id, report.model_dump(), "https://example.com/journal.jpg", "My weekend"
+    )
+
+    return {
+        "notifications": len(client.tables["notifications"]),
+        "unmatched_after_migration": unmatched,
+        "before": before,
+        "after": after,
+        "new_row_bytes": payload_bytes({**new_row, "id": 1, "created_at": submission["created_at"]}),
+        "reduction": {
+            key: round(before[key]["mean"] / max(after[key]["mean"], 1), 1)
+            for key in ("row_bytes", "get_all_notifications_bytes", "feed_page_bytes")
+        },
+        "report_opens": await open_reports(client, copies, args),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--donors", type=int, default=5)
+    parser.add_argument("--children", type=int, default=10)
+    parser.add_argument("--reports", type=int, default=20, help="submissions and notifications per child")
+    parser.add_argument("--summary-chars", type=int, default=900)
+    parser.add_argument("--progress-chars", type=int, default=400)
+    parser.add_argument("--page", type=int, default=20, help="feed page size")
+    parser.add_argument("--opens", type=int, default=200, help="reports opened through the route")
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="simulated seconds per Supabase round trip")
+    parser.add_argument("--jitter", type=float, default=0.002)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""OCR engines compared on one fixture set: accuracy (CER/WER), latency and Gemini pages.
+
+Runs every page through each engine in ``--engines`` (tesseract, gemini,
+cascade) at ``--concurrency`` and scores the text against the ground truth.
+The default fixtures are synthetic printed and handwriting-like pages with
+known text; ``--fixtures DIR`` uses real photos instead, each with a
+same-named ``.txt`` file holding its transcription.
+
+    python -m benchmarks.bench_ocr_engines --count 4 --concurrency 4
+    python -m benchmarks.bench_ocr_engines --fixtures ./journals --gemini live
+
+By default Gemini is simulated: after ``--gemini-latency`` seconds it returns
+the page's ground truth. That measures what the cascade saves in latency and
+calls, not Gemini's accuracy. ``--gemini live`` calls the real model and needs
+GEMINI_API_KEY. The Tesseract engines need the ``tesseract`` binary and are
+reported as unavailable without it.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import shutil
+import statistics
+import time
+
+os.environ.setdefault("OCR_CACHE_DB", "")
+os.environ.setdefault("GEMINI_RPM", "0")
+
+from benchmarks.fixtures import ocr_fixture_set  # noqa: E402
+from app.services.ocr_engines import CascadeOCREngine, OCREngine, OCRResult, TesseractEngine  # noqa: E402
+
+ENGINES = ("tesseract", "gemini", "cascade")
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+
+class SimulatedGemini(OCREngine):
+    """Answers with the fixture's ground truth after a model-like delay."""
+
+    name = "gemini"
+
+    def __init__(self, truths: dict, latency: float, jitter: float, seed: int = 0):
+        self.truths = truths
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.pages = 0
+
+    async def recognize(self, image_bytes: bytes) -> OCRResult:
+        await asyncio.sleep(max(0.0, self.latency + self.rng.uniform(-self.jitter, self.jitter)))
+        self.pages += 1
+        return OCRResult(self.truths[hashlib.sha256(image_bytes).hexdigest()], self.name)
+
+    def stats(self) -> dict:
+        return {"engine": "gemini (simulated)", "pages": self.pages}
+
+
+def load_fixtures(args) -> list:
+    """(name, bytes, truth, kind) from ``--fixtures`` or the synthetic set."""
+    if not args.fixtures:
+        return ocr_fixture_set(args.count)
+    fixtures = []
+    for name in sorted(os.listdir(args.fixtures)):
+        stem, suffix = os.path.splitext(name)
+        truth_path = os.path.join(args.fixtures, stem + ".txt")
+        if suffix.lower() in IMAGE_SUFFIXES and os.path.exists(truth_path):
+            with open(os.path.join(args.fixtures, name), "rb") as f, open(truth_path) as t:
+                fixtures.append((name, f.read(), t.read(), "photo"))
+    return fixtures
+
+
+def normalise(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def edit_distance(a, b) -> int:
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, start=1):
+        current = [i]
+        for j, y in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y)))
+        previous = current
+    return previous[-1]
+
+
+def error_rates(text: str, truth: str) -> dict:
+    text, truth = normalise(text), normalise(truth)
+    return {
+        "cer": edit_distance(text, truth) / max(len(truth), 1),
+        "wer": edit_distance(text.split(), truth.split()) / max(len(truth.split()), 1),
+    }
+
+
+def build_engine(name: str, args, truths: dict) -> OCREngine:
+    if args.gemini == "live":
+        from app.services.ocr_service import GeminiOCREngine
+
+        gemini = GeminiOCREngine()
+    else:
+        gemini = SimulatedGemini(truths, args.gemini_latency, args.gemini_jitter, args.seed)
+    if name == "gemini":
+        return gemini
+    tesseract = TesseractEngine(processes=args.processes or None)
+    if name == "tesseract":
+        return tesseract
+    return CascadeOCREngine(
+        tesseract,
+        gemini,
+        min_confidence=args.min_confidence,
+        word_confidence=args.word_confidence,
+        max_low_share=args.max_low_share,
+        min_words=args.min_words,
+    )
+
+
+def summarise(pages: list) -> dict:
+    latencies = sorted(page["seconds"] for page in pages)
+    return {
+        "pages": len(pages),
+        "cer": round(statistics.mean(page["cer"] for page in pages), 4),
+        "wer": round(statistics.mean(page["wer"] for page in pages), 4),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(round(0.95 * (len(latencies) - 1)))] * 1000, 1),
+        "gemini_pages": sum(page["engine"] == "gemini" for page in pages),
+    }
+
+
+async def run_engine(engine: OCREngine, fixtures: list, concurrency: int) -> dict:
+    if isinstance(getattr(engine, "primary", engine), TesseractEngine):
+        # Start the process pool outside the timings
+        tesseract = getattr(engine, "primary", engine)
+        start = time.perf_counter()
+        await asyncio.gather(*(tesseract.recognize(fixtures[0][1]) for _ in range(tesseract.processes)))
+        pool_start = time.perf_counter() - start
+    else:
+        pool_start = None
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def read(name, image_bytes, truth, kind):
+        async with semaphore:
+            start = time.perf_counter()
+            result = await engine.recognize(image_bytes)
+            seconds = time.perf_counter() - start
+        return {
+            "fixture": name,
+            "kind": kind,
+            "engine": result.engine,
+            "escalation": result.escalation,
+            "confidence": None if result.confidence is None else round(result.confidence, 1),
+            "seconds": seconds,
+            **error_rates(result.text, truth),
+        }
+
+    start = time.perf_counter()
+    pages = await asyncio.gather(*(read(*fixture) for fixture in fixtures))
+    wall = time.perf_counter() - start
+    await engine.close()
+    kinds = sorted({page["kind"] for page in pages})
+    return {
+        **summarise(pages),
+        "throughput_pages_per_s": round(len(pages) / wall, 2),
+        "pool_start_seconds": None if pool_start is None else round(pool_start, 3),
+        "by_kind": {kind: summarise([p for p in pages if p["kind"] == kind]) for kind in kinds},
+        "escalations": {
+            page["fixture"]: page["escalation"] for page in pages if page["escalation"]
+        },
+        "engine_stats": engine.stats(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--fixtures", help="directory of photos with same-named .txt transcriptions")
+    parser.add_argument("--count", type=int, default=4,
+                        help="synthetic pages of each kind when --fixtures is not given")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=0, help="Tesseract pool size (0 = one per core)")
+    parser.add_argument("--gemini", choices=("simulated", "live"), default="simulated")
+    parser.add_argument("--gemini-latency", type=float, default=1.5,
+                        help="seconds per simulated Gemini page")
+    parser.add_argument("--gemini-jitter", type=float, default=0.3)
+    parser.add_argument("--min-confidence", type=float, default=80)
+    parser.add_argument("--word-confidence", type=float, default=60)
+    parser.add_argument("--max-low-share", type=float, default=0.15)
+    parser.add_argument("--min-words", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args)
+    if not fixtures:
+        parser.error("no fixtures found")
+    truths = {hashlib.sha256(image).hexdigest(): truth for _, image, truth, _ in fixtures}
+
+    results = {}
+    for name in args.engines:
+        if name != "gemini" and shutil.which("tesseract") is None:
+            results[name] = {"unavailable": "tesseract binary not found on PATH"}
+            continue
+        engine = build_engine(name, args, truths)
+        results[name] = asyncio.run(run_engine(engine, fixtures, args.concurrency))
+
+    print(json.dumps({
+        "fixtures": len(fixtures),
+        "gemini": args.gemini,
+        "cpus": os.cpu_count(),
+        "results": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
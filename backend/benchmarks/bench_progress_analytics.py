@@ -0,0 +1,194 @@
+"""Progress analytics at cohort scale: window-only warm load, ragged memory, appends and queries.
+
+Synthetic histories for ``--students`` students (12 categories, each student
+drifting up or down with noise) have skewed lengths: most are short, a few run
+to ``--max-submissions``. The warm load adds every student's latest
+``--window`` submissions in pages, the way ProgressAnalyticsEngine.refresh
+reads recent_submission_scores(). Then full histories are loaded for
+``--queries`` students, as their first analytics request does. Memory is
+compared with the dense (students x longest history x categories) array.
+Last, a small cohort runs through the engine on the fake Supabase client.
+Its answers must match a matrix built from the whole history.
+
+    python -m benchmarks.bench_progress_analytics --students 10000 --submissions 40
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import numpy as np
+
+from benchmarks.fakes import FakeAsyncSupabaseClient
+from app.services import supabase_service
+from app.services.progress_analytics import CATEGORIES, ProgressAnalyticsEngine
+from app.services.score_matrix import ScoreMatrix
+
+
+def synthetic_histories(students: int, mean: int, longest: int, seed: int):
+    """Per-student history lengths and their scores, concatenated in student order."""
+    rng = np.random.default_rng(seed)
+    lengths = np.minimum(rng.geometric(1 / mean, size=students), longest)
+    offsets = np.cumsum(lengths) - lengths
+    owner = np.repeat(np.arange(students), lengths)
+    step = (np.arange(int(lengths.sum())) - offsets[owner])[:, None]
+    start = rng.uniform(1.5, 3.5, size=(students, len(CATEGORIES)))
+    drift = rng.normal(0.005, 0.004, size=(students, len(CATEGORIES)))
+    noise = rng.normal(0, 0.5, size=(len(owner), len(CATEGORIES)))
+    scores = np.clip(np.rint(start[owner] + drift[owner] * step + noise), 1, 5).astype(np.int8)
+    return lengths, offsets, scores
+
+
+def student_rows(lengths, offsets, scores, student: int, first_seq: int = 1) -> list:
+    """journal_submissions rows of one student from ``first_seq`` on, as the DB would return them."""
+    start = int(offsets[student])
+    return [
+        {
+            "student_id": str(student),
+            "seq": seq,
+            "created_at": None,
+            "scores": dict(zip(CATEGORIES, scores[start + seq - 1].tolist())),
+        }
+        for seq in range(first_seq, int(lengths[student]) + 1)
+    ]
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+
+async def check_engine(args) -> dict:
+    """Warm, first and repeat queries through the engine; answers must match a full-history matrix."""
+    lengths, offsets, scores = synthetic_histories(args.engine_students, args.submissions, args.max_submissions,
+                                                   args.seed + 2)
+    client = FakeAsyncSupabaseClient()
+    supabase_service._async_supabase = client
+    full = ScoreMatrix(CATEGORIES, window=args.window)
+    for student in range(args.engine_students):
+        rows = student_rows(lengths, offsets, scores, student)
+        client.tables.setdefault("students", []).append(
+            {"student_id": str(student), "submission_count": int(lengths[student])}
+        )
+        for row in rows:
+            client.tables.setdefault("journal_submissions", []).append(client.with_defaults({
+                "student_id": row["student_id"], "seq": row["seq"], "created_at": None,
+                "report": {"scores": row["scores"]},
+            }))
+        full.load_history(str(student), rows)
+
+    engine = ProgressAnalyticsEngine(ttl=None, window=args.window, page_size=args.page_size)
+    client.round_trips = client.rows_returned = 0
+    await engine.start()
+    # With no ttl the refresh loop ends after the warm-up
+    await engine._task
+    warm = {"round_trips": client.round_trips, "rows": client.rows_returned}
+
+    reference = ProgressAnalyticsEngine(ttl=None, window=args.window)
+    reference.matrix = full
+    student = str(int(np.argmax(lengths)))
+    client.round_trips = 0
+    first = await engine.student_progress(student)
+    first_trips, client.round_trips = client.round_trips, 0
+    again = await engine.student_progress(student)
+    assert first == again == await reference.student_progress(student), "engine differs from a full load"
+    return {
+        "students": args.engine_students,
+        "warm": warm,
+        "history_rows": int(lengths[int(student)]),
+        "first_query_round_trips": first_trips,
+        "repeat_query_round_trips": client.round_trips,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--submissions", type=int, default=40, help="mean history length")
+    parser.add_argument("--max-submissions", type=int, default=1000)
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--page-size", type=int, default=1000, help="rows per loaded page")
+    parser.add_argument("--appends", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--engine-students", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    lengths, offsets, scores = synthetic_histories(args.students, args.submissions, args.max_submissions, args.seed)
+    matrix = ScoreMatrix(CATEGORIES, window=args.window, students=args.students)
+
+    page_students = max(args.page_size // args.window, 1)
+    parse_seconds = load_seconds = 0.0
+    warm_rows = 0
+    for first in range(0, args.students, page_students):
+        start = time.perf_counter()
+        rows = []
+        for student in range(first, min(first + page_students, args.students)):
+            rows += student_rows(lengths, offsets, scores, student, max(int(lengths[student]) - args.window + 1, 1))
+        parse_seconds += time.perf_counter() - start
+        warm_rows += len(rows)
+        load_seconds += timed(matrix.load, rows)
+    warm_mb = matrix.stats()["array_mb"]
+
+    rng = np.random.default_rng(args.seed + 1)
+    queried = rng.choice(args.students, size=min(args.queries, args.students), replace=False).tolist()
+    history_times = [
+        timed(matrix.load_history, str(student), student_rows(lengths, offsets, scores, student))
+        for student in queried
+    ]
+
+    everyone = np.arange(len(matrix))
+    full_recompute = min(timed(matrix._recompute, everyone) for _ in range(3))
+
+    targets = rng.integers(0, args.students, size=args.appends)
+    append_times = []
+    for student in targets.tolist():
+        seq = int(matrix.first_seq[student] + matrix.lengths[student])
+        report = dict(zip(CATEGORIES, rng.integers(1, 6, size=len(CATEGORIES)).tolist()))
+        append_times.append(timed(matrix.append, str(student), seq, report))
+
+    # Incremental sums must match a from-scratch recompute
+    slopes = matrix.slopes(everyone)
+    matrix._recompute(everyone)
+    assert np.allclose(slopes, matrix.slopes(everyone), equal_nan=True, atol=1e-6)
+
+    engine = ProgressAnalyticsEngine(ttl=None, window=args.window)
+    engine.matrix = matrix
+
+    async def queries():
+        times = []
+        for student in queried:
+            start = time.perf_counter()
+            await engine.student_progress(str(student))
+            times.append(time.perf_counter() - start)
+        return times
+
+    query_times = asyncio.run(queries())
+
+    append_mean = statistics.mean(append_times)
+    dense_mb = args.students * int(lengths.max()) * len(CATEGORIES) * 4 / 2**20
+    print(json.dumps({
+        **matrix.stats(),
+        "categories": len(CATEGORIES),
+        "history_mean": round(float(lengths.mean()), 1),
+        "history_max": int(lengths.max()),
+        "rows_in_history": int(lengths.sum()),
+        "warm_rows_loaded": warm_rows,
+        "warm_row_parse_seconds": round(parse_seconds, 3),
+        "warm_load_seconds": round(load_seconds, 3),
+        "warm_array_mb": warm_mb,
+        "dense_array_mb": round(dense_mb, 1),
+        "history_load_ms": round(statistics.mean(history_times) * 1000, 3),
+        "full_recompute_seconds": round(full_recompute, 4),
+        "incremental_append_ms": round(append_mean * 1000, 4),
+        "append_speedup_vs_recompute": round(full_recompute / append_mean, 1),
+        "query_p50_ms": round(statistics.median(query_times) * 1000, 3),
+        "query_max_ms": round(max(query_times) * 1000, 3),
+        "engine": asyncio.run(check_engine(args)),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Scoring prompt size as a student's report history grows.
+
+The previous report is made more verbose with every submission (as real
+progress notes tend to be). The old prompt embedded it with
+``json.dumps(indent=2)``; the current one embeds a bounded summary. Exits
+non-zero if the prompt grows with history.
+
+    python -m benchmarks.bench_prompt_size --submissions 200
+"""
+import argparse
+import json
+import sys
+
+from benchmarks import fakes  # noqa: F401  (placeholder credentials)
+from app.services.llm_service import LLMClass, PREVIOUS_NOTE_CHARS, estimate_tokens
+
+ENTRY = "Today I went to the park with my brother and we played football. " * 4
+
+
+def verbose_report(llm: LLMClass, n: int) -> dict:
+    return {
+        "scores": {key: 1 + (n + i) % 5 for i, key in enumerate(llm.score_categories)},
+        "overall_score": 3.2,
+        "progress_update": " ".join(f"In journal {i} the student improved their spelling." for i in range(n)),
+        "summary": " ".join(f"Entry {i} was about the weekend." for i in range(n)),
+    }
+
+
+def legacy_prompt_chars(llm: LLMClass, report: dict) -> int:
+    # The old build_prompt re-rendered everything and pasted the full report
+    return len(llm.prompt_prefix) + len(json.dumps(report, indent=2)) + len(ENTRY) + 200
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=200)
+    args = parser.parse_args()
+
+    llm = LLMClass()
+    rows = []
+    for n in (1, 10, 50, args.submissions):
+        report = verbose_report(llm, n)
+        prompt = llm.build_prompt(ENTRY, report, "My weekend")
+        rows.append({
+            "history": n,
+            "legacy_chars": legacy_prompt_chars(llm, report),
+            "prompt_chars": len(prompt),
+            "prompt_tokens_est": estimate_tokens(prompt),
+            "static_prefix_chars": len(llm.prompt_prefix),
+        })
+    print(json.dumps(rows, indent=2))
+
+    growth = rows[-1]["prompt_chars"] - rows[0]["prompt_chars"]
+    if growth > PREVIOUS_NOTE_CHARS:
+        print(f"prompt grew by {growth} chars with history", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,140 @@
+"""Donor page views with and without the response cache, under interleaved writes.
+
+Each page view calls the three donor reads the inbox makes
+(get_donor_id_by_supabase_id, get_all_children, get_all_notifications) for a
+random donor. A ``--write-ratio`` share of the operations are instead a new
+report or a mark-read for one of that donor's children. The same seeded
+workload runs with the cache off and on. Supabase round trips, view latency
+and cache counters are reported. After each write, the next inbox read must
+already show it.
+
+    python -m benchmarks.bench_response_cache --donors 20 --children 10 --views 2000
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from benchmarks.fakes import FakeAsyncSupabaseClient, seed_donor_inbox
+from app.routes import donor
+from app.services import supabase_service
+from app.services.container import services
+from app.services.linking_service import link_cache
+
+REPORT = {"progress_update": "Great effort on this week's entry.", "overall_score": 3.5}
+
+
+def children_of(donor_index: int, children: int) -> list:
+    return [str(10_000 * (donor_index + 1) + i) for i in range(children)]
+
+
+def unread_for(rows: list, student_id: str) -> int:
+    return next(row["unread"] for row in rows if str(row["id"]) == student_id)
+
+
+async def page_view(donor_id: str, student_id: str):
+    await donor.get_donor_id_by_supabase_id(f"auth-{donor_id}")
+    await donor.get_all_children(donor_id)
+    await donor.get_all_notifications(donor_id, student_id)
+
+
+async def write(donor_id: str, student_id: str, rng: random.Random) -> str:
+    """One write, then the read that must reflect it."""
+    if rng.random() < 0.5:
+        await services.database.notify_donor_of_new_report(
+            donor_id, student_id, REPORT, "https://example.com/journal.jpg", "My weekend"
+        )
+        rows = await donor.get_all_children(donor_id)
+        assert unread_for(rows, student_id) > 0, "new report not visible in the inbox"
+        return "notify"
+    await services.database.mark_notifications_as_read(donor_id, student_id)
+    rows = await donor.get_all_children(donor_id)
+    assert unread_for(rows, student_id) == 0, "mark-read not visible in the inbox"
+    notifications = await donor.get_all_notifications(donor_id, student_id)
+    assert all(n["is_read"] for n in notifications), "mark-read not visible in the notifications"
+    return "mark_read"
+
+
+async def workload(args, cached: bool) -> dict:
+    client = FakeAsyncSupabaseClient(latency=args.latency, jitter=args.jitter, seed=args.seed)
+    for d in range(args.donors):
+        seed_donor_inbox(client, f"donor-{d}", args.children,
+                         first_student=int(children_of(d, args.children)[0]))
+    supabase_service._async_supabase = client
+    link_cache.clear()
+    services.response_cache.clear()
+    services.response_cache.ttl = args.ttl if cached else 0
+    services.response_cache.stale = args.stale
+
+    rng = random.Random(args.seed)
+    operations = []
+    for _ in range(args.views):
+        d = rng.randrange(args.donors)
+        student_id = rng.choice(children_of(d, args.children))
+        operations.append((rng.random() < args.write_ratio, f"donor-{d}", student_id))
+    pending = iter(operations)
+    view_times, writes = [], {"notify": 0, "mark_read": 0}
+    # Writes to one donor are serialised so each read-after-write check is meaningful
+    locks = {f"donor-{d}": asyncio.Lock() for d in range(args.donors)}
+
+    async def worker(seed: int):
+        worker_rng = random.Random(seed)
+        for is_write, donor_id, student_id in pending:
+            async with locks[donor_id]:
+                if is_write:
+                    writes[await write(donor_id, student_id, worker_rng)] += 1
+                    continue
+            start = time.perf_counter()
+            await page_view(donor_id, student_id)
+            view_times.append(time.perf_counter() - start)
+
+    client.round_trips = 0
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(args.seed + i) for i in range(args.concurrency)))
+    wall = time.perf_counter() - start
+    # Let refreshes started by the last writes finish before counting
+    await asyncio.sleep(args.latency * 4)
+    view_times.sort()
+    return {
+        "cache": cached,
+        "page_views": len(view_times),
+        "writes": writes,
+        "round_trips": client.round_trips,
+        "round_trips_per_view": round(client.round_trips / max(len(view_times), 1), 2),
+        "view_p50_ms": round(statistics.median(view_times) * 1000, 2),
+        "view_p95_ms": round(view_times[int(0.95 * (len(view_times) - 1))] * 1000, 2),
+        "wall_seconds": round(wall, 3),
+        **({"response_cache": services.response_cache.stats()} if cached else {}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--donors", type=int, default=20)
+    parser.add_argument("--children", type=int, default=10)
+    parser.add_argument("--views", type=int, default=2000, help="operations, writes included")
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="simulated seconds per Supabase round trip")
+    parser.add_argument("--jitter", type=float, default=0.002)
+    parser.add_argument("--ttl", type=float, default=60, help="seconds a response stays fresh")
+    parser.add_argument("--stale", type=float, default=600,
+                        help="further seconds it may be served while reloading")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    off = asyncio.run(workload(args, cached=False))
+    on = asyncio.run(workload(args, cached=True))
+    print(json.dumps({
+        "uncached": off,
+        "cached": on,
+        "round_trip_reduction": round(off["round_trips"] / max(on["round_trips"], 1), 1),
+        "p95_speedup": round(off["view_p95_ms"] / max(on["view_p95_ms"], 0.001), 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
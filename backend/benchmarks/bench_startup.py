@@ -0,0 +1,109 @@
+"""Import-time budget for the app: ``python -X importtime -c "import app.main"``.
+
+Importing the app should build no clients, open no files and pull in none of
+the heavy SDKs; those load in the lifespan hook or on first use. The import
+runs in a fresh interpreter, in an empty working directory and with the
+Supabase and Gemini credentials blanked, ``--runs`` times, and the fastest run
+is reported with the slowest modules it imports directly.
+
+    python -m benchmarks.bench_startup --budget-ms 1000
+
+Exits non-zero when the import fails, takes longer than the budget, loads any
+of ``FORBIDDEN`` or creates files (e.g. the SQLite stores).
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+FORBIDDEN = ("google.genai", "google.generativeai", "supabase", "numpy", "PIL", "pytesseract")
+CREDENTIALS = ("SUPABASE_URL", "SUPABASE_KEY", "GEMINI_API_KEY", "GOOGLE_API_KEY")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module: str) -> dict:
+    # Empty rather than unset: load_dotenv() never overrides a variable that exists
+    env = {**os.environ, **{name: "" for name in CREDENTIALS}}
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [backend, env.get("PYTHONPATH")]))
+    # Relative paths such as jobs.sqlite3 would land here if the import opened them
+    with tempfile.TemporaryDirectory() as cwd:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=cwd,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        created = sorted(os.listdir(cwd))
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, int(cumulative_us), len(indent) // 2))
+    if proc.returncode:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError("\n".join(errors[-20:]))
+    # The module and its parent packages are the top-level entries; site and
+    # the encodings belong to interpreter startup
+    parts = module.split(".")
+    own = {".".join(parts[:i]) for i in range(1, len(parts) + 1)}
+    # -X importtime lists a module's imports before the module itself
+    direct, children = [], []
+    for name, us, depth in imports:
+        if depth == 1:
+            children.append((name, us))
+        elif depth == 0:
+            if name in own:
+                direct.extend(children)
+            children = []
+    return {
+        "total_ms": sum(us for name, us, depth in imports if depth == 0 and name in own) / 1000,
+        "imports": imports,
+        "direct": direct,
+        "created": created,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports to list")
+    args = parser.parse_args()
+
+    try:
+        best = min((measure(args.module) for _ in range(args.runs)), key=lambda run: run["total_ms"])
+    except RuntimeError as e:
+        print(f"import {args.module} failed:\n{e}", file=sys.stderr)
+        sys.exit(1)
+
+    loaded = {name for name, _, _ in best["imports"]}
+    forbidden = sorted(
+        name for name in loaded
+        if any(name == heavy or name.startswith(heavy + ".") for heavy in FORBIDDEN)
+    )
+    top = sorted(best["direct"], key=lambda i: i[1], reverse=True)
+    report = {
+        "module": args.module,
+        "runs": args.runs,
+        "total_ms": round(best["total_ms"], 1),
+        "budget_ms": args.budget_ms,
+        "modules_imported": len(loaded),
+        "slowest": {name: round(us / 1000, 1) for name, us in top[:args.top]},
+        "forbidden_imported": forbidden,
+        "files_created": best["created"],
+    }
+    print(json.dumps(report, indent=2))
+    if forbidden or best["created"] or best["total_ms"] > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
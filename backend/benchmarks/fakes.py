@@ -0,0 +1,530 @@
+"""In-process stand-ins for the external services used by the backend.
+
+The fakes implement just enough of the supabase-py table API for the queries
+issued by ``DBServiceClass`` and count every ``execute()`` as one round trip.
+The Gemini fakes cover both SDKs: ``google.genai.Client`` (OCR and fused calls)
+and ``google.generativeai.GenerativeModel`` (scoring). Every fake takes a base
+``latency``, a uniform ``jitter`` on top of it and an ``error_rate`` of injected
+failures.
+"""
+import asyncio
+import json
+import os
+import random
+import time
+from datetime import datetime
+from itertools import count
+
+# The service modules build their clients at import time, so give them
+# placeholder credentials before anything from ``app`` is imported.
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark-key")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark-key")
+os.environ.setdefault("GOOGLE_API_KEY", "benchmark-key")
+
+
+class FaultInjector:
+    """Simulated latency and failures shared by the fakes."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.errors = 0
+
+    def delay(self) -> float:
+        return self.latency + (self.rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def should_fail(self) -> bool:
+        if self.error_rate and self.rng.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+
+class FakeServiceError(Exception):
+    """Injected Gemini failure; like both SDKs' errors it carries the HTTP status as ``.code``."""
+
+    def __init__(self, code: int = 503, message: str = "injected failure"):
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+def _supabase_error():
+    from postgrest.exceptions import APIError
+
+    return APIError({"message": "injected failure", "code": "503", "hint": None, "details": None})
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _project(row: dict, columns: str) -> dict:
+    if columns.strip() == "*":
+        return dict(row)
+    projected = {}
+    for column in columns.split(","):
+        column = column.strip()
+        alias, _, path = column.rpartition(":")
+        if "->>" in path:
+            source, _, key = path.partition("->>")
+            value = (row.get(source) or {}).get(key)
+        elif "->" in path:
+            source, _, key = path.partition("->")
+            value = (row.get(source) or {}).get(key)
+        else:
+            value = row.get(path)
+        projected[alias or path.split("->")[-1].strip(">")] = value
+    return projected
+
+
+_OPERATORS = {
+    "eq": lambda a, b: a == b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+}
+
+
+def _split_top_level(expr: str) -> list:
+    parts, depth, current = [], 0, ""
+    for ch in expr:
+        if ch == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += ch == "("
+        depth -= ch == ")"
+        current += ch
+    return parts + [current]
+
+
+def _logic_filter(expr: str, combine=any):
+    """Parse a PostgREST logic tree such as ``a.lt.1,and(a.eq.1,id.lt.5)``."""
+    checks = []
+    for part in _split_top_level(expr):
+        part = part.strip()
+        if part.startswith(("and(", "or(")):
+            name, _, inner = part.partition("(")
+            checks.append(_logic_filter(inner[:-1], all if name == "and" else any))
+            continue
+        column, op, value = part.split(".", 2)
+        value = value.strip('"')
+
+        def check(row, column=column, op=op, value=value):
+            current = row.get(column)
+            if current is None:
+                return False
+            target = type(current)(value) if isinstance(current, (int, float)) else value
+            return _OPERATORS[op](current, target)
+
+        checks.append(check)
+    return lambda row: combine(c(row) for c in checks)
+
+
+class FakeQuery:
+    def __init__(self, client, table: str):
+        self.client = client
+        self.table_name = table
+        self.action = "select"
+        self.columns = "*"
+        self.count_mode = None
+        self.filters = []
+        self.ordering = []
+        self.row_limit = None
+        self.row_offset = 0
+        self.single = False
+        self.payload = None
+
+    def select(self, columns="*", count=None):
+        self.action, self.columns, self.count_mode = "select", columns, count
+        return self
+
+    def insert(self, payload):
+        self.action, self.payload = "insert", payload
+        return self
+
+    def upsert(self, payload):
+        self.action, self.payload = "upsert", payload
+        return self
+
+    def update(self, payload):
+        self.action, self.payload = "update", payload
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: str(row.get(column)) == str(value))
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self
+
+    def or_(self, filters):
+        self.filters.append(_logic_filter(filters))
+        return self
+
+    def in_(self, column, values):
+        wanted = {str(v) for v in values}
+        self.filters.append(lambda row: str(row.get(column)) in wanted)
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, n):
+        self.row_limit = n
+        return self
+
+    def range(self, start, end):
+        self.row_offset, self.row_limit = start, end - start + 1
+        return self
+
+    def maybe_single(self):
+        self.single = True
+        return self
+
+    def _matching(self):
+        rows = [r for r in self.client.tables.setdefault(self.table_name, [])
+                if all(f(r) for f in self.filters)]
+        for column, desc in reversed(self.ordering):
+            rows.sort(key=lambda r: r.get(column) or "", reverse=desc)
+        return rows
+
+    def execute(self):
+        self.client.round_trips += 1
+        delay = self.client.delay()
+        if delay:
+            time.sleep(delay)
+        if self.client.should_fail():
+            raise _supabase_error()
+        return self._run()
+
+    def _run(self):
+        table = self.client.tables.setdefault(self.table_name, [])
+        if self.action == "rpc":
+            return FakeResponse(self.client.functions[self.table_name](self.client, **self.payload))
+        if self.action == "insert":
+            rows = self.payload if isinstance(self.payload, list) else [self.payload]
+            inserted = [self.client.with_defaults(dict(r)) for r in rows]
+            table.extend(inserted)
+            self.client.fire_triggers(self.table_name, inserted)
+            return FakeResponse(inserted)
+        if self.action == "upsert":
+            row = self.client.with_defaults(dict(self.payload))
+            key = self.client.primary_keys.get(self.table_name, "id")
+            table[:] = [r for r in table if r.get(key) != row.get(key)]
+            table.append(row)
+            return FakeResponse([row])
+        if self.action == "update":
+            rows = self._matching()
+            for row in rows:
+                row.update(self.payload)
+            self.client.fire_triggers(self.table_name, rows)
+            return FakeResponse(rows)
+
+        rows = self._matching()
+        total = len(rows)
+        rows = rows[self.row_offset:]
+        if self.row_limit is not None:
+            rows = rows[: self.row_limit]
+        data = [_project(r, self.columns) for r in rows]
+        self.client.rows_returned += len(data)
+        if self.single:
+            return FakeResponse(data[0]) if data else None
+        return FakeResponse(data, count=total if self.count_mode else None)
+
+
+def append_submission(client, p_student_id, p_journal, p_report):
+    """Mirror of the append_submission() SQL function in migrations/."""
+    student = next(r for r in client.tables["students"] if str(r["student_id"]) == str(p_student_id))
+    student["submission_count"] = student.get("submission_count", 0) + 1
+    student["latest_report"] = p_report
+    row = client.with_defaults({
+        "student_id": p_student_id,
+        "seq": student["submission_count"],
+        "journal": p_journal,
+        "report": p_report,
+    })
+    client.tables.setdefault("journal_submissions", []).append(row)
+    return row
+
+
+def recent_submission_scores(client, p_student_ids, p_window):
+    """Mirror of the recent_submission_scores() SQL function in migrations/006."""
+    counts = {
+        str(r["student_id"]): r.get("submission_count", 0)
+        for r in client.tables.get("students", [])
+        if str(r["student_id"]) in set(p_student_ids)
+    }
+    rows = [
+        {"student_id": r["student_id"], "seq": r["seq"], "created_at": r.get("created_at"),
+         "scores": (r.get("report") or {}).get("scores")}
+        for r in client.tables.get("journal_submissions", [])
+        if str(r["student_id"]) in counts and r["seq"] > counts[str(r["student_id"])] - p_window
+    ]
+    return sorted(rows, key=lambda r: (r["student_id"], r["seq"]))
+
+
+def conversation_summaries(client, rows):
+    """Mirror of the notifications triggers in migrations/004: refresh the touched pairs."""
+    pairs = {(str(r["donor_id"]), str(r["student_id"])) for r in rows}
+    summaries = client.tables.setdefault("conversation_summaries", [])
+    summaries[:] = [s for s in summaries if (s["donor_id"], s["student_id"]) not in pairs]
+    for donor_id, student_id in pairs:
+        history = [
+            n for n in client.tables["notifications"]
+            if str(n["donor_id"]) == donor_id and str(n["student_id"]) == student_id
+        ]
+        last = max(history, key=lambda n: (n.get("created_at") or "", n["id"]))
+        summaries.append({
+            "donor_id": donor_id,
+            "student_id": student_id,
+            "unread_count": sum(1 for n in history if not n.get("is_read")),
+            "last_notification_id": last["id"],
+            "last_message": (last.get("report_preview") or last.get("learning_report") or {}).get("progress_update"),
+            "last_journal_image": last.get("journal_image"),
+            "last_at": last.get("created_at"),
+        })
+
+
+def migrate_notification_reports(client, preview_chars: int = 160):
+    """Mirror of migrations/005: previews, submission references and nulled report copies."""
+    submissions = client.tables.get("journal_submissions", [])
+    for n in client.tables.get("notifications", []):
+        report = n.get("learning_report")
+        if report is None:
+            continue
+        if n.get("report_preview") is None:
+            progress_update = report.get("progress_update") or ""
+            if len(progress_update) > preview_chars:
+                progress_update = progress_update[: preview_chars - 1].rstrip(" ") + "…"
+            n["report_preview"] = {"overall_score": report.get("overall_score"), "progress_update": progress_update}
+        if n.get("submission_id") is None:
+            matches = [
+                s for s in submissions
+                if str(s["student_id"]) == str(n["student_id"])
+                and s["report"].get("progress_update") == report.get("progress_update")
+                and (s["report"].get("summary") or "") == (report.get("updated_report") or "")
+            ]
+            if matches:
+                n["submission_id"] = min(
+                    matches, key=lambda s: abs(_epoch(s["created_at"]) - _epoch(n["created_at"]))
+                )["id"]
+        if n.get("submission_id") is not None:
+            n["learning_report"] = None
+
+
+def _epoch(timestamp: str) -> float:
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00")).timestamp()
+
+
+class FakeAsyncQuery(FakeQuery):
+    async def execute(self):
+        self.client.round_trips += 1
+        self.client.in_flight += 1
+        self.client.peak_in_flight = max(self.client.peak_in_flight, self.client.in_flight)
+        try:
+            delay = self.client.delay()
+            if delay:
+                await asyncio.sleep(delay)
+            if self.client.should_fail():
+                raise _supabase_error()
+            return self._run()
+        finally:
+            self.client.in_flight -= 1
+
+
+class FakeSupabaseClient(FaultInjector):
+    """Dict-backed replacement for ``supabase.Client``."""
+
+    query_class = FakeQuery
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 seed=None):
+        super().__init__(latency, jitter, error_rate, seed)
+        self.tables = {}
+        self.primary_keys = {"student_donor_links": "student_id"}
+        self.functions = {
+            "append_submission": append_submission,
+            "recent_submission_scores": recent_submission_scores,
+        }
+        self.triggers = {"notifications": conversation_summaries}
+        self.round_trips = 0
+        self.rows_returned = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._ids = count(1)
+
+    def with_defaults(self, row: dict) -> dict:
+        row.setdefault("id", next(self._ids))
+        row.setdefault("created_at", time.strftime("%Y-%m-%dT%H:%M:%S+00:00"))
+        return row
+
+    def fire_triggers(self, table: str, rows: list):
+        if rows and table in self.triggers:
+            self.triggers[table](self, rows)
+
+    def table(self, name: str) -> FakeQuery:
+        return self.query_class(self, name)
+
+    def rpc(self, fn: str, params: dict) -> FakeQuery:
+        query = self.query_class(self, fn)
+        query.action, query.payload = "rpc", params
+        return query
+
+
+class FakeAsyncSupabaseClient(FakeSupabaseClient):
+    """Replacement for ``supabase.AsyncClient``; latency is simulated with asyncio.sleep."""
+
+    query_class = FakeAsyncQuery
+
+
+def seed_donor_inbox(client: FakeSupabaseClient, donor_id: str, children: int,
+                     notifications_per_child: int = 5, first_student: int = 1000):
+    """Link ``children`` students to one donor, each with a notification history."""
+    client.tables.setdefault("donors", []).append({"id": donor_id, "auth_uid": f"auth-{donor_id}"})
+    for i in range(children):
+        student_id = str(first_student + i)
+        client.tables.setdefault("students", []).append({
+            "student_id": student_id,
+            "name": f"Student {i}",
+            "age": 8 + i % 5,
+            "location": "Hong Kong",
+            "submission_count": notifications_per_child,
+            "latest_report": {"overall_score": 3.0},
+        })
+        client.tables.setdefault("student_donor_links", []).append(
+            {"student_id": student_id, "donor_id": donor_id}
+        )
+        for n in range(notifications_per_child):
+            client.tables.setdefault("notifications", []).append({
+                "id": next(client._ids),
+                "donor_id": donor_id,
+                "student_id": student_id,
+                "submission_id": None,
+                "report_preview": {
+                    "overall_score": 3.0,
+                    "progress_update": f"Entry {n} shows steady progress in writing.",
+                },
+                "journal_image": "https://example.com/journal.jpg",
+                "journal_topic": "My weekend",
+                "is_read": n < notifications_per_child - 2,
+                "created_at": f"2025-08-{10 + n:02d}T09:00:00+00:00",
+            })
+    conversation_summaries(client, client.tables.get("notifications", []))
+
+
+TRANSCRIPTION = "Today I went to the park with my brother and we played football."
+
+
+def fill_schema(schema: dict, name: str = ""):
+    """A value that satisfies a structured-output JSON schema, like a well-behaved model."""
+    kind = schema.get("type")
+    if kind == "object":
+        return {key: fill_schema(sub, key) for key, sub in schema.get("properties", {}).items()}
+    if kind == "integer":
+        return 3
+    if kind == "number":
+        return 3.0
+    if kind == "array":
+        return [fill_schema(schema.get("items", {}))]
+    if name == "transcription":
+        return TRANSCRIPTION
+    return f"Steady progress in {name or 'writing'}."
+
+
+class FakeGeminiResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.usage_metadata = None
+
+
+def _answer(config) -> FakeGeminiResponse:
+    """JSON for the requested schema, or a plain transcription when none is given."""
+    schema = getattr(config, "response_json_schema", None) or getattr(config, "response_schema", None)
+    if isinstance(schema, dict):
+        return FakeGeminiResponse(json.dumps(fill_schema(schema)))
+    return FakeGeminiResponse(TRANSCRIPTION)
+
+
+class _FakeGenaiModels:
+    def __init__(self, faults: "FakeGenaiClient"):
+        self.faults = faults
+
+    def generate_content(self, model, contents, config=None):
+        self.faults.calls += 1
+        time.sleep(self.faults.delay())
+        if self.faults.should_fail():
+            raise FakeServiceError(self.faults.error_code)
+        return _answer(config)
+
+
+class _FakeAsyncGenaiModels(_FakeGenaiModels):
+    async def generate_content(self, model, contents, config=None):
+        self.faults.calls += 1
+        await asyncio.sleep(self.faults.delay())
+        if self.faults.should_fail():
+            raise FakeServiceError(self.faults.error_code)
+        return _answer(config)
+
+
+class FakeGenaiClient(FaultInjector):
+    """Replacement for ``google.genai.Client`` (``.models`` and ``.aio.models``)."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_code: int = 503, seed=None):
+        super().__init__(latency, jitter, error_rate, seed)
+        self.error_code = error_code
+        self.calls = 0
+        self.models = _FakeGenaiModels(self)
+        self.aio = type("Aio", (), {})()
+        self.aio.models = _FakeAsyncGenaiModels(self)
+
+
+class FakeGenerativeModel(FaultInjector):
+    """Replacement for ``google.generativeai.GenerativeModel`` as used for scoring."""
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_code: int = 503, seed=None):
+        super().__init__(latency, jitter, error_rate, seed)
+        self.error_code = error_code
+        self.calls = 0
+
+    def generate_content(self, prompt, generation_config=None):
+        self.calls += 1
+        time.sleep(self.delay())
+        if self.should_fail():
+            raise FakeServiceError(self.error_code)
+        return _answer(generation_config)
+
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay())
+        if self.should_fail():
+            raise FakeServiceError(self.error_code)
+        return _answer(generation_config)
+
+
+def install_fakes(supabase=None, genai_client=None, model=None):
+    """Point the already-imported service modules at the fakes."""
+    from app.services import ocr_service, supabase_service
+    from app.services.container import services
+
+    if supabase is not None:
+        supabase_service._async_supabase = supabase
+    if genai_client is not None:
+        ocr_service._genai_client = genai_client
+    if model is not None:
+        services.learning_reports.llm.model = model
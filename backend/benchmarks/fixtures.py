@@ -0,0 +1,81 @@
+"""Synthetic journal photos, generated on demand so no binary fixtures live in git."""
+import random
+import textwrap
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFilter
+
+JOURNAL_LINES = [
+    "Today I went to the park with my brother and we played football.",
+    "My favourite food is dumplings because my grandmother makes them.",
+    "I am happy becuse I got a new book from school.",
+    "We learned about the water cycle and I drew a big cloud.",
+]
+
+
+def journal_photo(size=(4032, 3024), seed: int = 0, text=None, fmt: str = "JPEG") -> bytes:
+    """A phone-camera-sized page: noisy paper texture, ruled lines and dark handwriting-ish text."""
+    rng = random.Random(seed)
+    width, height = size
+    noise = Image.effect_noise((width // 8, height // 8), 40).resize(size).filter(ImageFilter.GaussianBlur(2))
+    page = Image.merge("RGB", [noise.point(lambda v: 180 + v // 4)] * 3)
+    draw = ImageDraw.Draw(page)
+    lines = text.split("\n") if text else [rng.choice(JOURNAL_LINES) for _ in range(12)]
+    line_height = height // (len(lines) + 2)
+    for i, line in enumerate(lines):
+        y = line_height * (i + 1)
+        draw.line([(0, y + line_height // 2), (width, y + line_height // 2)], fill=(150, 160, 200), width=3)
+        draw.text((width // 20, y), line, fill=(30, 30, 40), font_size=line_height // 2)
+    out = BytesIO()
+    page.save(out, format=fmt, quality=92)
+    return out.getvalue()
+
+
+def fixture_set(count: int = 3, size=(4032, 3024)):
+    """(name, bytes) pairs covering the formats students actually upload."""
+    fixtures = []
+    for i in range(count):
+        fixtures.append((f"journal_{i}.jpg", journal_photo(size, seed=i)))
+    fixtures.append(("journal_png.png", journal_photo(size, seed=99, fmt="PNG")))
+    return fixtures
+
+
+def handwritten_photo(text: str, size=(2000, 1500), seed: int = 0, fmt: str = "JPEG") -> bytes:
+    """A page of uneven, slanted, blurred lettering that stands in for a child's handwriting."""
+    rng = random.Random(seed)
+    width, height = size
+    page = Image.new("RGB", size, (225, 222, 210))
+    draw = ImageDraw.Draw(page)
+    lines = text.split("\n")
+    line_height = height // (len(lines) + 2)
+    for i, line in enumerate(lines):
+        x, baseline = width // 20, line_height * (i + 1)
+        draw.line([(0, baseline + line_height // 2), (width, baseline + line_height // 2)],
+                  fill=(150, 160, 200), width=3)
+        for char in line:
+            char_size = int(line_height * rng.uniform(0.35, 0.6))
+            ink = rng.randint(40, 110)
+            draw.text((x, baseline + rng.randint(-line_height // 10, line_height // 10)), char,
+                      fill=(ink, ink, ink + 20), font_size=char_size)
+            x += int(char_size * rng.uniform(0.45, 0.75))
+    page = page.rotate(rng.uniform(-3, 3), expand=False, fillcolor=(225, 222, 210))
+    page = page.filter(ImageFilter.GaussianBlur(rng.uniform(1.0, 2.0)))
+    out = BytesIO()
+    page.save(out, format=fmt, quality=85)
+    return out.getvalue()
+
+
+def ocr_fixture_set(count: int = 4, sentences: int = 2, size=(2400, 1800)):
+    """(name, bytes, ground truth, kind) for OCR accuracy runs: clean printed pages and handwriting-like ones.
+
+    Sentences are wrapped short enough that every line fits on the page, so the
+    ground truth is exactly what is visible.
+    """
+    fixtures = []
+    for i in range(count):
+        rng = random.Random(i)
+        truth = " ".join(rng.choice(JOURNAL_LINES) for _ in range(sentences))
+        text = "\n".join(textwrap.wrap(truth, 24))
+        fixtures.append((f"printed_{i}.jpg", journal_photo(size, seed=i, text=text), truth, "printed"))
+        fixtures.append((f"handwritten_{i}.jpg", handwritten_photo(text, size, seed=i), truth, "handwritten"))
+    return fixtures
@@ -0,0 +1,77 @@
+"""Load test showing that concurrent requests overlap on the async data layer.
+
+Every Supabase query sleeps for ``--latency`` seconds in the fake client. If the
+routes blocked the event loop the requests would run one after another; with
+the async client the wall time stays close to a single request's latency.
+
+    python -m benchmarks.load_async_routes --requests 50 --latency 0.05
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+# The per-request JSON access log would drown the results
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+import httpx  # noqa: E402
+
+from benchmarks.fakes import FakeAsyncSupabaseClient, seed_donor_inbox  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services import supabase_service  # noqa: E402
+from app.services.container import services  # noqa: E402
+from app.services.linking_service import link_cache  # noqa: E402
+
+DONOR_ID = "donor-1"
+
+
+async def run(requests: int, latency: float) -> dict:
+    fake = FakeAsyncSupabaseClient()
+    seed_donor_inbox(fake, DONOR_ID, children=10)
+    fake.latency = latency
+    # Every DBServiceClass instance resolves the shared async client lazily
+    supabase_service._async_supabase = fake
+    # Every request must reach the data layer, or nothing overlaps
+    services.response_cache.clear()
+    services.response_cache.ttl = 0
+    link_cache.clear()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        # Warm the link cache so the single and concurrent requests make the same queries
+        await http.get(f"/donor/get_all_children/{DONOR_ID}")
+        start = time.perf_counter()
+        await http.get(f"/donor/get_all_children/{DONOR_ID}")
+        single = time.perf_counter() - start
+
+        fake.round_trips = fake.peak_in_flight = 0
+        start = time.perf_counter()
+        responses = await asyncio.gather(
+            *(http.get(f"/donor/get_all_children/{DONOR_ID}") for _ in range(requests))
+        )
+        wall = time.perf_counter() - start
+
+    assert all(r.status_code == 200 for r in responses)
+    return {
+        "requests": requests,
+        "single_request_seconds": round(single, 4),
+        "serial_estimate_seconds": round(single * requests, 4),
+        "concurrent_wall_seconds": round(wall, 4),
+        "overlap_factor": round(single * requests / wall, 1),
+        "peak_queries_in_flight": fake.peak_in_flight,
+        "round_trips": fake.round_trips,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="simulated seconds per Supabase round trip")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests, args.latency)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+"""Offline load test: upload, submit, donor inbox and mark-read at rising concurrency.
+
+Requests go through the real FastAPI app (middleware, routes and services);
+Supabase and both Gemini SDKs are the in-process fakes from ``fakes.py``, with
+configurable latency, jitter and injected error rates. Each scenario runs
+``--requests`` requests at every ``--concurrency`` level and reports p50/p95/p99
+latency, throughput and errors as JSON.
+
+    python -m benchmarks.load_scenarios --concurrency 1 4 16 64 --output run.json
+    python -m benchmarks.load_scenarios --baseline run.json --tolerance 0.2
+
+With ``--baseline`` the run is compared with an earlier ``--output`` file and
+exits non-zero when any p95 got slower by more than the tolerance.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("OCR_CACHE_DB", "")
+os.environ.setdefault("IDEMPOTENCY_DB", ":memory:")
+os.environ.setdefault("GEMINI_RPM", "0")
+os.environ.setdefault("LOG_LEVEL", "CRITICAL")
+
+import httpx  # noqa: E402
+
+from benchmarks.fakes import (  # noqa: E402
+    FakeAsyncSupabaseClient,
+    FakeGenaiClient,
+    FakeGenerativeModel,
+    install_fakes,
+    seed_donor_inbox,
+)
+from benchmarks.fixtures import journal_photo  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.cache import TTLCache  # noqa: E402
+from app.services.container import services  # noqa: E402
+from app.services.idempotency import IdempotencyService, SQLiteIdempotencyStore  # noqa: E402
+from app.services.linking_service import link_cache  # noqa: E402
+from app.services.ocr_cache import OCRCache  # noqa: E402
+
+DONOR_ID = "donor-1"
+INBOX_CHILDREN = 20
+SCENARIOS = ("upload", "submit", "inbox", "mark_read")
+
+
+def percentile(values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    return values[min(len(values) - 1, int(round(p * (len(values) - 1))))]
+
+
+class Scenarios:
+    """Builds the request for the i-th call of each scenario."""
+
+    def __init__(self, photo_dir: str, requests: int):
+        # Distinct photos so uploads never hit the OCR cache or replay an idempotent response
+        self.photos = []
+        for i in range(requests):
+            path = os.path.join(photo_dir, f"journal-{i}.jpg")
+            with open(path, "wb") as f:
+                f.write(journal_photo(size=(800, 600), seed=i))
+            self.photos.append(path)
+        self.level = 0
+
+    def student(self, i: int) -> str:
+        return str(1000 + i % INBOX_CHILDREN)
+
+    def upload(self, http: httpx.AsyncClient, i: int):
+        return http.post("/notes/upload", json={
+            "student_id": self.student(i),
+            "file_url": self.photos[i % len(self.photos)],
+            "journal_topic": "My weekend",
+        })
+
+    def submit(self, http: httpx.AsyncClient, i: int):
+        return http.post("/student/submit", json={
+            "student_id": self.student(i),
+            "journal": f"Entry {self.level}-{i}: we played football in the park after school.",
+            "journal_topic": "My weekend",
+            "image_url": "https://example.com/journal.jpg",
+        })
+
+    def inbox(self, http: httpx.AsyncClient, i: int):
+        return http.get(f"/donor/get_all_children/{DONOR_ID}")
+
+    def mark_read(self, http: httpx.AsyncClient, i: int):
+        return http.post(f"/donor/mark_notifications_read/{DONOR_ID}/{self.student(i)}")
+
+
+def reset_state(args) -> dict:
+    """Fresh fakes and caches, so each level starts from the same cold state."""
+    db = FakeAsyncSupabaseClient(args.db_latency, args.db_jitter, seed=args.seed)
+    seed_donor_inbox(db, DONOR_ID, children=INBOX_CHILDREN)
+    # Seeding is free; errors are only injected into the measured requests
+    db.error_rate = args.db_error_rate
+    genai_client = FakeGenaiClient(args.gemini_latency, args.gemini_jitter, args.gemini_error_rate,
+                                   seed=args.seed)
+    model = FakeGenerativeModel(args.gemini_latency, args.gemini_jitter, args.gemini_error_rate,
+                                seed=args.seed)
+    install_fakes(supabase=db, genai_client=genai_client, model=model)
+    services.ocr_cache = OCRCache([TTLCache()])
+    services.idempotency = IdempotencyService(SQLiteIdempotencyStore())
+    link_cache.clear()
+    # Every inbox request must reach the data layer, or the scenario only measures cache hits
+    services.response_cache.clear()
+    services.response_cache.ttl = 0
+    services.assignment_engine.invalidate()
+    return {"db": db, "genai": genai_client, "model": model}
+
+
+async def drive(http: httpx.AsyncClient, make_request, requests: int, concurrency: int) -> dict:
+    """``concurrency`` workers share ``requests`` calls; every latency and failure is recorded."""
+    latencies, errors = [], 0
+    next_index = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for i in next_index:
+            start = time.perf_counter()
+            try:
+                response = await make_request(http, i)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "throughput_rps": round(requests / wall, 2),
+    }
+
+
+async def run(args, scenarios: Scenarios) -> list:
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        for name in args.scenarios:
+            for concurrency in args.concurrency:
+                fakes = reset_state(args)
+                scenarios.level += 1
+                result = await drive(http, getattr(scenarios, name), args.requests, concurrency)
+                results.append({
+                    "scenario": name,
+                    "concurrency": concurrency,
+                    **result,
+                    "supabase_round_trips": fakes["db"].round_trips,
+                    "gemini_calls": fakes["genai"].calls + fakes["model"].calls,
+                })
+    return results
+
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Scenario/concurrency pairs whose p95 grew by more than ``tolerance`` over the baseline."""
+    before = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = before.get((result["scenario"], result["concurrency"]))
+        if old and old["p95_ms"] and result["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+            regressions.append({
+                "scenario": result["scenario"],
+                "concurrency": result["concurrency"],
+                "baseline_p95_ms": old["p95_ms"],
+                "p95_ms": result["p95_ms"],
+            })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--requests", type=int, default=64, help="requests per concurrency level")
+    parser.add_argument("--db-latency", type=float, default=0.005,
+                        help="simulated seconds per Supabase round trip")
+    parser.add_argument("--db-jitter", type=float, default=0.002)
+    parser.add_argument("--db-error-rate", type=float, default=0.0)
+    parser.add_argument("--gemini-latency", type=float, default=0.05,
+                        help="simulated seconds per Gemini call")
+    parser.add_argument("--gemini-jitter", type=float, default=0.02)
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    parser.add_argument("--baseline", help="earlier --output file to compare p95 latencies with")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed p95 slowdown over the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = asyncio.run(run(args, Scenarios(tmp, args.requests)))
+
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        "results": results,
+    }
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(results, json.load(f), args.tolerance)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print(json.dumps(report, indent=2))
+    if report.get("regressions"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
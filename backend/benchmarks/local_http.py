@@ -0,0 +1,83 @@
+"""A local HTTP server fixture that serves in-memory files with ETags and counts connections."""
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so pooled clients reuse sockets
+
+    def setup(self):
+        super().setup()
+        self.server.stats["connections"] += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        stats = self.server.stats
+        stats["requests"] += 1
+        body = self.server.files.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        if self.headers.get("If-None-Match") == etag:
+            stats["not_modified"] += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        stats["bytes_sent"] += len(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+    def handle_error(self, request, client_address):
+        # Clients hanging up mid-body (e.g. the size cap) are expected
+        pass
+
+
+class LocalFileServer:
+    """Usage::
+
+        with LocalFileServer({"/a.jpg": data}) as server:
+            fetch(server.url("/a.jpg"))
+    """
+
+    def __init__(self, files: dict):
+        self.httpd = _Server(("127.0.0.1", 0), _Handler)
+        self.httpd.files = files
+        self.httpd.stats = {"connections": 0, "requests": 0, "not_modified": 0, "bytes_sent": 0}
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def stats(self) -> dict:
+        return self.httpd.stats
+
+    def reset_stats(self):
+        for key in self.httpd.stats:
+            self.httpd.stats[key] = 0
+
+    def url(self, path: str) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}{path}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
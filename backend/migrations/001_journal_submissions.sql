@@ -0,0 +1,74 @@
+-- Append-only journal/report history.
+--
+-- Each submission becomes one row in journal_submissions instead of being
+-- appended to the students.journal_list / students.report_list arrays.
+-- students keeps latest_report as a denormalized pointer plus a
+-- submission_count counter, both maintained by append_submission().
+
+create table if not exists journal_submissions (
+    id bigserial primary key,
+    student_id text not null,
+    seq integer not null,
+    journal text not null,
+    report jsonb not null,
+    created_at timestamptz not null default now(),
+    unique (student_id, seq)
+);
+
+alter table students
+    add column if not exists submission_count integer not null default 0;
+
+-- Atomic append: the counter update takes a row lock on the student, so
+-- concurrent submissions for the same student are serialized and each gets
+-- its own seq.
+create or replace function append_submission(
+    p_student_id text,
+    p_journal text,
+    p_report jsonb
+) returns journal_submissions
+language plpgsql
+as $$
+declare
+    v_seq integer;
+    v_row journal_submissions;
+begin
+    update students
+    set submission_count = submission_count + 1,
+        latest_report = p_report
+    where student_id::text = p_student_id
+    returning submission_count into v_seq;
+
+    if not found then
+        raise exception 'Student % not found', p_student_id;
+    end if;
+
+    insert into journal_submissions (student_id, seq, journal, report)
+    values (p_student_id, v_seq, p_journal, p_report)
+    returning * into v_row;
+
+    return v_row;
+end;
+$$;
+
+-- Backfill existing history from the legacy arrays. Safe to re-run: rows that
+-- already exist are skipped and the counter is recomputed from the table.
+insert into journal_submissions (student_id, seq, journal, report)
+select
+    s.student_id::text,
+    j.ord::integer,
+    j.journal,
+    coalesce(s.report_list -> (j.ord::integer - 1), '{}'::jsonb)
+from students s
+cross join lateral jsonb_array_elements_text(coalesce(s.journal_list, '[]'::jsonb))
+    with ordinality as j(journal, ord)
+on conflict (student_id, seq) do nothing;
+
+update students s
+set submission_count = coalesce(
+    (select max(seq) from journal_submissions js where js.student_id = s.student_id::text),
+    0
+);
+
+-- journal_list and report_list are no longer written by the backend. Drop
+-- them once the backfill has been verified:
+-- alter table students drop column journal_list, drop column report_list;
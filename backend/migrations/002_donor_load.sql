@@ -0,0 +1,37 @@
+-- Per-donor load for the donor assignment engine.
+--
+-- donors.linked_students counts each donor's rows in student_donor_links. It
+-- is maintained by a trigger, so loading the assignment index reads one row
+-- per donor instead of counting links. donors.capacity is the optional
+-- number of students a donor wants; null means DONOR_DEFAULT_CAPACITY.
+
+alter table donors
+    add column if not exists capacity integer,
+    add column if not exists linked_students integer not null default 0;
+
+create or replace function track_donor_links() returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') then
+        update donors set linked_students = linked_students - 1 where id = old.donor_id;
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') then
+        update donors set linked_students = linked_students + 1 where id = new.donor_id;
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists student_donor_links_load on student_donor_links;
+create trigger student_donor_links_load
+    after insert or delete or update of donor_id on student_donor_links
+    for each row execute function track_donor_links();
+
+-- Backfill the counter from the existing links.
+update donors d
+set linked_students = coalesce(l.n, 0)
+from (
+    select donor_id, count(*) as n from student_donor_links group by donor_id
+) l
+where l.donor_id = d.id;
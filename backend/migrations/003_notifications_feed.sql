@@ -0,0 +1,8 @@
+-- Keyset pagination for the donor notifications feed.
+--
+-- GET /donor/notifications pages through one donor-student conversation
+-- ordered by (created_at, id), both backwards (before) and forwards (since).
+-- This index serves both directions without sorting.
+
+create index if not exists notifications_feed_idx
+    on notifications (donor_id, student_id, created_at desc, id desc);
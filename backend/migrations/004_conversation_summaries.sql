@@ -0,0 +1,106 @@
+-- One maintained summary row per donor-student conversation.
+--
+-- The inbox reads unread_count and the last message from here with a single
+-- primary-key range scan instead of counting and sorting notifications per
+-- child. Statement-level triggers keep the rows current, so a bulk insert
+-- or a mark-read touches each summary row once.
+
+create table if not exists conversation_summaries (
+    donor_id text not null,
+    student_id text not null,
+    unread_count integer not null default 0,
+    last_notification_id bigint,
+    last_message text,
+    last_journal_image text,
+    last_at timestamptz,
+    primary key (donor_id, student_id)
+);
+
+create or replace function conversation_summaries_on_insert() returns trigger
+language plpgsql
+as $$
+begin
+    insert into conversation_summaries as s (
+        donor_id, student_id, unread_count,
+        last_notification_id, last_message, last_journal_image, last_at
+    )
+    select distinct on (donor_id::text, student_id::text)
+        donor_id::text,
+        student_id::text,
+        count(*) filter (where not coalesce(is_read, false))
+            over (partition by donor_id::text, student_id::text),
+        id,
+        learning_report->>'progress_update',
+        journal_image,
+        created_at
+    from new_rows
+    order by donor_id::text, student_id::text, created_at desc, id desc
+    on conflict (donor_id, student_id) do update set
+        unread_count = s.unread_count + excluded.unread_count,
+        last_notification_id = case when s.last_at is null or excluded.last_at >= s.last_at
+            then excluded.last_notification_id else s.last_notification_id end,
+        last_message = case when s.last_at is null or excluded.last_at >= s.last_at
+            then excluded.last_message else s.last_message end,
+        last_journal_image = case when s.last_at is null or excluded.last_at >= s.last_at
+            then excluded.last_journal_image else s.last_journal_image end,
+        last_at = greatest(s.last_at, excluded.last_at);
+    return null;
+end;
+$$;
+
+create or replace function conversation_summaries_on_update() returns trigger
+language plpgsql
+as $$
+begin
+    with changed as (
+        select
+            n.donor_id::text as donor_id,
+            n.student_id::text as student_id,
+            sum(
+                case
+                    when coalesce(o.is_read, false) and not coalesce(n.is_read, false) then 1
+                    when not coalesce(o.is_read, false) and coalesce(n.is_read, false) then -1
+                    else 0
+                end
+            ) as delta
+        from new_rows n
+        join old_rows o on o.id = n.id
+        group by 1, 2
+    )
+    update conversation_summaries s
+    set unread_count = greatest(s.unread_count + c.delta, 0)
+    from changed c
+    where s.donor_id = c.donor_id and s.student_id = c.student_id and c.delta <> 0;
+    return null;
+end;
+$$;
+
+drop trigger if exists notifications_summary_insert on notifications;
+create trigger notifications_summary_insert
+    after insert on notifications
+    referencing new table as new_rows
+    for each statement execute function conversation_summaries_on_insert();
+
+drop trigger if exists notifications_summary_update on notifications;
+create trigger notifications_summary_update
+    after update on notifications
+    referencing old table as old_rows new table as new_rows
+    for each statement execute function conversation_summaries_on_update();
+
+-- Backfill from existing notifications.
+insert into conversation_summaries (
+    donor_id, student_id, unread_count,
+    last_notification_id, last_message, last_journal_image, last_at
+)
+select distinct on (donor_id::text, student_id::text)
+    donor_id::text,
+    student_id::text,
+    count(*) filter (where not coalesce(is_read, false))
+        over (partition by donor_id::text, student_id::text),
+    id,
+    learning_report->>'progress_update',
+    journal_image,
+    created_at
+from notifications
+order by donor_id::text, student_id::text, created_at desc, id desc
+on conflict (donor_id, student_id) do nothing;
@@ -0,0 +1,99 @@
+-- Notifications reference their report instead of copying it.
+--
+-- Every notification used to carry the whole learning report, which is also
+-- stored in journal_submissions (and students.latest_report). A notification
+-- now points at its journal_submissions row and keeps only a small preview:
+-- the overall score and the progress update cut to 160 characters
+-- (REPORT_PREVIEW_CHARS). The full report is read from journal_submissions
+-- when the donor opens it.
+
+alter table notifications
+    add column if not exists submission_id bigint
+        references journal_submissions (id) on delete set null,
+    add column if not exists report_preview jsonb;
+
+-- New rows leave learning_report empty when they have a submission to point at
+alter table notifications alter column learning_report drop not null;
+
+-- Backfill the previews. Keep the cut in step with DBServiceClass.report_preview.
+update notifications n
+set report_preview = jsonb_build_object(
+    'overall_score', n.learning_report->'overall_score',
+    'progress_update', case
+        when char_length(n.learning_report->>'progress_update') > 160
+            then rtrim(left(n.learning_report->>'progress_update', 159)) || '…'
+        else coalesce(n.learning_report->>'progress_update', '')
+    end
+)
+where n.report_preview is null and n.learning_report is not null;
+
+-- Match each notification to the submission its report came from: same
+-- student, same summary and progress update, closest in time.
+update notifications n
+set submission_id = m.id
+from (
+    select n2.id as notification_id, js.id
+    from notifications n2
+    cross join lateral (
+        select js.id
+        from journal_submissions js
+        where js.student_id = n2.student_id::text
+          and js.report->>'progress_update' is not distinct from n2.learning_report->>'progress_update'
+          and coalesce(js.report->>'summary', '') = coalesce(n2.learning_report->>'updated_report', '')
+        order by abs(extract(epoch from n2.created_at - js.created_at))
+        limit 1
+    ) js
+    where n2.submission_id is null and n2.learning_report is not null
+) m
+where n.id = m.notification_id;
+
+-- Matched rows no longer need their copy. Unmatched ones keep it and are
+-- still served from learning_report.
+update notifications
+set learning_report = null
+where submission_id is not null and learning_report is not null;
+
+-- The summary's last message now comes from the preview.
+create or replace function conversation_summaries_on_insert() returns trigger
+language plpgsql
+as $$
+begin
+    insert into conversation_summaries as s (
+        donor_id, student_id, unread_count,
+        last_notification_id, last_message, last_journal_image, last_at
+    )
+    select distinct on (donor_id::text, student_id::text)
+        donor_id::text,
+        student_id::text,
+        count(*) filter (where not coalesce(is_read, false))
+            over (partition by donor_id::text, student_id::text),
+        id,
+        coalesce(report_preview->>'progress_update', learning_report->>'progress_update'),
+        journal_image,
+        created_at
+    from new_rows
+    order by donor_id::text, student_id::text, created_at desc, id desc
+    on conflict (donor_id, student_id) do update set
+        unread_count = s.unread_count + excluded.unread_count,
+        last_notification_id = case when s.last_at is null or excluded.last_at >= s.last_at
+            then excluded.last_notification_id else s.last_notification_id end,
+        last_message = case when s.last_at is null or excluded.last_at >= s.last_at
+            then excluded.last_message else s.last_message end,
+        last_journal_image = case when s.last_at is null or excluded.last_at >= s.last_at
+            then excluded.last_journal_image else s.last_journal_image end,
+        last_at = greatest(s.last_at, excluded.last_at);
+    return null;
+end;
+$$;
+
+-- Reclaim the space of the nulled reports:
+-- vacuum (full, analyze) notifications;
+--
+-- Row size before and after (run once before the migration, once after):
+-- select count(*), avg(pg_column_size(n.*))::int as avg_row_bytes,
+--        pg_size_pretty(pg_total_relation_size('notifications')) as table_size
+-- from notifications n;
+--
+-- Once every client reads reports through /donor/notifications/.../report/...
+-- and no row is left unmatched, the legacy column can go:
+-- alter table notifications drop column learning_report;
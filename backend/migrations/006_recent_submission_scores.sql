@@ -0,0 +1,29 @@
+-- Progress analytics reads each student's latest submissions, not the whole history.
+--
+-- Cohort percentiles only need every student's current level: the mean of
+-- their last ANALYTICS_WINDOW submissions. recent_submission_scores() returns
+-- just those rows for one page of students. It uses the submission_count
+-- kept by append_submission() and the (student_id, seq) unique index on
+-- journal_submissions, so each student costs one short index range scan.
+-- A student's full series is read separately when their progress is opened.
+
+create or replace function recent_submission_scores(
+    p_student_ids text[],
+    p_window integer
+) returns table (
+    student_id text,
+    seq integer,
+    created_at timestamptz,
+    scores jsonb
+)
+language sql
+stable
+as $$
+    select js.student_id, js.seq, js.created_at, js.report->'scores'
+    from students s
+    join journal_submissions js
+        on js.student_id = s.student_id::text
+        and js.seq > s.submission_count - p_window
+    where s.student_id::text = any(p_student_ids)
+    order by js.student_id, js.seq;
+$$;
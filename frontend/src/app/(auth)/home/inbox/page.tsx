@@ -26,13 +26,20 @@ type Child = {
   online?: boolean;
 };
 
+type LearningReport = {
+  overall_score?: number | string;
+  progress_update?: string;
+  updated_report?: string;
+  scores?: Record<string, number | string>;
+};
+
 type NotificationItem = {
+  id: number;
   journal_image?: string | null;
-  learning_report?: {
+  // Score and shortened progress update; the full report is fetched when opened
+  report_preview?: {
     overall_score?: number | string;
     progress_update?: string;
-    updated_report?: string;
-    scores?: Record<string, number | string>;
   } | null;
 };
 
@@ -42,6 +49,7 @@ export default function InboxPage() {
   const [newMessage, setNewMessage] = useState("");
   const [searchQuery, setSearchQuery] = useState("");
   const [notifications, setNotifications] = useState<NotificationItem[]>([]);
+  const [reports, setReports] = useState<Record<number, LearningReport>>({});
   const [donorId, setDonorId] = useState<string | null>(null);
   const [hasScrolledToRead, setHasScrolledToRead] = useState(false);
 
@@ -176,6 +184,27 @@ export default function InboxPage() {
     }
   };
 
+  // Fetch a notification's full report the first time it is opened
+  const loadReport = async (notificationId: number) => {
+    if (!donorId || reports[notificationId]) return;
+
+    try {
+      const response = await fetch(
+        `${process.env.NEXT_PUBLIC_API_URL}/donor/notifications/${donorId}/report/${notificationId}`
+      );
+
+      if (!response.ok) {
+        console.error("Report API Error:", response.status);
+        return;
+      }
+
+      const report: LearningReport = await response.json();
+      setReports((prev) => ({ ...prev, [notificationId]: report }));
+    } catch (error) {
+      console.error("Error fetching report:", error);
+    }
+  };
+
   // Mark notifications as read for a student and update badge
   const markNotificationsAsRead = async (
     donorIdStr: string,
@@ -436,8 +465,8 @@ export default function InboxPage() {
                 onScrollCapture={handleMessageScroll}
               >
                 <div className="p-4 space-y-4 pb-4">
-                  {notifications.map((n, i) => (
-                    <div key={i} className="space-y-4">
+                  {notifications.map((n) => (
+                    <div key={n.id} className="space-y-4">
                       {/* Journal Image */}
                       <div className="flex justify-start">
                         <div className="max-w-xs lg:max-w-md">
@@ -477,56 +506,73 @@ export default function InboxPage() {
                               </p>
                               <p className="text-lg font-bold text-blue-600 dark:text-blue-400">
                                 Overall Score:{" "}
-                                {n.learning_report?.overall_score ?? "N/A"}/5
+                                {n.report_preview?.overall_score ?? "N/A"}/5
                               </p>
                             </div>
 
-                            {n.learning_report?.progress_update && (
+                            {(reports[n.id]?.progress_update ??
+                              n.report_preview?.progress_update) && (
                               <div className="mb-3">
                                 <p className="text-xs font-medium mb-1">
                                   Progress Update:
                                 </p>
                                 <p className="text-sm bg-gray-200 dark:bg-gray-600 p-2 rounded">
-                                  {n.learning_report.progress_update}
+                                  {reports[n.id]?.progress_update ??
+                                    n.report_preview?.progress_update}
                                 </p>
                               </div>
                             )}
 
-                            {n.learning_report?.updated_report && (
-                              <div className="mb-3">
-                                <p className="text-xs font-medium mb-1">
-                                  Teacher&apos;s Report:
+                            <details
+                              className="mb-3"
+                              onToggle={(e) => {
+                                if ((e.currentTarget as HTMLDetailsElement).open) {
+                                  loadReport(n.id);
+                                }
+                              }}
+                            >
+                              <summary className="text-xs font-medium cursor-pointer hover:text-gray-700 dark:hover:text-gray-300">
+                                View Full Report
+                              </summary>
+                              {!reports[n.id] ? (
+                                <p className="mt-2 text-xs text-gray-500 dark:text-gray-400">
+                                  Loading report...
                                 </p>
-                                <p className="text-sm bg-gray-200 dark:bg-gray-600 p-2 rounded">
-                                  {n.learning_report.updated_report}
-                                </p>
-                              </div>
-                            )}
+                              ) : (
+                                <div className="mt-2">
+                                  {reports[n.id].updated_report && (
+                                    <div className="mb-3">
+                                      <p className="text-xs font-medium mb-1">
+                                        Teacher&apos;s Report:
+                                      </p>
+                                      <p className="text-sm bg-gray-200 dark:bg-gray-600 p-2 rounded">
+                                        {reports[n.id].updated_report}
+                                      </p>
+                                    </div>
+                                  )}
 
-                            {n.learning_report?.scores && (
-                              <details className="mb-3">
-                                <summary className="text-xs font-medium cursor-pointer hover:text-gray-700 dark:hover:text-gray-300">
-                                  View Detailed Scores
-                                </summary>
-                                <div className="mt-2 grid grid-cols-2 gap-1 text-xs">
-                                  {Object.entries(n.learning_report.scores).map(
-                                    ([skill, score]) => (
-                                      <div
-                                        key={skill}
-                                        className="flex justify-between bg-gray-200 dark:bg-gray-600 p-1 rounded"
-                                      >
-                                        <span className="truncate">
-                                          {skill}:
-                                        </span>
-                                        <span className="font-medium">
-                                          {String(score)}/5
-                                        </span>
-                                      </div>
-                                    )
+                                  {reports[n.id].scores && (
+                                    <div className="grid grid-cols-2 gap-1 text-xs">
+                                      {Object.entries(
+                                        reports[n.id].scores ?? {}
+                                      ).map(([skill, score]) => (
+                                        <div
+                                          key={skill}
+                                          className="flex justify-between bg-gray-200 dark:bg-gray-600 p-1 rounded"
+                                        >
+                                          <span className="truncate">
+                                            {skill}:
+                                          </span>
+                                          <span className="font-medium">
+                                            {String(score)}/5
+                                          </span>
+                                        </div>
+                                      ))}
+                                    </div>
                                   )}
                                 </div>
-                              </details>
-                            )}
+                              )}
+                            </details>
 
                             <p className="text-xs text-gray-500 dark:text-gray-400 mt-1">
                               Learning Report